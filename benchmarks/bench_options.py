@@ -0,0 +1,100 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Memory and throughput benchmark of pyecharts option objects.
+
+Every scenario builds n option objects the way simulation_flow_graph.py does for large graphs
+(options/charts_options.py items with options/series_options.py styles inside) and records, in a
+fresh python process:
+    build_ms     time to construct the objects
+    dump_ms      time to serialize them with json.dumps(default=pyecharts.charts.base.default)
+    retained_kb  memory held by the objects after construction (tracemalloc)
+Use --pyecharts to point at another source tree (e.g. a `git worktree` of an older commit) to
+compare before / after.
+
+    $ python benchmarks/bench_options.py -n 100000
+    $ python benchmarks/bench_options.py --pyecharts /tmp/old/pyecharts --output old.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+DEFAULT_PYECHARTS = os.path.join(os.path.dirname(HERE), "pyecharts")
+
+# name: statement building one object, i is the index
+SCENARIOS = {
+    "label_opts": "opts.LabelOpts(is_show=False)",
+    "tooltip_opts": "opts.TooltipOpts(formatter='{b}')",
+    "linestyle_opts": "opts.LineStyleOpts(width=1.0)",
+    "graph_node": "opts.GraphNode(name=str(i), x=i, y=i, symbol='circle', symbol_size=15, value=[str(i), 0], "
+                  "category=0, label_opts=opts.LabelOpts(is_show=False, position='bottom', formatter='{b}'), "
+                  "tooltip_opts=opts.TooltipOpts(formatter='ID:{b}'), "
+                  "itemstyle_opts=opts.ItemStyleOpts(color='#495057'))",
+    "graph_link": "opts.GraphLink(source=str(i), target=str(i + 1), value=1.5, symbol=['none', 'none'], "
+                  "linestyle_opts=opts.LineStyleOpts(width=2, type_='solid', color='#495057', opacity=0.8), "
+                  "label_opts=opts.LabelOpts(is_show=True, position='middle', formatter='{c}', distance=1))",
+    "scatter_item": "opts.ScatterItem(name=str(i), value=[i, i], itemstyle_opts=opts.ItemStyleOpts(color='red'))",
+}
+
+CHILD = """
+import json, sys, time, tracemalloc
+sys.path.insert(0, {pyecharts!r})
+from pyecharts import options as opts
+from pyecharts.charts.base import default
+n = {n}
+make = eval("lambda i: " + {stmt!r})
+t0 = time.perf_counter()
+items = [make(i) for i in range(n)]
+t1 = time.perf_counter()
+json.dumps(items, default=default)
+t2 = time.perf_counter()
+del items
+tracemalloc.start()
+items = [make(i) for i in range(n)]
+retained = tracemalloc.get_traced_memory()[0]
+print(json.dumps({{"build_ms": (t1 - t0) * 1000, "dump_ms": (t2 - t1) * 1000, "retained_kb": retained // 1024}}))
+"""
+
+
+def run_once(pyecharts_path: str, stmt: str, n: int) -> dict:
+    out = subprocess.run([sys.executable, "-c", CHILD.format(pyecharts=pyecharts_path, stmt=stmt, n=n)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def bench(pyecharts_path: str, n: int, repeat: int, scenarios: list) -> dict:
+    results = {}
+    for name in scenarios:
+        runs = [run_once(pyecharts_path, SCENARIOS[name], n) for _ in range(repeat)]
+        results[name] = {
+            "build_ms": round(min(r["build_ms"] for r in runs), 2),
+            "dump_ms": round(min(r["dump_ms"] for r in runs), 2),
+            "retained_kb": min(r["retained_kb"] for r in runs),
+        }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="pyecharts option objects benchmark")
+    parser.add_argument("--pyecharts", default=DEFAULT_PYECHARTS, help="pyecharts source root to benchmark")
+    parser.add_argument("-n", type=int, default=100000, help="objects per scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per scenario, best run is kept")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run, can be repeated (default: all)")
+    parser.add_argument("--output", help="write results to this json file")
+    args = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "pyecharts": os.path.abspath(args.pyecharts),
+        "n": args.n,
+        "results": bench(args.pyecharts, args.n, args.repeat, args.scenario or list(SCENARIOS)),
+    }
+    text = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
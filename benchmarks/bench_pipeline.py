@@ -0,0 +1,170 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Benchmark of the simulation pipeline on synthetic BRITE-like topologies.
+
+For every size a dataset is generated (see synth_topo.py, cached in --data-dir), then in a fresh
+python process:
+    run       every stage of simulation_flow_graph.run() (profiling.StageProfiler)
+    topoGen   the generators of topoGen/brite2topo.py, skipped if their dependencies are missing
+Results are written to json together with the git commit, compare two result files with --compare.
+No network or browser is needed.
+
+    $ python benchmarks/bench_pipeline.py --sizes 1k,10k
+    $ python benchmarks/bench_pipeline.py --compare benchmarks/results/pipeline_<old>.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+ROOT = os.path.dirname(HERE)
+DEFAULT_DATA_DIR = os.path.join(HERE, "data")
+DEFAULT_RESULT_DIR = os.path.join(HERE, "results")
+SIZES = {"1k": 10 ** 3, "10k": 10 ** 4, "100k": 10 ** 5, "1M": 10 ** 6}
+SUITES = ("run", "topoGen")
+
+CHILD_RUN = """
+import json, os, sys
+sys.path[:0] = [{root!r}, os.path.join({root!r}, "pyecharts")]
+import simulation_flow_graph as sfg
+from profiling import StageProfiler
+data = {data!r}
+sfg.topo_file = os.path.join(data, "community_small.txt")
+sfg.flow_data_file = os.path.join(data, "flow_data.txt")
+sfg.flow_data_new_file = os.path.join(data, "flow_data_new.txt")
+sfg.layout_file = os.path.join(data, "layout.txt")
+sfg.node_type_file = os.path.join(data, "node_type.txt")
+sfg.logger.disabled = True
+profiler = StageProfiler()
+sfg.run(layout="force", title="bench", showlabel=False, profiler=profiler)
+print(profiler.to_json())
+"""
+
+CHILD_TOPOGEN = """
+import json, os, random, sys
+sys.path[:0] = [{root!r}, os.path.join({root!r}, "topoGen")]
+from profiling import StageProfiler
+try:
+    import brite2topo as bt
+except ImportError as err:
+    print(json.dumps({{"skipped": str(err)}}))
+    sys.exit(0)
+random.seed({seed})
+brite = os.path.join({data!r}, "topo.brite")
+profiler = StageProfiler()
+with profiler.stage("count"):
+    node_n, edge_n = bt.getNodesAndEdgesNumber(brite)
+with profiler.stage("extend"):
+    bt.extent_brite_topo(brite, "extend.brite", max(int(node_n) // 20, 4), 0.8)
+node_n, edge_n = bt.getNodesAndEdgesNumber("extend.brite")
+with profiler.stage("topology"):
+    bt.dump_topology("extend.brite", "topo.txt", node_n, edge_n)
+with profiler.stage("node type"):
+    bt.dump_node_type("extend.brite", "node_type.txt", 0.8)
+with profiler.stage("layout"):
+    bt.dump_axis_from_brite("extend.brite", "node_type.txt", "layout.txt", node_n, 3)
+with profiler.stage("check"):
+    bt.check_layout_valid("layout.txt", "node_type.txt", 3)
+print(profiler.to_json())
+"""
+
+
+def git_commit() -> dict:
+    def _git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+
+    return {"commit": _git("rev-parse", "HEAD"), "dirty": bool(_git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def run_child(code: str, timeout: float) -> dict:
+    """
+    Run code in a fresh interpreter inside a temporary directory, the last stdout line is the json result
+    """
+    with tempfile.TemporaryDirectory() as cwd:
+        try:
+            proc = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True,
+                                  timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {"error": "timeout after {}s".format(timeout)}
+    if proc.returncode != 0:
+        # drop progress bars, keep the traceback tail
+        lines = [line for line in proc.stderr.splitlines() if line.strip() and "it/s]" not in line]
+        return {"error": "exit code {}: {}".format(proc.returncode, "\n".join(lines[-5:]))}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench(sizes: list, suites: list, data_dir: str, seed: int, timeout: float) -> dict:
+    sys.path.insert(0, HERE)
+    from synth_topo import generate_dataset
+
+    results = {}
+    for size in sizes:
+        t0 = time.perf_counter()
+        data = generate_dataset(os.path.join(data_dir, "{}_seed{}".format(size, seed)), SIZES[size], seed)
+        entry = {"dataset": data, "generate_s": time.perf_counter() - t0}
+        if "run" in suites:
+            entry["run"] = run_child(CHILD_RUN.format(root=ROOT, data=data), timeout)
+        if "topoGen" in suites:
+            entry["topoGen"] = run_child(CHILD_TOPOGEN.format(root=ROOT, data=data, seed=seed), timeout)
+        results[size] = entry
+        print("{}: done in {:.1f}s".format(size, time.perf_counter() - t0), file=sys.stderr)
+    return results
+
+
+def compare(base: dict, new: dict) -> str:
+    """
+    Stage by stage wall time of two result files, ratio > 1 means new is slower
+    """
+    lines = ["{:<6}{:<9}{:<12}{:>12}{:>12}{:>8}".format("size", "suite", "stage", "base(s)", "new(s)", "ratio")]
+    for size, entry in new["results"].items():
+        for suite in SUITES:
+            old_stages = base["results"].get(size, {}).get(suite, {}).get("stages", {})
+            for stage, value in entry.get(suite, {}).get("stages", {}).items():
+                if stage not in old_stages:
+                    continue
+                old, cur = old_stages[stage]["wall_s"], value["wall_s"]
+                lines.append("{:<6}{:<9}{:<12}{:>12.4f}{:>12.4f}{:>8.2f}".format(
+                    size, suite, stage, old, cur, cur / old if old else float("nan")))
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="simulation pipeline benchmark")
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma separated sizes out of {}".format(
+        ", ".join(SIZES)))
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suite to run, can be repeated (default: all)")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated datasets are cached")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds per size and suite")
+    parser.add_argument("--output", help="result json (default: benchmarks/results/pipeline_<commit>.json)")
+    parser.add_argument("--compare", metavar="BASE_JSON", help="compare the results with an earlier result file")
+    args = parser.parse_args()
+    sizes = args.sizes.split(",")
+    for s in sizes:
+        if s not in SIZES:
+            parser.error("unknown size: {}".format(s))
+
+    report = {
+        **git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": args.seed,
+        "results": bench(sizes, args.suite or list(SUITES), args.data_dir, args.seed, args.timeout),
+    }
+    output = args.output or os.path.join(DEFAULT_RESULT_DIR, "pipeline_{}.json".format(report["commit"][:10]))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    text = json.dumps(report, indent=4)
+    with open(output, "w") as f:
+        f.write(text + "\n")
+    print(text)
+    print("results saved in {}".format(output), file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), report))
@@ -0,0 +1,90 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Cold-start benchmark of pyecharts in fresh interpreters.
+
+Every scenario is run in a new python process, the statement time (setup excluded)
+and the peak RSS (ru_maxrss) of the process are recorded. Use --pyecharts to point at
+another source tree (e.g. a `git worktree` of an older commit) to compare before / after.
+
+    $ python benchmarks/bench_startup.py --repeat 20
+    $ python benchmarks/bench_startup.py --pyecharts /tmp/old/pyecharts --output old.json
+    $ python benchmarks/bench_startup.py --scenario first_render --env PYECHARTS_TEMPLATE_CACHE_DIR=/tmp/tpl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+DEFAULT_PYECHARTS = os.path.join(os.path.dirname(HERE), "pyecharts")
+
+_RENDER_GRAPH = "Graph().add('', [{'name': 'a'}, {'name': 'b'}], [{'source': 'a', 'target': 'b'}]).render_embed()"
+
+# name: (setup, timed statement)
+SCENARIOS = {
+    "interpreter": ("", "pass"),
+    "import_graph": ("", "from pyecharts.charts import Graph"),
+    "render_graph": ("", "from pyecharts.charts import Graph\n" + _RENDER_GRAPH),
+    "first_render": ("from pyecharts.charts import Graph", _RENDER_GRAPH),
+}
+
+CHILD = """
+import json, resource, time
+exec({setup!r})
+t0 = time.perf_counter()
+exec({stmt!r})
+t1 = time.perf_counter()
+print(json.dumps({{"seconds": t1 - t0, "maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+
+def run_once(setup: str, stmt: str, env: dict) -> dict:
+    out = subprocess.run([sys.executable, "-c", CHILD.format(setup=setup, stmt=stmt)], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def bench(pyecharts_path: str, repeat: int, scenarios: list, extra_env: dict = None) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [pyecharts_path, env.get("PYTHONPATH")]))
+    env.update(extra_env or {})
+    results = {}
+    for name in scenarios:
+        runs = [run_once(*SCENARIOS[name], env) for _ in range(repeat)]
+        seconds = [r["seconds"] for r in runs]
+        rss = [r["maxrss_kb"] for r in runs]
+        results[name] = {
+            "median_ms": round(statistics.median(seconds) * 1000, 2),
+            "min_ms": round(min(seconds) * 1000, 2),
+            "median_maxrss_kb": int(statistics.median(rss)),
+        }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="pyecharts cold-start benchmark")
+    parser.add_argument("--pyecharts", default=DEFAULT_PYECHARTS, help="pyecharts source root to benchmark")
+    parser.add_argument("--repeat", type=int, default=10, help="fresh interpreters per scenario")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run, can be repeated (default: all)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment variable of the child interpreters, can be repeated")
+    parser.add_argument("--output", help="write results to this json file")
+    args = parser.parse_args()
+    extra_env = dict(item.split("=", 1) for item in args.env)
+
+    report = {
+        "python": sys.version.split()[0],
+        "pyecharts": os.path.abspath(args.pyecharts),
+        "repeat": args.repeat,
+        "env": extra_env,
+        "results": bench(args.pyecharts, args.repeat, args.scenario or list(SCENARIOS), extra_env),
+    }
+    text = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,170 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Synthetic BRITE-like topologies for benchmarks.
+
+generate_dataset() writes, for a target number of edges:
+    topo.brite           core topology (routers only) in BRITE format, input of topoGen/brite2topo.py
+    community_small.txt  full topology (routers + degree-one clients), see simulation_flow_graph.py
+    flow_data.txt / flow_data_new.txt / layout.txt / node_type.txt
+
+Nodes of an AS are scattered around the AS center and joined by a random tree plus random local
+edges, the first BORDERS_PER_AS nodes of each AS are RT_BORDER routers linked to the border routers
+of other ASes. Everything is drawn from numpy.random.default_rng(seed), so a (edges, seed) pair
+always gives the same files.
+"""
+import os
+
+import numpy as np
+
+BORDERS_PER_AS = 2
+CTRL_PER_AS = 3
+PLANE = 1000  # side of the square occupied by one AS
+FLOW_RATIO = 0.1  # share of links which carry a flow
+CLIENT_RATIO = 0.05  # clients per router
+RECV_RATIO = 0.8  # receivers among clients
+CLIENT_BANDWIDTH = 10.0  # Mbps, bandwidth of client links
+FILES = ("topo.brite", "community_small.txt", "flow_data.txt", "flow_data_new.txt", "layout.txt", "node_type.txt")
+
+
+def _unique_edges(src: np.ndarray, dst: np.ndarray) -> tuple:
+    lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+    keep = lo != hi
+    key = np.unique((lo[keep].astype(np.int64) << 32) | hi[keep])
+    return (key >> 32).astype(np.int64), (key & 0xFFFFFFFF).astype(np.int64)
+
+
+def make_topology(n_edges: int, seed: int = 0) -> dict:
+    """
+    :param n_edges: number of edges of the full topology (routers + clients), approximately
+    :return: dict of numpy arrays, see generate_dataset()
+    """
+    rng = np.random.default_rng(seed)
+    n_routers = max(n_edges * 10 // 21, 10)  # ~2 edges per router plus one edge per client
+    n_as = int(np.clip(round(np.sqrt(n_routers) / 4), 2, 64))
+    as_id = np.arange(n_routers) * n_as // n_routers
+    first = np.searchsorted(as_id, np.arange(n_as))
+    size = np.bincount(as_id, minlength=n_as)
+
+    # AS centers on a grid, nodes normally distributed around them
+    side = int(np.ceil(np.sqrt(n_as)))
+    center = np.column_stack((np.arange(n_as) % side, np.arange(n_as) // side)) * PLANE + PLANE / 2
+    xy = center[as_id] + rng.normal(0, PLANE / 6, (n_routers, 2))
+    xy = np.clip(np.rint(xy), 0, side * PLANE).astype(np.int64)
+
+    # random spanning tree inside every AS: node i links to a random earlier node of its AS
+    idx = np.arange(n_routers)
+    offset = idx - first[as_id]
+    tree = offset > 0
+    parent = first[as_id[tree]] + (rng.random(tree.sum()) * offset[tree]).astype(np.int64)
+    # random extra edges inside every AS
+    n_core = n_edges - int(n_routers * CLIENT_RATIO)
+    n_extra = max(n_core - n_routers - BORDERS_PER_AS * n_as, 0)
+    a = rng.integers(0, n_routers, n_extra)
+    b = first[as_id[a]] + rng.integers(0, size[as_id[a]])
+    # border routers: ring between neighbouring ASes plus random pairs
+    border = (first[:, None] + np.arange(BORDERS_PER_AS)).ravel()
+    ring_a = first + 0
+    ring_b = np.roll(first, -1) + 1
+    rand_a = rng.choice(border, n_as)
+    rand_b = rng.choice(border, n_as)
+    src, dst = _unique_edges(np.concatenate((idx[tree], a, ring_a, rand_a)),
+                             np.concatenate((parent, b, ring_b, rand_b)))
+
+    # degree-one clients attached to random non-border routers
+    n_clients = max(int(n_routers * CLIENT_RATIO), 4)
+    non_border = np.setdiff1d(idx, border)
+    access = rng.choice(non_border, n_clients)
+    clients = n_routers + np.arange(n_clients)
+    n_recv = int(n_clients * RECV_RATIO)
+    return {
+        "n_routers": n_routers,
+        "as_id": np.concatenate((as_id, as_id[access])),
+        "xy": np.vstack((xy, np.clip(xy[access] + rng.integers(-20, 21, (n_clients, 2)), 0, None))),
+        "center": center,
+        "core_src": src,
+        "core_dst": dst,
+        "src": np.concatenate((src, clients)),
+        "dst": np.concatenate((dst, access)),
+        "receiver": clients[:n_recv],
+        "source": clients[n_recv:],
+        "switch": np.unique(access),
+        "bgn": border,
+        "rng": rng,
+    }
+
+
+def write_brite(topo: dict, file: str) -> tuple:
+    """
+    :return: (delay, bandwidth) of the core edges
+    """
+    n = topo["n_routers"]
+    src, dst = topo["core_src"], topo["core_dst"]
+    as_id, xy = topo["as_id"][:n], topo["xy"][:n]
+    deg = np.bincount(np.concatenate((src, dst)), minlength=n)
+    length = np.hypot(*(xy[src] - xy[dst]).T)
+    delay = length / 300.0
+    bw = topo["rng"].uniform(10, 100, len(src))
+    is_border = np.zeros(n, dtype=bool)
+    is_border[topo["bgn"]] = True
+    inter = as_id[src] != as_id[dst]
+    with open(file, "w") as f:
+        f.write("Topology: ( {} Nodes, {} Edges )\n".format(n, len(src)))
+        f.write("Model (5 - RTWaxman):  synthetic benchmark topology\n\n")
+        f.write("Nodes: ( {} )\n".format(n))
+        for mask, kind in ((is_border, "RT_BORDER"), (~is_border, "RT_NODE")):
+            ids = np.flatnonzero(mask)
+            np.savetxt(f, np.column_stack((ids, xy[ids], deg[ids], deg[ids], as_id[ids])),
+                       fmt="%d\t%d\t%d\t%d\t%d\t%d\t" + kind)
+        f.write("\n\nEdges: ( {} )\n".format(len(src)))
+        edge_id = np.arange(len(src))
+        for mask, kind in ((~inter, "E_RT"), (inter, "E_AS")):
+            np.savetxt(f, np.column_stack((edge_id[mask], src[mask], dst[mask], length[mask], delay[mask],
+                                           bw[mask], as_id[src[mask]], as_id[dst[mask]])),
+                       fmt="%d\t%d\t%d\t%f\t%f\t%f\t%d\t%d\t" + kind + "\tU")
+    return delay, bw
+
+
+def generate_dataset(out_dir: str, n_edges: int, seed: int = 0) -> str:
+    """
+    Write the synthetic input files of the given size to out_dir, files already there are kept
+    :return: out_dir
+    """
+    if all(os.path.exists(os.path.join(out_dir, name)) for name in FILES):
+        return out_dir
+    os.makedirs(out_dir, exist_ok=True)
+    topo = make_topology(n_edges, seed)
+    rng = topo["rng"]
+    src, dst, as_id, xy = topo["src"], topo["dst"], topo["as_id"], topo["xy"]
+    n_nodes = len(as_id)
+
+    core_delay, core_bw = write_brite(topo, os.path.join(out_dir, "topo.brite"))
+    # client links: delay by length, fixed bandwidth like the client links of topoGen/brite2topo.py
+    n_client = len(src) - len(core_delay)
+    delay = np.concatenate((core_delay, np.hypot(*(xy[src[-n_client:]] - xy[dst[-n_client:]]).T) / 300.0))
+    bw = np.concatenate((core_bw, np.full(n_client, CLIENT_BANDWIDTH)))
+    with open(os.path.join(out_dir, "community_small.txt"), "w") as f:
+        f.write("{} {}\n".format(n_nodes, len(src)))
+        np.savetxt(f, np.column_stack((src, dst, as_id[src] + 1, as_id[dst] + 1, delay, bw)),
+                   fmt="%d\t%d\t%d\t%d\t%f\t%f")
+
+    # controller domain: sector of the node around its AS center
+    d = xy - topo["center"][as_id]
+    ctrl = ((np.arctan2(d[:, 1], d[:, 0]) + np.pi) / (2 * np.pi) * CTRL_PER_AS).astype(np.int64) % CTRL_PER_AS
+    np.savetxt(os.path.join(out_dir, "layout.txt"), np.column_stack((np.arange(n_nodes), xy, as_id, ctrl)),
+               fmt="%d", delimiter=",")
+
+    with open(os.path.join(out_dir, "node_type.txt"), "w") as f:
+        for name in ("receiver", "source", "switch", "bgn"):
+            f.write("{}: {}\n".format(name, topo[name].tolist()))
+
+    load = rng.lognormal(15, 1, n_nodes)
+    flow = rng.choice(len(src), max(int(len(src) * FLOW_RATIO), 1), replace=False)
+    flow_rows = np.column_stack((src[flow], dst[flow], load[src[flow]], load[dst[flow]],
+                                 rng.lognormal(13, 1, len(flow))))
+    np.savetxt(os.path.join(out_dir, "flow_data.txt"), flow_rows, fmt="%d %d %f %f %f")
+    # new flows: half of the old ones with changed values
+    new_rows = flow_rows[:len(flow_rows) // 2].copy()
+    new_rows[:, 4] *= rng.uniform(0.5, 1.5, len(new_rows))
+    np.savetxt(os.path.join(out_dir, "flow_data_new.txt"), new_rows, fmt="%d %d %f %f %f")
+    return out_dir
@@ -0,0 +1,219 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Force-directed edge bundling (Holten and van Wijk, FDEB) of straight links with fixed endpoints.
+
+Every link becomes a polyline whose inner points attract the matching points of compatible links, over
+CYCLES cycles in which the polylines are subdivided (1, 3, 7, 15, 31 inner points), the step is halved and
+the number of iterations drops by a third. Two links are compatible by the product of the angle, scale,
+position and visibility compatibility of the paper; only pairs of at least THRESHOLD attract each other.
+
+The pairs are found through a uniform grid of the link midpoints: position compatibility is below
+THRESHOLD once the midpoints are further apart than (1 / THRESHOLD - 1) times the longer link, so every
+link only looks at the cells within that distance, and keeps its MAX_NEIGHBORS most compatible partners.
+The forces of all links are computed at once with numpy, in chunks of CHUNK pair points.
+
+    paths = bundle(source_xy, target_xy)  # (links, points, 2), first and last point are the endpoints
+"""
+import numpy as np
+
+THRESHOLD = 0.6  # minimal compatibility of two attracting links
+CYCLES = 5  # subdivision cycles
+ITERATIONS = 90  # iterations of the first cycle, two thirds of them in every next cycle
+STEP = 0.1  # move of a point per unit of force in the first cycle, halved every cycle
+STIFFNESS = 0.1  # spring constant K of the paper
+MAX_NEIGHBORS = 32  # most compatible links which attract a link
+MAX_RADIUS = 8  # cells searched around a midpoint, the grid is coarser if a link reaches further
+SIDE = 1000.0  # links are bundled in a box of this size, STEP and STIFFNESS are tuned for it
+CHUNK = 1 << 20  # pair points whose forces are computed at once
+EPS = 1e-6
+
+
+def _norm(v: np.ndarray) -> np.ndarray:
+    return np.hypot(v[..., 0], v[..., 1])
+
+
+def _visibility(p0: np.ndarray, p1: np.ndarray, q0: np.ndarray, q1: np.ndarray) -> np.ndarray:
+    """
+    Visibility of link Q from link P: 1 if the projection of Q on the line of P is centered on P, 0 if the
+    midpoint of P is outside of it
+    """
+    d = p1 - p0
+    length2 = np.maximum((d * d).sum(axis=1), EPS)[:, None]
+    i0 = p0 + d * ((q0 - p0) * d).sum(axis=1)[:, None] / length2
+    i1 = p0 + d * ((q1 - p0) * d).sum(axis=1)[:, None] / length2
+    span = np.maximum(_norm(i1 - i0), EPS)
+    return np.maximum(1 - 2 * _norm((p0 + p1) / 2 - (i0 + i1) / 2) / span, 0)
+
+
+def compatibility(p0: np.ndarray, p1: np.ndarray, q0: np.ndarray, q1: np.ndarray) -> np.ndarray:
+    """
+    :param p0, p1, q0, q1: (n, 2) endpoints of the links P and Q of n pairs, links have a positive length
+    :return: compatibility of every pair, 0 ~ 1
+    """
+    p, q = p1 - p0, q1 - q0
+    lp, lq = _norm(p), _norm(q)
+    angle = np.abs((p * q).sum(axis=1)) / (lp * lq)
+    avg = (lp + lq) / 2
+    scale = 2 / (avg / np.minimum(lp, lq) + np.maximum(lp, lq) / avg)
+    position = avg / (avg + _norm((p0 + p1) / 2 - (q0 + q1) / 2))
+    visibility = np.minimum(_visibility(p0, p1, q0, q1), _visibility(q0, q1, p0, p1))
+    return angle * scale * position * visibility
+
+
+def compatible_pairs(source: np.ndarray, target: np.ndarray, threshold: float = THRESHOLD,
+                     max_neighbors: int = MAX_NEIGHBORS) -> tuple:
+    """
+    :param source, target: (n, 2) endpoints of the links
+    :return: (link, neighbor, compatibility, reversed) of the attracting pairs, sorted by link; reversed
+             marks neighbors pointing the other way, whose points are matched in reverse order
+    """
+    length = _norm(target - source)
+    mid = (source + target) / 2
+    reach = length * (1 / threshold - 1)
+    valid = length > EPS
+    if valid.sum() < 2:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0), np.zeros(0, dtype=bool)
+    direction = (target - source) / np.maximum(length, EPS)[:, None]
+    # every factor of the compatibility is at most 1, so each of them has to reach the threshold: the scale
+    # compatibility does for length ratios up to max_ratio
+    ratio = np.linspace(1, 100, 100000)
+    max_ratio = ratio[2 / ((1 + ratio) / 2 + 2 * ratio / (1 + ratio)) >= threshold].max()
+    size = max(float(np.median(reach[valid])), float(reach.max()) / MAX_RADIUS, EPS)
+    cell = ((mid - mid.min(axis=0)) / size).astype(np.int64)
+    ny = int(cell[:, 1].max()) + 1
+    key = cell[:, 0] * ny + cell[:, 1]
+    order = np.argsort(key, kind="stable")
+    ordered = key[order]
+    radius = np.where(valid, np.ceil(reach / size), -1).astype(np.int64)
+    links, neighbors, weights = [], [], []
+    r = int(radius.max())
+    for dx in range(-r, r + 1):
+        for dy in range(-r, r + 1):
+            a = np.flatnonzero(radius >= max(abs(dx), abs(dy)))
+            cx, cy = cell[a, 0] + dx, cell[a, 1] + dy
+            inside = (cx >= 0) & (cy >= 0) & (cy < ny)
+            a = a[inside]
+            k = cx[inside] * ny + cy[inside]
+            lo = np.searchsorted(ordered, k, "left")
+            counts = np.searchsorted(ordered, k, "right") - lo
+            a = np.repeat(a, counts)
+            b = order[np.repeat(lo, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)]
+            # every pair once, seen from the longer link which reaches the midpoint of the other one
+            keep = valid[b] & ((length[b] < length[a]) | ((length[b] == length[a]) & (b < a)))
+            a, b = a[keep], b[keep]
+            # cheap tests of the angle, scale and position compatibility first
+            keep = np.abs((direction[a] * direction[b]).sum(axis=1)) >= threshold
+            keep &= length[a] <= max_ratio * length[b]
+            keep &= _norm(mid[a] - mid[b]) <= (length[a] + length[b]) / 2 * (1 / threshold - 1)
+            a, b = a[keep], b[keep]
+            for lo in range(0, len(a), CHUNK):
+                pa, pb = a[lo:lo + CHUNK], b[lo:lo + CHUNK]
+                w = compatibility(source[pa], target[pa], source[pb], target[pb])
+                strong = w >= threshold
+                links.append(pa[strong])
+                neighbors.append(pb[strong])
+                weights.append(w[strong])
+    a, b, w = np.concatenate(links), np.concatenate(neighbors), np.concatenate(weights)
+    a, b, w = np.concatenate((a, b)), np.concatenate((b, a)), np.concatenate((w, w))
+    # the most compatible neighbors of every link first, then keep max_neighbors of them
+    order = np.lexsort((-w, a))
+    a, b, w = a[order], b[order], w[order]
+    rank = np.arange(len(a)) - np.searchsorted(a, a)
+    keep = rank < max_neighbors
+    a, b, w = a[keep], b[keep], w[keep]
+    reverse = ((target[a] - source[a]) * (target[b] - source[b])).sum(axis=1) < 0
+    return a, b, w, reverse
+
+
+def subdivide(points: np.ndarray) -> np.ndarray:
+    """
+    :param points: (n, k, 2) polylines
+    :return: (n, 2k - 1, 2) polylines with the midpoint of every segment inserted
+    """
+    n, k, _ = points.shape
+    result = np.empty((n, 2 * k - 1, 2))
+    result[:, ::2] = points
+    result[:, 1::2] = (points[:, :-1] + points[:, 1:]) / 2
+    return result
+
+
+def _neighbor_index(a: np.ndarray, b: np.ndarray, reverse: np.ndarray, k: int) -> np.ndarray:
+    """
+    :return: (pairs, k) flat index of the point of the neighbor matching each inner point of the link
+    """
+    j = np.arange(k)
+    return b[:, None] * k + np.where(reverse[:, None], k - 1 - j, j)
+
+
+def _electrostatic(x: np.ndarray, y: np.ndarray, a: np.ndarray, starts: np.ndarray, neighbor: np.ndarray,
+                   w: np.ndarray) -> tuple:
+    """
+    :param x, y: (n, k) inner points
+    :param starts: first pair of every link with neighbors, pairs are sorted by link
+    :param neighbor: see _neighbor_index()
+    :return: (n, k) x and y sum of the compatibility weighted unit vectors from every inner point to the
+             matching point of each neighbor
+    """
+    fx, fy = np.zeros_like(x), np.zeros_like(y)
+    step = max(CHUNK // x.shape[1], 1)
+    for lo in range(0, len(a), step):
+        hi = min(lo + step, len(a))
+        pa = a[lo:hi]
+        dx = x.ravel()[neighbor[lo:hi]] - x[pa]
+        dy = y.ravel()[neighbor[lo:hi]] - y[pa]
+        dist = np.sqrt(dx * dx + dy * dy)
+        scale = np.divide(w[lo:hi, None], dist, out=np.zeros_like(dist), where=dist > EPS)
+        dx *= scale
+        dy *= scale
+        # pairs are sorted by link, sum the forces of the same link
+        first = starts[(starts >= lo) & (starts < hi)] - lo
+        if len(first) == 0 or first[0] != 0:
+            first = np.concatenate(([0], first))
+        fx[pa[first]] += np.add.reduceat(dx, first, axis=0)
+        fy[pa[first]] += np.add.reduceat(dy, first, axis=0)
+    return fx, fy
+
+
+def bundle(source: np.ndarray, target: np.ndarray, cycles: int = CYCLES, iterations: int = ITERATIONS,
+           step: float = STEP, stiffness: float = STIFFNESS, threshold: float = THRESHOLD,
+           max_neighbors: int = MAX_NEIGHBORS) -> np.ndarray:
+    """
+    :param source, target: (n, 2) endpoints of the links, in any unit
+    :return: (n, 2 ** cycles + 1, 2) polylines in the unit of the endpoints, links without compatible
+             neighbors stay straight
+    """
+    source, target = np.asarray(source, dtype=np.float64), np.asarray(target, dtype=np.float64)
+    n = len(source)
+    if n == 0:
+        return np.zeros((0, 2 ** cycles + 1, 2))
+    # bundle in a SIDE x SIDE box, so that the step and the stiffness do not depend on the unit
+    origin = np.minimum(source.min(axis=0), target.min(axis=0))
+    unit = max(float(np.max(np.maximum(source.max(axis=0), target.max(axis=0)) - origin)) / SIDE, EPS)
+    source, target = (source - origin) / unit, (target - origin) / unit
+    a, b, w, reverse = compatible_pairs(source, target, threshold, max_neighbors)
+    starts = np.flatnonzero(np.concatenate(([True], a[1:] != a[:-1]))) if len(a) else a
+    length = np.maximum(_norm(target - source), EPS)
+    points = np.stack((source, (source + target) / 2, target), axis=1)
+    for cycle in range(cycles):
+        if cycle > 0:
+            points = subdivide(points)
+        # x and y of all points as contiguous arrays, the endpoints are fixed
+        x, y = points[..., 0].copy(), points[..., 1].copy()
+        k = points.shape[1] - 2
+        neighbor = _neighbor_index(a, b, reverse, k)
+        spring = (stiffness / (length * (k + 1)))[:, None]
+        move = step / 2 ** cycle
+        for _ in range(int(round(iterations * (2 / 3) ** cycle))):
+            inner_x, inner_y = x[:, 1:-1].copy(), y[:, 1:-1].copy()
+            fx = spring * (x[:, :-2] + x[:, 2:] - 2 * inner_x)
+            fy = spring * (y[:, :-2] + y[:, 2:] - 2 * inner_y)
+            if len(a):
+                ex, ey = _electrostatic(inner_x, inner_y, a, starts, neighbor, w)
+                fx += ex
+                fy += ey
+            x[:, 1:-1] = inner_x + move * fx
+            y[:, 1:-1] = inner_y + move * fy
+        points = np.stack((x, y), axis=-1)
+    return points * unit + origin
@@ -0,0 +1,156 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Diff of two flow snapshots (flow_data.txt / flow_data_new.txt).
+
+Both snapshots are aligned by the undirected (src, dst) key of every link, like dataHandler() in
+simulation_flow_graph.py: the last record of a key wins and (a, b) is the same link as (b, a).
+Alignment is done on sorted numpy key arrays, millions of rows take seconds and most of it is
+spent parsing the text files.
+
+    diff = diff_flows(load_flow_data("flow_data.txt"), load_flow_data("flow_data_new.txt"))
+    diff.counts()     # {"unchanged": ..., "added": ..., "removed": ..., "increased": ..., "decreased": ...}
+    diff.changed()    # (keys, status) of the links whose load changed, input of dataHandler(link_delta=...)
+
+    $ python flow_diff.py data_source/flow_data.txt data_source/flow_data_new.txt --top 20
+"""
+import argparse
+import logging
+
+import numpy as np
+
+from graph_core import last_occurrence, lookup, undirected_key
+
+logger = logging.getLogger("main")
+
+# link status
+UNCHANGED = 0
+ADDED = 1  # only in the new snapshot
+REMOVED = 2  # only in the old snapshot
+INCREASED = 3
+DECREASED = 4
+STATUS_NAMES = ("unchanged", "added", "removed", "increased", "decreased")
+
+# a link present in both snapshots changed if |new - old| > ABS_TOL + REL_TOL * |old|
+ABS_TOL = 0.0
+REL_TOL = 1e-6
+
+
+class FlowDiff:
+    """
+    Link by link difference of two flow snapshots, all arrays have one entry per link and are sorted by key.
+
+    key:        undirected key of the link, see graph_core.undirected_key()
+    src, dst:   end nodes of the link, src < dst
+    old, new:   link load in each snapshot, nan if the link is missing there
+    abs_delta:  new - old, a missing load counts as 0
+    rel_delta:  abs_delta / |old|, nan if old is missing or 0
+    status:     UNCHANGED, ADDED, REMOVED, INCREASED or DECREASED
+    """
+
+    def __init__(self, key: np.ndarray, old: np.ndarray, new: np.ndarray, status: np.ndarray):
+        self.key = key
+        self.src = key >> 32
+        self.dst = key & 0xFFFFFFFF
+        self.old = old
+        self.new = new
+        self.status = status
+        self.abs_delta = np.nan_to_num(new) - np.nan_to_num(old)
+        self.rel_delta = np.full(len(key), np.nan)
+        np.divide(self.abs_delta, np.abs(old), out=self.rel_delta, where=np.nan_to_num(old) != 0)
+
+    def __len__(self) -> int:
+        return len(self.key)
+
+    def counts(self) -> dict:
+        counts = np.bincount(self.status, minlength=len(STATUS_NAMES))
+        return dict(zip(STATUS_NAMES, counts.tolist()))
+
+    def select(self, *statuses) -> np.ndarray:
+        """
+        :return: indices of the links with one of the given statuses
+        """
+        return np.flatnonzero(np.isin(self.status, statuses))
+
+    def changed(self, include_removed: bool = True) -> tuple:
+        """
+        :param include_removed: False if the new snapshot only holds updates, links missing there are not changes
+        :return: (keys, status) of all links whose status is not UNCHANGED
+        """
+        index = np.flatnonzero((self.status != UNCHANGED) & (include_removed | (self.status != REMOVED)))
+        return self.key[index], self.status[index]
+
+    def top(self, n: int = 10) -> np.ndarray:
+        """
+        :return: indices of the n changed links with the largest |abs_delta|
+        """
+        index = np.flatnonzero(self.status != UNCHANGED)
+        order = np.argsort(-np.abs(self.abs_delta[index]), kind="stable")
+        return index[order[:n]]
+
+    def summary(self) -> str:
+        return ", ".join("{}: {}".format(name, count) for name, count in self.counts().items())
+
+
+def _link_keys(flow_arr: np.ndarray) -> np.ndarray:
+    return undirected_key(flow_arr[:, 0].astype(np.int64), flow_arr[:, 1].astype(np.int64))
+
+
+def _union_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # a and b are sorted and unique: the stable sort (timsort) only merges two runs, much faster than np.union1d
+    keys = np.concatenate((a, b))
+    keys.sort(kind="stable")
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+
+def diff_flows(old_arr: np.ndarray, new_arr: np.ndarray, abs_tol: float = ABS_TOL,
+               rel_tol: float = REL_TOL) -> FlowDiff:
+    """
+    :param old_arr: flow records [src dst src_load dst_load link_val], see load_flow_data()
+    :param new_arr: flow records of the new snapshot
+    :param abs_tol: absolute tolerance of the link load
+    :param rel_tol: tolerance relative to the old link load
+    """
+    old_keys, old_last = last_occurrence(_link_keys(old_arr))
+    new_keys, new_last = last_occurrence(_link_keys(new_arr))
+    keys = _union_sorted(old_keys, new_keys)
+    old, in_old = lookup(keys, old_keys, old_arr[old_last, 4], np.nan)
+    new, in_new = lookup(keys, new_keys, new_arr[new_last, 4], np.nan)
+
+    status = np.full(len(keys), UNCHANGED, dtype=np.uint8)
+    status[in_new & ~in_old] = ADDED
+    status[in_old & ~in_new] = REMOVED
+    both = in_old & in_new
+    delta = new - old
+    tol = abs_tol + rel_tol * np.abs(old)
+    status[both & (delta > tol)] = INCREASED
+    status[both & (delta < -tol)] = DECREASED
+    return FlowDiff(keys, old, new, status)
+
+
+def _load(file: str) -> np.ndarray:
+    arr = np.loadtxt(file, delimiter=" ", ndmin=2).astype(np.float64)
+    return arr if arr.size else np.zeros((0, 5), dtype=np.float64)
+
+
+def diff_files(old_file: str, new_file: str, abs_tol: float = ABS_TOL, rel_tol: float = REL_TOL) -> FlowDiff:
+    logger.info("Diff flow data: {} -> {}".format(old_file, new_file))
+    return diff_flows(_load(old_file), _load(new_file), abs_tol, rel_tol)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="diff of two flow data files")
+    parser.add_argument("old_file")
+    parser.add_argument("new_file")
+    parser.add_argument("--abs-tol", type=float, default=ABS_TOL)
+    parser.add_argument("--rel-tol", type=float, default=REL_TOL)
+    parser.add_argument("--top", type=int, default=10, help="print the n largest changes")
+    args = parser.parse_args()
+
+    result = diff_files(args.old_file, args.new_file, args.abs_tol, args.rel_tol)
+    print(result.summary())
+    print("{:>10}{:>10}{:>16}{:>16}{:>16}{:>10}  {}".format("src", "dst", "old", "new", "delta", "rel", "status"))
+    for i in result.top(args.top):
+        print("{:>10}{:>10}{:>16.2f}{:>16.2f}{:>16.2f}{:>10.2%}  {}".format(
+            result.src[i], result.dst[i], result.old[i], result.new[i], result.abs_delta[i], result.rel_delta[i],
+            STATUS_NAMES[result.status[i]]))
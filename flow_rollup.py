@@ -0,0 +1,408 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Multi-resolution rollups of a flow store (see flow_store.py) for long simulation runs.
+
+Every level cuts the time axis into buckets of `resolution` seconds (bucket = floor(time / resolution) *
+resolution) and keeps, per bucket and per link (link load) or per node (node load):
+    min  max  sum  count        mean = sum / count
+Inside a snapshot the last record of a link or node wins, like dataHandler() and GraphCore.from_table(),
+so count is the number of snapshots of the bucket in which it appears. The finest level is computed from
+the store rows, every coarser level from the level below it (min of min, max of max, sum of sum and count),
+resolutions must be multiples of each other.
+
+A level is stored like the flow store: one file per column sorted by (bucket, id), plus an index sorted
+by id, under <store>/rollup/<kind>_<resolution>/. update() only recomputes the last (open) bucket of each
+level and what was appended after it.
+
+    with FlowStore("run1.store") as store:
+        FlowRollup(store).update()
+    rollup = FlowRollup(FlowStore("run1.store", mode="r"))
+    rollup.series("link", (33, 36), max_points=500)   # finest level with at most 500 buckets in the range
+    rollup.window(3600, 7200)                         # mean loads of the hour as flow records
+
+    $ python flow_rollup.py build run1.store --levels 1 10 60 600
+    $ python flow_rollup.py link run1.store 33 36 --points 500
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+
+from flow_store import FlowStore, append_column, map_column, merge_index, write_column
+from graph_core import lookup, undirected_key
+
+logger = logging.getLogger("main")
+
+ROLLUP_VERSION = 1
+LEVELS = (1.0, 10.0, 60.0, 600.0)  # seconds
+KINDS = ("link", "node")
+LEVEL_COLUMNS = (("bucket", "<f8"), ("id", "<i8"), ("min", "<f8"), ("max", "<f8"), ("sum", "<f8"),
+                 ("count", "<i8"))
+INDEX_COLUMNS = (("index_id", "<i8"), ("index_row", "<i8"))
+STATS = ("min", "max", "mean", "sum", "count")
+# source rows aggregated at once, whole buckets are never split
+CHUNK_ROWS = 4000000
+
+
+def bucket_of(time: np.ndarray, resolution: float) -> np.ndarray:
+    return np.floor(np.asarray(time, dtype=np.float64) / resolution) * resolution
+
+
+def aggregate(bucket: np.ndarray, ident: np.ndarray, mn: np.ndarray, mx: np.ndarray = None, sm: np.ndarray = None,
+              count: np.ndarray = None, snap: np.ndarray = None) -> dict:
+    """
+    Group rows by (bucket, id), input rows are in time order
+    :param mn, mx, sm, count: min, max, sum and count of every row; a raw row only passes its value as mn
+    :param snap: snapshot number of every row, only the last row of an id in a snapshot is kept
+    :return: {column: array} sorted by (bucket, id), see LEVEL_COLUMNS
+    """
+    if len(bucket) == 0:
+        return {name: np.zeros(0, dtype=dtype) for name, dtype in LEVEL_COLUMNS}
+    order = _group_order(bucket, ident)
+    b, i = bucket[order], ident[order]
+    if snap is not None:
+        s = snap[order]
+        last = np.append((b[1:] != b[:-1]) | (i[1:] != i[:-1]) | (s[1:] != s[:-1]), True)
+        order, b, i = order[last], b[last], i[last]
+    starts = np.flatnonzero(np.concatenate(([True], (b[1:] != b[:-1]) | (i[1:] != i[:-1]))))
+    # raw rows pass the same array as min, max and sum
+    mn = mn[order]
+    mx = mn if mx is None else mx[order]
+    sm = mn if sm is None else sm[order]
+    return {
+        "bucket": b[starts],
+        "id": i[starts],
+        "min": np.minimum.reduceat(mn, starts),
+        "max": np.maximum.reduceat(mx, starts),
+        "sum": np.add.reduceat(sm, starts),
+        "count": np.diff(np.append(starts, len(order))) if count is None else np.add.reduceat(count[order], starts),
+    }
+
+
+def _group_order(bucket: np.ndarray, ident: np.ndarray) -> np.ndarray:
+    """
+    Order of the rows by (bucket, id, row), bucket is sorted
+    """
+    n = len(bucket)
+    rank = np.concatenate(([0], np.cumsum(bucket[1:] != bucket[:-1])))
+    # (a << 32) | b link keys are packed to a * (max b + 1) + b, which keeps their order
+    high, low = ident >> 32, ident & 0xFFFFFFFF
+    compact = (high - high.min()) * (int(low.max()) + 1) + low
+    bits = [int(rank[-1]).bit_length(), int(compact.max()).bit_length(), (n - 1).bit_length()]
+    if ident.min() < 0 or sum(bits) > 63:
+        # the stable sort keeps rows of a (bucket, id) group in time order
+        return np.lexsort((ident, bucket))
+    # unique keys: the quicksort is as deterministic as a stable sort and several times faster
+    key = (rank << (bits[1] + bits[2])) | (compact << bits[2]) | np.arange(n)
+    return np.argsort(key)
+
+
+def _chunks(bucket: np.ndarray, starts: np.ndarray, limit: int = CHUNK_ROWS):
+    """
+    Split groups (snapshots or rows) into runs of whole buckets of about limit rows
+    :param bucket: bucket of every group, sorted
+    :param starts: first row of every group, followed by the end row
+    :return: (first group, end group) pairs
+    """
+    bounds = np.concatenate(([0], np.flatnonzero(bucket[1:] != bucket[:-1]) + 1, [len(bucket)]))
+    rows = starts[bounds]
+    i = 0
+    while i < len(bounds) - 1:
+        j = max(int(np.searchsorted(rows, rows[i] + limit, side="right")) - 1, i + 1)
+        yield int(bounds[i]), int(bounds[j])
+        i = j
+
+
+def _series(columns: dict) -> dict:
+    series = {"time": columns["bucket"]}
+    series.update({name: columns[name] for name in ("min", "max", "sum", "count")})
+    series["mean"] = columns["sum"] / np.maximum(columns["count"], 1)
+    return series
+
+
+class RollupLevel:
+    """
+    One level of one kind, read through numpy.memmap
+    """
+
+    def __init__(self, path: str, kind: str, resolution: float, rows: int):
+        self.path = path
+        self.kind = kind
+        self.resolution = resolution
+        self.rows = rows
+
+    def file(self, name: str) -> str:
+        return os.path.join(self.path, name + ".bin")
+
+    def column(self, name: str) -> np.ndarray:
+        return map_column(self.file(name), dict(LEVEL_COLUMNS + INDEX_COLUMNS)[name], self.rows)
+
+    def history(self, ident: int, start: float = -np.inf, stop: float = np.inf) -> dict:
+        """
+        Buckets of one id overlapping [start, stop] in time order
+        :return: {"time", "min", "max", "mean", "sum", "count": arrays}
+        """
+        ids, rows = self.column("index_id"), self.column("index_row")
+        rows = rows[np.searchsorted(ids, ident, side="left"):np.searchsorted(ids, ident, side="right")]
+        bucket = self.column("bucket")[rows]
+        rows = rows[(bucket > start - self.resolution) & (bucket <= stop)]
+        return _series({name: self.column(name)[rows] for name, _ in LEVEL_COLUMNS})
+
+    def window(self, start: float, stop: float) -> dict:
+        """
+        Buckets in [start, stop) merged per id
+        :return: {column: array} sorted by id, see LEVEL_COLUMNS
+        """
+        bucket = self.column("bucket")
+        lo, hi = np.searchsorted(bucket, [start, stop], side="left")
+        part = {name: self.column(name)[lo:hi] for name, _ in LEVEL_COLUMNS}
+        return aggregate(np.zeros(hi - lo), part["id"], part["min"], part["max"], part["sum"], part["count"])
+
+
+class FlowRollup:
+    """
+    :param store: flow store, the rollup can only be updated if it is opened in mode "a"
+    :param levels: resolutions in seconds, default LEVELS; must match the levels of an existing rollup
+    """
+
+    def __init__(self, store: FlowStore, levels: tuple = None):
+        self.store = store
+        self.path = os.path.join(store.path, "rollup")
+        meta_file = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_file):
+            with open(meta_file) as f:
+                self.meta = json.load(f)
+            if self.meta.get("version") != ROLLUP_VERSION:
+                raise ValueError("Unsupported rollup version: {}".format(self.meta.get("version")))
+            if levels is not None and tuple(map(float, levels)) != tuple(self.meta["levels"]):
+                raise ValueError("Rollup of {} has levels {}, not {}".format(
+                    store.path, self.meta["levels"], list(levels)))
+        elif store.mode == "r":
+            raise FileNotFoundError("No rollup in {}, build it with: flow_rollup.py build".format(store.path))
+        else:
+            levels = sorted(map(float, levels or LEVELS))
+            for fine, coarse in zip(levels, levels[1:]):
+                if not float(coarse / fine).is_integer():
+                    raise ValueError("Level {} is not a multiple of level {}".format(coarse, fine))
+            self.meta = {"version": ROLLUP_VERSION, "levels": levels, "source_rows": 0,
+                         "state": {kind: [{"rows": 0, "open": None} for _ in levels] for kind in KINDS}}
+        if store.mode == "r" and self.is_stale():
+            logger.warning("Rollup of {} does not cover the last {} rows, run update()".format(
+                store.path, store.num_rows - self.meta["source_rows"]))
+
+    @property
+    def levels(self) -> list:
+        return self.meta["levels"]
+
+    def is_stale(self) -> bool:
+        return self.meta["source_rows"] != self.store.num_rows
+
+    def level(self, kind: str, resolution: float) -> RollupLevel:
+        if kind not in KINDS:
+            raise ValueError("Unknown kind: {}, expected one of {}".format(kind, KINDS))
+        k = self.levels.index(float(resolution))
+        return RollupLevel(self._dir(kind, resolution), kind, float(resolution), self.meta["state"][kind][k]["rows"])
+
+    # ---------------------------------------------------------------- building
+    def update(self):
+        """
+        Roll up the snapshots appended since the last update
+        """
+        if self.store.mode != "a":
+            raise PermissionError("Flow store {} is opened read-only".format(self.store.path))
+        for kind in KINDS:
+            source = None
+            for k, resolution in enumerate(self.levels):
+                os.makedirs(self._dir(kind, resolution), exist_ok=True)
+                source = self._update_level(kind, k, source)
+        self.meta["source_rows"] = self.store.num_rows
+        self._write_meta()
+        logger.info("Rollup of {}: {}".format(self.store.path, self.info()["levels"]))
+
+    def _update_level(self, kind: str, k: int, source: RollupLevel) -> RollupLevel:
+        state = self.meta["state"][kind][k]
+        level = self.level(kind, self.levels[k])
+        # the open bucket may still get snapshots: it is recomputed with everything after it
+        cut = -np.inf if state["open"] is None else state["open"]
+        keep = int(np.searchsorted(level.column("bucket"), cut, side="left"))
+        parts = self._raw_parts(kind, level.resolution, cut) if source is None else \
+            self._level_parts(source, level.resolution, cut)
+        rows = keep
+        for part in parts:
+            for name, dtype in LEVEL_COLUMNS:
+                append_column(level.file(name), dtype, rows, part[name])
+            rows += len(part["id"])
+        new_ids = map_column(level.file("id"), "<i8", rows)[keep:]
+        ids, index = level.column("index_id"), level.column("index_row")
+        kept = index < keep
+        ids, index = merge_index(ids[kept], index[kept], new_ids, keep)
+        write_column(level.file("index_id"), "<i8", ids)
+        write_column(level.file("index_row"), "<i8", index)
+        state["rows"] = rows
+        state["open"] = float(map_column(level.file("bucket"), "<f8", rows)[-1]) if rows else None
+        return self.level(kind, level.resolution)
+
+    def _raw_parts(self, kind: str, resolution: float, cut: float):
+        store = self.store
+        first = int(np.searchsorted(store.times(), cut, side="left"))
+        snap_bucket = bucket_of(store.times()[first:], resolution)
+        starts = np.append(store.snapshot_starts()[first:], store.num_rows)
+        for a, b in _chunks(snap_bucket, starts):
+            lo, hi = int(starts[a]), int(starts[b])
+            counts = np.diff(starts[a:b + 1])
+            snap = np.repeat(np.arange(a, b), counts)
+            bucket = np.repeat(snap_bucket[a:b], counts)
+            src = store.column("src")[lo:hi].astype(np.int64)
+            dst = store.column("dst")[lo:hi].astype(np.int64)
+            if kind == "link":
+                ident = undirected_key(src, dst)
+                value = np.asarray(store.column("link_load")[lo:hi])
+            else:
+                # start node then end node of each record, like GraphCore.from_table()
+                ident = np.column_stack((src, dst)).ravel()
+                value = np.column_stack((store.column("src_load")[lo:hi], store.column("dst_load")[lo:hi])).ravel()
+                snap, bucket = np.repeat(snap, 2), np.repeat(bucket, 2)
+            yield aggregate(bucket, ident, value, snap=snap)
+
+    def _level_parts(self, source: RollupLevel, resolution: float, cut: float):
+        source_bucket = source.column("bucket")
+        first = int(np.searchsorted(source_bucket, cut, side="left"))
+        bucket = bucket_of(source_bucket[first:], resolution)
+        for a, b in _chunks(bucket, np.arange(first, source.rows + 1)):
+            part = {name: source.column(name)[first + a:first + b] for name, _ in LEVEL_COLUMNS}
+            yield aggregate(bucket[a:b], part["id"], part["min"], part["max"], part["sum"], part["count"])
+
+    # ---------------------------------------------------------------- queries
+    def choose(self, start: float = -np.inf, stop: float = np.inf, max_points: int = 1000) -> float:
+        """
+        Level of a time series: the finest level with at most max_points buckets in [start, stop],
+        the coarsest level if none is coarse enough
+        :return: resolution of the level
+        """
+        times = self.store.times()
+        if len(times):
+            start, stop = max(start, times[0]), min(stop, times[-1])
+        for resolution in self.levels:
+            if np.floor(stop / resolution) - np.floor(start / resolution) + 1 <= max_points:
+                return resolution
+        return self.levels[-1]
+
+    def series(self, kind: str, ident, start: float = -np.inf, stop: float = np.inf, max_points: int = 1000,
+               resolution: float = None) -> dict:
+        """
+        :param kind: "link" or "node"
+        :param ident: (a, b) of a link, or a node id
+        :param resolution: level to read, default choose(start, stop, max_points)
+        :return: {"resolution", "time", "min", "max", "mean", "sum", "count"}
+        """
+        if kind == "link":
+            ident = int(undirected_key(np.int64(ident[0]), np.int64(ident[1])))
+        resolution = self.choose(start, stop, max_points) if resolution is None else resolution
+        series = self.level(kind, resolution).history(int(ident), start, stop)
+        series["resolution"] = resolution
+        return series
+
+    def window_level(self, start: float, stop: float) -> float:
+        """
+        Level of a time window: the coarsest level whose buckets start at start and at stop,
+        the finest level if none does (the window is then widened to its buckets)
+        """
+        for resolution in reversed(self.levels):
+            if all(np.isinf(t) or t % resolution == 0 for t in (start, stop)):
+                return resolution
+        return self.levels[0]
+
+    def window(self, start: float = -np.inf, stop: float = np.inf, stat: str = "mean",
+               resolution: float = None) -> np.ndarray:
+        """
+        Flow records of a time window, each link and node load is the stat of its loads in [start, stop)
+        :param stat: one of STATS
+        :param resolution: level to read, default window_level(start, stop)
+        :return: [src dst src_load dst_load link_val] rows like load_flow_data(), sorted by link
+        """
+        if stat not in STATS:
+            raise ValueError("Unknown stat: {}, expected one of {}".format(stat, STATS))
+        resolution = self.window_level(start, stop) if resolution is None else resolution
+        start, stop = bucket_of(start, resolution), np.ceil(stop / resolution) * resolution
+        links = self.level("link", resolution).window(start, stop)
+        nodes = self.level("node", resolution).window(start, stop)
+        node_load = _series(nodes)[stat]
+        src, dst = links["id"] >> 32, links["id"] & 0xFFFFFFFF
+        src_load, _ = lookup(src, nodes["id"], node_load, 0.0)
+        dst_load, _ = lookup(dst, nodes["id"], node_load, 0.0)
+        return np.column_stack((src, dst, src_load, dst_load, _series(links)[stat])).astype(np.float64)
+
+    def frames(self, start: float = -np.inf, stop: float = np.inf, max_frames: int = 100) -> tuple:
+        """
+        Buckets of the finest level with at most max_frames buckets in [start, stop]
+        :return: (resolution, bucket times)
+        """
+        resolution = self.choose(start, stop, max_frames)
+        bucket = self.level("link", resolution).column("bucket")
+        times = np.unique(bucket[(bucket > start - resolution) & (bucket <= stop)])
+        return resolution, times
+
+    def info(self) -> dict:
+        return {
+            "path": self.path,
+            "source_rows": self.meta["source_rows"],
+            "stale": self.is_stale(),
+            "levels": {"{}_{:g}".format(kind, resolution): self.meta["state"][kind][k]["rows"]
+                       for kind in KINDS for k, resolution in enumerate(self.levels)},
+        }
+
+    def _dir(self, kind: str, resolution: float) -> str:
+        return os.path.join(self.path, "{}_{:g}".format(kind, resolution))
+
+    def _write_meta(self):
+        meta_file = os.path.join(self.path, "meta.json")
+        with open(meta_file + ".tmp", "w") as f:
+            json.dump(self.meta, f)
+        os.replace(meta_file + ".tmp", meta_file)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="multi-resolution rollups of a flow store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="create or update the rollup of a store")
+    p.add_argument("store")
+    p.add_argument("--levels", type=float, nargs="+", help="resolutions in seconds (default: {})".format(LEVELS))
+    p = sub.add_parser("info")
+    p.add_argument("store")
+    for kind, ids in (("link", ("src", "dst")), ("node", ("node",))):
+        p = sub.add_parser(kind, help="time series of one {}".format(kind))
+        p.add_argument("store")
+        for name in ids:
+            p.add_argument(name, type=int)
+        p.add_argument("--start", type=float, default=-np.inf)
+        p.add_argument("--stop", type=float, default=np.inf)
+        p.add_argument("--points", type=int, default=1000, help="point budget, picks the level")
+    p = sub.add_parser("window", help="flow records of a time window")
+    p.add_argument("store")
+    p.add_argument("start", type=float)
+    p.add_argument("stop", type=float)
+    p.add_argument("--stat", choices=STATS, default="mean")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        with FlowStore(args.store) as flow_store:
+            rollup = FlowRollup(flow_store, args.levels)
+            rollup.update()
+            print(json.dumps(rollup.info(), indent=4))
+    else:
+        rollup = FlowRollup(FlowStore(args.store, mode="r"))
+        if args.command == "info":
+            print(json.dumps(rollup.info(), indent=4))
+        elif args.command == "window":
+            np.savetxt(sys.stdout, rollup.window(args.start, args.stop, args.stat), fmt="%d %d %.17g %.17g %.17g")
+        else:
+            ident = (args.src, args.dst) if args.command == "link" else args.node
+            series = rollup.series(args.command, ident, args.start, args.stop, args.points)
+            print("# resolution: {:g}s".format(series["resolution"]))
+            print("time min max mean sum count")
+            for row in zip(*(series[name].tolist() for name in ("time", "min", "max", "mean", "sum", "count"))):
+                print("{} {} {} {} {} {}".format(*row))
@@ -0,0 +1,359 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Append-only store of timestamped flow snapshots (flow_data.txt files of one simulation).
+
+Every record of every snapshot is one row of fixed-width little-endian columns, one file per column:
+    time.f8  src.i4  dst.i4  src_load.f8  dst_load.f8  link_load.f8
+plus the snapshot table (snap_time.f8, snap_start.i8: first row of each snapshot) and a per-link
+index (index_key.i8, index_row.i8: rows sorted by the undirected link key, see graph_core.undirected_key).
+meta.json holds the number of committed rows, files are read through numpy.memmap so a query only
+touches the pages it needs.
+
+Snapshots are appended in time order. Column files are appended first and meta.json is replaced
+afterwards, bytes past the committed rows (an interrupted append) are cut on the next append.
+
+    with FlowStore("run1.store") as store:
+        store.ingest_dir("flows/")                  # flow_data_<time>.txt files
+    store = FlowStore("run1.store", mode="r")
+    store.link_history(33, 36)                       # {"time": ..., "src_load": ..., ...}
+    store.state_at(120.0)                            # [src dst src_load dst_load link_val] rows
+
+    $ python flow_store.py ingest run1.store flows/*.txt
+    $ python flow_store.py history run1.store 33 36
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sys
+
+import numpy as np
+
+from graph_core import undirected_key
+
+logger = logging.getLogger("main")
+
+STORE_VERSION = 1
+COLUMNS = (("time", "<f8"), ("src", "<i4"), ("dst", "<i4"), ("src_load", "<f8"), ("dst_load", "<f8"),
+           ("link_load", "<f8"))
+SNAPSHOT_COLUMNS = (("snap_time", "<f8"), ("snap_start", "<i8"))
+INDEX_COLUMNS = (("index_key", "<i8"), ("index_row", "<i8"))
+# last number of a file name is its time: flow_data_120.txt, flow_1700000000.5.txt
+TIME_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(?!.*\d)")
+
+
+def map_column(file: str, dtype: str, length: int) -> np.ndarray:
+    """
+    Read-only memory map of the first length items of a column file
+    """
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(file, dtype=dtype, mode="r", shape=(length,))
+
+
+def append_column(file: str, dtype: str, committed: int, values):
+    """
+    Append values after the first committed items of a column file
+    """
+    with open(file, "ab") as f:
+        # drop what an interrupted append left after the committed items
+        f.truncate(committed * np.dtype(dtype).itemsize)
+        f.seek(0, os.SEEK_END)
+        np.asarray(values).astype(dtype).tofile(f)
+
+
+def write_column(file: str, dtype: str, values):
+    """
+    Replace a column file atomically, readers keep mapping the old file until they reopen it
+    """
+    np.asarray(values).astype(dtype).tofile(file + ".tmp")
+    os.replace(file + ".tmp", file)
+
+
+def merge_index(keys: np.ndarray, rows: np.ndarray, new_keys: np.ndarray, first_row: int) -> tuple:
+    """
+    Add rows first_row, first_row + 1, ... with keys new_keys to a (keys, rows) index sorted by key
+    :return: (keys, rows), rows of a key stay in row order
+    """
+    order = np.argsort(new_keys, kind="stable")
+    keys = np.concatenate((keys, new_keys[order]))
+    rows = np.concatenate((rows, first_row + order.astype(np.int64)))
+    # both parts are sorted: the stable sort only merges two runs
+    order = np.argsort(keys, kind="stable")
+    return keys[order], rows[order]
+
+
+def time_from_name(file: str) -> float:
+    match = TIME_PATTERN.search(os.path.basename(file))
+    if match is None:
+        raise ValueError("No time in file name: {}".format(file))
+    return float(match.group(1))
+
+
+class FlowStore:
+    """
+    :param path: store directory, created in mode "a"
+    :param mode: "a" append and query, "r" query only
+    """
+
+    def __init__(self, path: str, mode: str = "a"):
+        if mode not in ("a", "r"):
+            raise ValueError("Unknown mode: {}, expected 'a' or 'r'".format(mode))
+        self.path = path
+        self.mode = mode
+        meta_file = os.path.join(path, "meta.json")
+        if os.path.exists(meta_file):
+            with open(meta_file) as f:
+                self.meta = json.load(f)
+            if self.meta.get("version") != STORE_VERSION:
+                raise ValueError("Unsupported store version: {}".format(self.meta.get("version")))
+        elif mode == "r":
+            raise FileNotFoundError("No flow store in {}".format(path))
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.meta = {"version": STORE_VERSION, "rows": 0, "snapshots": 0, "indexed_rows": 0}
+            self._write_meta()
+        self._maps = {}
+        self._memory_index = None  # (num_rows, keys, rows) of a read-only store with a stale index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.mode == "a":
+            self.flush()
+        self._maps = {}
+        self._memory_index = None
+
+    @property
+    def num_rows(self) -> int:
+        return self.meta["rows"]
+
+    @property
+    def num_snapshots(self) -> int:
+        return self.meta["snapshots"]
+
+    # ---------------------------------------------------------------- writing
+    def append(self, time: float, flow_arr: np.ndarray) -> int:
+        """
+        Append one snapshot
+        :param time: time of the snapshot, not smaller than the last one
+        :param flow_arr: [src dst src_load dst_load link_val] rows, see load_flow_data()
+        :return: number of the snapshot
+        """
+        self._check_writable()
+        times = self.times()
+        if len(times) and time < times[-1]:
+            raise ValueError("Snapshot time {} is older than the last snapshot {}".format(time, times[-1]))
+        flow_arr = np.asarray(flow_arr, dtype=np.float64).reshape(-1, 5)
+        n = len(flow_arr)
+        columns = {
+            "time": np.full(n, time),
+            "src": flow_arr[:, 0],
+            "dst": flow_arr[:, 1],
+            "src_load": flow_arr[:, 2],
+            "dst_load": flow_arr[:, 3],
+            "link_load": flow_arr[:, 4],
+        }
+        for name, dtype in COLUMNS:
+            self._append_column(name, dtype, self.num_rows, columns[name])
+        self._append_column("snap_time", "<f8", self.num_snapshots, [time])
+        self._append_column("snap_start", "<i8", self.num_snapshots, [self.num_rows])
+        self.meta["rows"] += n
+        self.meta["snapshots"] += 1
+        self._write_meta()
+        self._maps = {}
+        return self.num_snapshots - 1
+
+    def ingest_file(self, file: str, time: float = None) -> int:
+        """
+        :param time: default is the last number of the file name, see time_from_name()
+        """
+        if time is None:
+            time = time_from_name(file)
+        arr = np.loadtxt(file, delimiter=" ", ndmin=2)
+        return self.append(time, arr if arr.size else np.zeros((0, 5)))
+
+    def ingest_dir(self, directory: str, pattern: str = "*.txt") -> int:
+        """
+        Ingest every file matching pattern in time order, files older than the last snapshot are skipped
+        :return: number of snapshots ingested
+        """
+        files = sorted(glob.glob(os.path.join(directory, pattern)), key=time_from_name)
+        last = self.times()[-1] if self.num_snapshots else -np.inf
+        count = 0
+        for file in files:
+            if time_from_name(file) <= last:
+                continue
+            self.ingest_file(file)
+            count += 1
+        logger.info("Ingested {} snapshots from {}".format(count, directory))
+        return count
+
+    def flush(self):
+        """
+        Bring the per-link index up to date with the appended rows
+        """
+        self._check_writable()
+        indexed = self.meta["indexed_rows"]
+        if indexed == self.num_rows:
+            return
+        keys, rows = merge_index(self._column("index_key", indexed), self._column("index_row", indexed),
+                                 self._keys(indexed, self.num_rows), indexed)
+        self._maps = {}
+        for (name, dtype), values in zip(INDEX_COLUMNS, (keys, rows)):
+            write_column(self._file(name), dtype, values)
+        self.meta["indexed_rows"] = self.num_rows
+        self._write_meta()
+
+    # ---------------------------------------------------------------- reading
+    def column(self, name: str) -> np.ndarray:
+        """
+        Read-only memory map of a data column, see COLUMNS
+        """
+        return self._column(name, self.num_rows)
+
+    def times(self) -> np.ndarray:
+        return self._column("snap_time", self.num_snapshots)
+
+    def snapshot_starts(self) -> np.ndarray:
+        """
+        :return: first row of every snapshot
+        """
+        return self._column("snap_start", self.num_snapshots)
+
+    def snapshot_at(self, time: float) -> int:
+        """
+        :return: number of the last snapshot taken at or before time, -1 if there is none
+        """
+        return int(np.searchsorted(self.times(), time, side="right")) - 1
+
+    def snapshot(self, number: int) -> np.ndarray:
+        """
+        :return: [src dst src_load dst_load link_val] rows of the snapshot, like load_flow_data()
+        """
+        if not 0 <= number < self.num_snapshots:
+            raise IndexError("Snapshot {} out of range (0 ~ {})".format(number, self.num_snapshots - 1))
+        starts = self.snapshot_starts()
+        start = int(starts[number])
+        stop = int(starts[number + 1]) if number + 1 < self.num_snapshots else self.num_rows
+        return np.column_stack([self.column(name)[start:stop] for name, _ in COLUMNS[1:]]).astype(np.float64)
+
+    def state_at(self, time: float) -> np.ndarray:
+        """
+        :return: rows of the snapshot in force at time, empty before the first snapshot
+        """
+        number = self.snapshot_at(time)
+        return self.snapshot(number) if number >= 0 else np.zeros((0, 5), dtype=np.float64)
+
+    def link_history(self, a: int, b: int, start: float = -np.inf, stop: float = np.inf) -> dict:
+        """
+        All records of the link (a, b) or (b, a) in time order
+        :param start, stop: time range [start, stop]
+        :return: {"time", "src", "dst", "src_load", "dst_load", "link_load": arrays}
+        """
+        keys, rows = self._index()
+        key = undirected_key(np.int64(a), np.int64(b))
+        rows = rows[np.searchsorted(keys, key, side="left"):np.searchsorted(keys, key, side="right")]
+        history = {name: self.column(name)[rows] for name, _ in COLUMNS}
+        keep = (history["time"] >= start) & (history["time"] <= stop)
+        return {name: values[keep] for name, values in history.items()}
+
+    def info(self) -> dict:
+        times = self.times()
+        return {
+            "path": self.path,
+            "rows": self.num_rows,
+            "snapshots": self.num_snapshots,
+            "first_time": float(times[0]) if len(times) else None,
+            "last_time": float(times[-1]) if len(times) else None,
+            "indexed_rows": self.meta["indexed_rows"],
+            "bytes": sum(os.path.getsize(os.path.join(self.path, f)) for f in os.listdir(self.path)),
+        }
+
+    # ---------------------------------------------------------------- internals
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name + ".bin")
+
+    def _dtype(self, name: str) -> str:
+        return dict(COLUMNS + SNAPSHOT_COLUMNS + INDEX_COLUMNS)[name]
+
+    def _column(self, name: str, length: int) -> np.ndarray:
+        if length == 0:
+            return np.zeros(0, dtype=self._dtype(name))
+        cached = self._maps.get(name)
+        if cached is None or len(cached) != length:
+            cached = map_column(self._file(name), self._dtype(name), length)
+            self._maps[name] = cached
+        return cached
+
+    def _append_column(self, name: str, dtype: str, committed: int, values):
+        append_column(self._file(name), dtype, committed, values)
+
+    def _keys(self, start: int, stop: int) -> np.ndarray:
+        src = self.column("src")[start:stop].astype(np.int64)
+        dst = self.column("dst")[start:stop].astype(np.int64)
+        return undirected_key(src, dst)
+
+    def _index(self) -> tuple:
+        if self.meta["indexed_rows"] != self.num_rows:
+            if self.mode == "a":
+                self.flush()
+            else:
+                # read-only store with a stale index: index in memory, sorted once per number of rows
+                if self._memory_index is None or self._memory_index[0] != self.num_rows:
+                    keys = self._keys(0, self.num_rows)
+                    rows = np.argsort(keys, kind="stable")
+                    self._memory_index = (self.num_rows, keys[rows], rows)
+                return self._memory_index[1:]
+        return self._column("index_key", self.num_rows), self._column("index_row", self.num_rows)
+
+    def _check_writable(self):
+        if self.mode != "a":
+            raise PermissionError("Flow store {} is opened read-only".format(self.path))
+
+    def _write_meta(self):
+        meta_file = os.path.join(self.path, "meta.json")
+        with open(meta_file + ".tmp", "w") as f:
+            json.dump(self.meta, f)
+        os.replace(meta_file + ".tmp", meta_file)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="flow snapshot store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("ingest", help="append flow files, their time is the last number of the file name")
+    p.add_argument("store")
+    p.add_argument("files", nargs="+")
+    p = sub.add_parser("info")
+    p.add_argument("store")
+    p = sub.add_parser("history", help="history of one link")
+    p.add_argument("store")
+    p.add_argument("src", type=int)
+    p.add_argument("dst", type=int)
+    p = sub.add_parser("state", help="flow records in force at a time")
+    p.add_argument("store")
+    p.add_argument("time", type=float)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        with FlowStore(args.store) as store:
+            for name in sorted(args.files, key=time_from_name):
+                store.ingest_file(name)
+            print(json.dumps(store.info(), indent=4))
+    else:
+        store = FlowStore(args.store, mode="r")
+        if args.command == "info":
+            print(json.dumps(store.info(), indent=4))
+        elif args.command == "history":
+            history = store.link_history(args.src, args.dst)
+            for row in zip(*(history[name].tolist() for name, _ in COLUMNS)):
+                print("{} {} {} {} {} {}".format(*row))
+        else:
+            np.savetxt(sys.stdout, store.state_at(args.time), fmt="%d %d %.17g %.17g %.17g")
@@ -0,0 +1,164 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+import numpy as np
+
+# 整合之后的数据表: 一行对应拓扑中的一条边
+TABLE_DTYPE = np.dtype([
+    ("src", np.int32),  # Node1
+    ("dst", np.int32),  # Node2
+    ("src_as", np.int16),  # Community1
+    ("dst_as", np.int16),  # Community2
+    ("src_load", np.float64),  # load_val1
+    ("dst_load", np.float64),  # load_val2
+    ("link_val", np.float64),
+    ("flag", np.uint8),  # {0: 普通记录, 1: flow_data记录, 2: flow_data_new中有变化的记录}
+    ("delta", np.uint8),  # flag为2时的变化类型, 见 flow_diff.STATUS_NAMES
+    ("delay", np.float64),  # 拓扑文件中的链路时延, 没有时为 nan
+    ("capacity", np.float64),  # 拓扑文件中的链路容量, 没有时为 nan
+    ("util", np.float64),  # 利用率 link_val / capacity, 没有容量时为 nan
+])
+
+
+def undirected_key(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """
+    int64 key of a link which does not depend on its direction: (min << 32) | max
+    """
+    return (np.minimum(src, dst) << 32) | np.maximum(src, dst)
+
+
+def last_occurrence(keys: np.ndarray) -> tuple:
+    """
+    :return: (sorted unique keys, index of the last appearance of each key in keys)
+    """
+    uniq, last_rev = np.unique(keys[::-1], return_index=True)
+    return uniq, len(keys) - 1 - last_rev
+
+
+def lookup(keys: np.ndarray, table_keys: np.ndarray, table_values: np.ndarray, default) -> tuple:
+    """
+    Vectorized dict lookup: table_values[table_keys == key] for every key
+    :return: (values, found mask)
+    """
+    values = np.full(len(keys), default, dtype=table_values.dtype)
+    if len(table_keys) == 0:
+        return values, np.zeros(len(keys), dtype=bool)
+    order = np.argsort(table_keys, kind="stable")
+    sorted_keys = table_keys[order]
+    pos = np.clip(np.searchsorted(sorted_keys, keys), 0, len(sorted_keys) - 1)
+    found = sorted_keys[pos] == keys
+    values[found] = table_values[order[pos[found]]]
+    return values, found
+
+
+class GraphCore:
+    """
+    Integer-indexed graph built once from the merged data table.
+    Node ids are remapped to a dense int32 index (in order of first appearance in the table),
+    node attributes and the edge list live in contiguous arrays.
+
+    Node arrays (length num_nodes): node_id, load, as_id, type, ctrl, x, y, has_layout
+    Edge arrays (length num_edges): src, dst (dense index), link_val, flag, delta, util
+    """
+
+    def __init__(self, node_id: np.ndarray, load: np.ndarray, as_id: np.ndarray, src: np.ndarray,
+                 dst: np.ndarray, link_val: np.ndarray, flag: np.ndarray, max_load: float,
+                 delta: np.ndarray = None, util: np.ndarray = None):
+        self.node_id = node_id
+        self.load = load
+        self.as_id = as_id
+        self.src = src
+        self.dst = dst
+        self.link_val = link_val
+        self.flag = flag
+        self.delta = np.zeros(len(flag), dtype=np.uint8) if delta is None else delta
+        self.util = np.full(len(flag), np.nan) if util is None else util
+        self.max_load = max_load
+        n = len(node_id)
+        self.type = np.zeros(n, dtype=np.int8)
+        self.ctrl = np.zeros(n, dtype=np.int16)
+        self.x = np.full(n, np.nan)
+        self.y = np.full(n, np.nan)
+        self.has_layout = np.zeros(n, dtype=bool)
+
+    @classmethod
+    def from_table(cls, all_data: np.ndarray, type_data: dict = None, layout_data: dict = None) -> "GraphCore":
+        """
+        :param all_data: 整合之后的数据表, dtype 为 TABLE_DTYPE
+        :param type_data: {NodeID(str): type}, see load_type_data()
+        :param layout_data: {NodeID(str): (x, y, ctrl)}, see load_axis_to_dict()
+        """
+        # row-major ravel keeps the original visiting order: start node then end node of each line
+        ids = np.column_stack((all_data["src"], all_data["dst"])).ravel()
+        vals = np.column_stack((all_data["src_load"], all_data["dst_load"])).ravel()
+        cats = np.column_stack((all_data["src_as"], all_data["dst_as"])).ravel()
+        uniq, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+        # a node keeps the attributes of its last appearance
+        _, last = last_occurrence(ids)
+        order = np.argsort(first, kind="stable")
+        rank = np.empty(len(uniq), dtype=np.int32)
+        rank[order] = np.arange(len(uniq), dtype=np.int32)
+        edge_index = rank[inverse.reshape(-1)]
+        core = cls(node_id=uniq[order].astype(np.int32),
+                   load=vals[last][order],
+                   as_id=cats[last][order].astype(np.int16),
+                   src=edge_index[0::2],
+                   dst=edge_index[1::2],
+                   link_val=all_data["link_val"],
+                   flag=all_data["flag"],
+                   max_load=float(vals.max()) if len(vals) else 0.0,
+                   delta=all_data["delta"],
+                   util=all_data["util"])
+        if type_data:
+            core.set_types(type_data)
+        if layout_data:
+            core.set_layout(layout_data)
+        return core
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_id)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.src)
+
+    def set_types(self, type_data: dict):
+        keys = [k for k in type_data if k.isdigit()]
+        table_keys = np.array(keys, dtype=np.int64)
+        table_values = np.array([type_data[k] for k in keys], dtype=np.int8)
+        self.type, _ = lookup(self.node_id, table_keys, table_values, 0)
+
+    def set_layout(self, layout_data: dict):
+        table_keys = np.array(list(layout_data.keys()), dtype=np.int64)
+        table = np.array(list(layout_data.values()), dtype=np.float64).reshape(-1, 3)
+        self.x, self.has_layout = lookup(self.node_id, table_keys, table[:, 0], np.nan)
+        self.y, _ = lookup(self.node_id, table_keys, table[:, 1], np.nan)
+        ctrl, _ = lookup(self.node_id, table_keys, table[:, 2], 0)
+        self.ctrl = ctrl.astype(np.int16)
+
+    def symbol_sizes(self, normal_size: float) -> np.ndarray:
+        """
+        节点大小控制在一倍的normal_size - 两倍的normal_size之间，特殊节点再放大1.2倍
+        """
+        max_load = self.max_load or 1.0
+        sizes = normal_size + self.load / max_load * normal_size * 0.8
+        sizes[self.type > 0] *= 1.2
+        return sizes
+
+    def util_percentile(self) -> np.ndarray:
+        """
+        利用率在所有有流量的边中的百分位 (0 ~ 1, 利用率不超过它的边所占的比例),
+        没有流量或没有容量的边为 nan
+        """
+        loaded = self.util > 0
+        ranked = np.sort(self.util[loaded])
+        percentile = np.full(self.num_edges, np.nan)
+        percentile[loaded] = np.searchsorted(ranked, self.util[loaded], side="right") / max(len(ranked), 1)
+        return percentile
+
+    def categories(self) -> np.ndarray:
+        return np.unique(self.as_id)
+
+    def count_by_category(self) -> dict:
+        cats, counts = np.unique(self.as_id, return_counts=True)
+        return dict(zip(cats.tolist(), counts.tolist()))
@@ -0,0 +1,145 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("main")
+
+# SIM_PROFILER=cprofile|pyinstrument wraps the whole run with a sampling / tracing profiler,
+# the report is written to SIM_PROFILE_DIR (default: current directory)
+PROFILER_ENV = "SIM_PROFILER"
+PROFILE_DIR_ENV = "SIM_PROFILE_DIR"
+
+
+def peak_rss_kb() -> int:
+    """
+    Peak resident set size of this process in KB, None if not available
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+class StageProfiler:
+    """
+    Per-stage metrics of a run: wall time, CPU time, peak RSS delta and output bytes.
+
+        profiler = StageProfiler()
+        with profiler.stage("load") as rec:
+            data = load(...)
+            rec["bytes"] = data.nbytes
+
+    A stage entered several times is accumulated under the same name.
+    peak_rss_delta_kb is how much the stage raised the peak RSS of the process, it is 0 when the stage
+    stays below an earlier peak.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        record = {}
+        if not self.enabled:
+            yield record
+            return
+        rss0 = peak_rss_kb()
+        cpu0 = time.process_time()
+        wall0 = time.perf_counter()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.process_time() - cpu0
+            rss1 = peak_rss_kb()
+            total = self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                                  "peak_rss_delta_kb": 0, "bytes": 0})
+            total["calls"] += 1
+            total["wall_s"] += wall
+            total["cpu_s"] += cpu
+            if rss0 is not None:
+                total["peak_rss_delta_kb"] += rss1 - rss0
+            for key, value in record.items():
+                total[key] = total.get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        stages = {name: dict(stage) for name, stage in self.stages.items()}
+        return {
+            "stages": stages,
+            "total": {
+                "wall_s": sum(s["wall_s"] for s in stages.values()),
+                "cpu_s": sum(s["cpu_s"] for s in stages.values()),
+                "peak_rss_kb": peak_rss_kb(),
+            },
+        }
+
+    def to_json(self, file: str = None, **kwargs) -> str:
+        """
+        :param file: also write the json to file if given
+        """
+        text = json.dumps(self.to_dict(), **kwargs)
+        if file:
+            with open(file, "w") as f:
+                f.write(text)
+        return text
+
+    def report(self) -> str:
+        lines = ["{:<12}{:>10}{:>10}{:>14}{:>14}".format("stage", "wall(s)", "cpu(s)", "rss+(KB)", "bytes")]
+        for name, s in self.stages.items():
+            lines.append("{:<12}{:>10.3f}{:>10.3f}{:>14}{:>14}".format(name, s["wall_s"], s["cpu_s"],
+                                                                       s["peak_rss_delta_kb"], s["bytes"]))
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile_hook(name: str):
+    """
+    Run the block under cProfile or pyinstrument if SIM_PROFILER is set.
+    cProfile stats are written to <SIM_PROFILE_DIR>/<name>.prof (view with `python -m pstats` or snakeviz),
+    pyinstrument reports to <SIM_PROFILE_DIR>/<name>.html
+    """
+    kind = os.environ.get(PROFILER_ENV, "").lower()
+    if not kind:
+        yield
+        return
+    out_dir = os.environ.get(PROFILE_DIR_ENV) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, name)
+    if kind == "cprofile":
+        import cProfile
+
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(base + ".prof")
+            logger.info("cProfile stats saved in {}".format(base + ".prof"))
+    elif kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("Please install pyinstrument for {}=pyinstrument".format(PROFILER_ENV))
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            with open(base + ".html", "w", encoding="utf-8") as f:
+                f.write(prof.output_html())
+            logger.info("pyinstrument report saved in {}".format(base + ".html"))
+    else:
+        raise ValueError("Unknown profiler: {}, expected 'cprofile' or 'pyinstrument'".format(kind))
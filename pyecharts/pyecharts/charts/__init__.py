@@ -1,44 +1,63 @@
-# basic Charts
-from ..charts.basic_charts.bar import Bar
-from ..charts.basic_charts.bmap import BMap
-from ..charts.basic_charts.boxplot import Boxplot
-from ..charts.basic_charts.calendar import Calendar
-from ..charts.basic_charts.effectscatter import EffectScatter
-from ..charts.basic_charts.funnel import Funnel
-from ..charts.basic_charts.gauge import Gauge
-from ..charts.basic_charts.geo import Geo
-from ..charts.basic_charts.graph import Graph
-from ..charts.basic_charts.heatmap import HeatMap
-from ..charts.basic_charts.kline import Kline
-from ..charts.basic_charts.line import Line
-from ..charts.basic_charts.liquid import Liquid
-from ..charts.basic_charts.map import Map
-from ..charts.basic_charts.parallel import Parallel
-from ..charts.basic_charts.pictorialbar import PictorialBar
-from ..charts.basic_charts.pie import Pie
-from ..charts.basic_charts.polar import Polar
-from ..charts.basic_charts.radar import Radar
-from ..charts.basic_charts.sankey import Sankey
-from ..charts.basic_charts.scatter import Scatter
-from ..charts.basic_charts.sunburst import Sunburst
-from ..charts.basic_charts.themeriver import ThemeRiver
-from ..charts.basic_charts.tree import Tree
-from ..charts.basic_charts.treemap import TreeMap
-from ..charts.basic_charts.wordcloud import WordCloud
+import importlib
 
-# Composite Charts
-from ..charts.composite_charts.grid import Grid
-from ..charts.composite_charts.page import Page
-from ..charts.composite_charts.tab import Tab
-from ..charts.composite_charts.timeline import Timeline
+# Chart classes are imported on first access (PEP 562), so `from pyecharts.charts
+# import Graph` only loads the Graph module instead of every chart module.
+# name: (module path relative to this package, class name)
+_LAZY_CHARTS = {
+    # basic Charts
+    "Bar": ("basic_charts.bar", "Bar"),
+    "BMap": ("basic_charts.bmap", "BMap"),
+    "Boxplot": ("basic_charts.boxplot", "Boxplot"),
+    "Calendar": ("basic_charts.calendar", "Calendar"),
+    "EffectScatter": ("basic_charts.effectscatter", "EffectScatter"),
+    "Funnel": ("basic_charts.funnel", "Funnel"),
+    "Gauge": ("basic_charts.gauge", "Gauge"),
+    "Geo": ("basic_charts.geo", "Geo"),
+    "Graph": ("basic_charts.graph", "Graph"),
+    "HeatMap": ("basic_charts.heatmap", "HeatMap"),
+    "Kline": ("basic_charts.kline", "Kline"),
+    "Line": ("basic_charts.line", "Line"),
+    "Liquid": ("basic_charts.liquid", "Liquid"),
+    "Map": ("basic_charts.map", "Map"),
+    "Parallel": ("basic_charts.parallel", "Parallel"),
+    "PictorialBar": ("basic_charts.pictorialbar", "PictorialBar"),
+    "Pie": ("basic_charts.pie", "Pie"),
+    "Polar": ("basic_charts.polar", "Polar"),
+    "Radar": ("basic_charts.radar", "Radar"),
+    "Sankey": ("basic_charts.sankey", "Sankey"),
+    "Scatter": ("basic_charts.scatter", "Scatter"),
+    "Sunburst": ("basic_charts.sunburst", "Sunburst"),
+    "ThemeRiver": ("basic_charts.themeriver", "ThemeRiver"),
+    "Tree": ("basic_charts.tree", "Tree"),
+    "TreeMap": ("basic_charts.treemap", "TreeMap"),
+    "WordCloud": ("basic_charts.wordcloud", "WordCloud"),
+    # Composite Charts
+    "Grid": ("composite_charts.grid", "Grid"),
+    "Page": ("composite_charts.page", "Page"),
+    "Tab": ("composite_charts.tab", "Tab"),
+    "Timeline": ("composite_charts.timeline", "Timeline"),
+    # 3d charts
+    "Bar3D": ("three_axis_charts.bar3D", "Bar3D"),
+    "Line3D": ("three_axis_charts.line3D", "Line3D"),
+    "Map3D": ("three_axis_charts.map3D", "Map3D"),
+    "MapGlobe": ("three_axis_charts.map_globe", "MapGlobe"),
+    "Scatter3D": ("three_axis_charts.scatter3D", "Scatter3D"),
+    "Surface3D": ("three_axis_charts.surface3D", "Surface3D"),
+    # alias
+    "Candlestick": ("basic_charts.kline", "Kline"),
+}
 
-# 3d charts
-from ..charts.three_axis_charts.bar3D import Bar3D
-from ..charts.three_axis_charts.line3D import Line3D
-from ..charts.three_axis_charts.map3D import Map3D
-from ..charts.three_axis_charts.map_globe import MapGlobe
-from ..charts.three_axis_charts.scatter3D import Scatter3D
-from ..charts.three_axis_charts.surface3D import Surface3D
+__all__ = list(_LAZY_CHARTS)
 
-# alias
-Candlestick = Kline
+
+def __getattr__(name: str):
+    if name in _LAZY_CHARTS:
+        module_name, attr = _LAZY_CHARTS[name]
+        value = getattr(importlib.import_module("." + module_name, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
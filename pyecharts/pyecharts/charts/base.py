@@ -96,6 +96,9 @@ def default(o):
         return (
             o.replace("\\n|\\t", "").replace(r"\\n", "\n").replace(r"\\t", "\t").js_code
         )
+    if utils.is_array(o) or type(o).__module__ == "numpy":
+        # numpy arrays and scalars
+        return o.tolist()
     if isinstance(o, BasicOpts):
         if isinstance(o.opts, Sequence):
             return [utils.remove_key_with_none_value(item) for item in o.opts]
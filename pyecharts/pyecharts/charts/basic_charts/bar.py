@@ -1,5 +1,6 @@
 from ... import options as opts
 from ... import types
+from ...commons import utils
 from ...charts.chart import RectChart
 from ...globals import ChartType
 
@@ -45,12 +46,18 @@ class Bar(RectChart):
         tooltip_opts: types.Tooltip = None,
         itemstyle_opts: types.ItemStyle = None,
         encode: types.Union[types.JSFunc, dict, None] = None,
+        downsample: types.Optional[types.Numeric] = None,
+        downsample_method: str = "lttb",
     ):
         self._append_color(color)
         self._append_legend(series_name, is_selected)
 
         if self.options.get("dataset") is not None:
             y_axis = None
+        elif utils.is_array(y_axis) or downsample is not None:
+            y_axis = self._parse_array(
+                y_axis, downsample, downsample_method, is_pair=False
+            )
 
         self.options.get("series").append(
             {
@@ -3,7 +3,7 @@ import simplejson as json
 from ... import options as opts
 from ... import types
 from ...charts.chart import Chart
-from ...datasets import COORDINATES
+from ... import datasets
 from ...exceptions import NonexistentCoordinatesException
 from ...globals import ChartType
 
@@ -12,7 +12,7 @@ class GeoChartBase(Chart):
     def __init__(self, init_opts: types.Init = opts.InitOpts()):
         super().__init__(init_opts=init_opts)
         self.set_global_opts()
-        self._coordinates = COORDINATES
+        self._coordinates = datasets.COORDINATES
         self._zlevel = 1
         self._coordinate_system: types.Optional[str] = None
         self._chart_type = ChartType.GEO
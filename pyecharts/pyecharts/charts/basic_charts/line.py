@@ -1,5 +1,6 @@
 from ... import options as opts
 from ... import types
+from ...commons import utils
 from ...charts.chart import RectChart
 from ...globals import ChartType
 
@@ -39,11 +40,16 @@ class Line(RectChart):
         label_opts: types.Label = opts.LabelOpts(),
         linestyle_opts: types.LineStyle = opts.LineStyleOpts(),
         areastyle_opts: types.AreaStyle = opts.AreaStyleOpts(),
+        downsample: types.Optional[types.Numeric] = None,
+        downsample_method: str = "lttb",
     ):
         self._append_color(color)
         self._append_legend(series_name, is_selected)
 
-        if all([isinstance(d, opts.LineItem) for d in y_axis]):
+        if utils.is_array(y_axis) or downsample is not None:
+            # numpy 快速路径, 可选在服务端降采样到 downsample 个点
+            data = self._parse_array(y_axis, downsample, downsample_method)
+        elif all([isinstance(d, opts.LineItem) for d in y_axis]):
             data = y_axis
         else:
             # 合并 x 和 y 轴数据，避免当 X 轴的类型设置为 'value' 的时候，
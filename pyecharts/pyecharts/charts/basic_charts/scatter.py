@@ -2,6 +2,7 @@ import itertools
 
 from ... import options as opts
 from ... import types
+from ...commons import utils
 from ...charts.chart import RectChart
 from ...globals import ChartType
 
@@ -17,10 +18,20 @@ class Scatter(RectChart):
     """
 
     def _parse_data(
-        self, y_axis: types.Sequence[types.Union[opts.ScatterItem, dict]]
+        self,
+        y_axis: types.Sequence[types.Union[opts.ScatterItem, dict]],
+        downsample: types.Optional[types.Numeric] = None,
+        downsample_method: str = "lttb",
     ) -> types.Optional[types.Sequence]:
         if self.options.get("dataset") is not None:
             return None
+        elif utils.is_array(y_axis) or downsample is not None:
+            return self._parse_array(
+                y_axis,
+                downsample,
+                downsample_method,
+                is_pair=len(self._xaxis_data) > 0,
+            )
         elif len(self._xaxis_data) == 0:
             return y_axis
         elif isinstance(y_axis[0], (opts.ScatterItem, dict)):
@@ -52,11 +63,13 @@ class Scatter(RectChart):
         tooltip_opts: types.Tooltip = None,
         itemstyle_opts: types.ItemStyle = None,
         encode: types.Union[types.JSFunc, dict, None] = None,
+        downsample: types.Optional[types.Numeric] = None,
+        downsample_method: str = "lttb",
     ):
         self._append_color(color)
         self._append_legend(series_name, is_selected)
 
-        data = self._parse_data(y_axis=y_axis)
+        data = self._parse_data(y_axis, downsample, downsample_method)
 
         self.options.get("series").append(
             {
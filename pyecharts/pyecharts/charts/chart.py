@@ -162,6 +162,7 @@ class RectChart(Chart):
     def __init__(self, init_opts: types.Init = opts.InitOpts()):
         super().__init__(init_opts=init_opts)
         self.options.update(xAxis=[opts.AxisOpts().opts], yAxis=[opts.AxisOpts().opts])
+        self._xaxis_data: Sequence = []
 
     def extend_axis(
         self,
@@ -185,6 +186,22 @@ class RectChart(Chart):
         self._xaxis_data = xaxis_data
         return self
 
+    def _parse_array(
+        self,
+        y_axis: types.Any,
+        downsample: Optional[types.Numeric] = None,
+        downsample_method: str = "lttb",
+        is_pair: bool = True,
+    ) -> list:
+        # numpy 快速路径, 见 commons/sampling.py
+        from ..commons import sampling
+
+        # 降采样的序列写成 [x, y], x 轴保留全部数据, 同一个图中其他序列的位置不变
+        data, _ = sampling.series_data(
+            self._xaxis_data, y_axis, downsample, downsample_method, is_pair
+        )
+        return data
+
     def reversal_axis(self):
         self.options["yAxis"][0]["data"] = self._xaxis_data
         self.options["xAxis"][0]["data"] = None
@@ -55,9 +55,12 @@ class Page(CompositeMixin):
         js_host: str = "",
         interval: int = 1,
         layout: types.Union[PageLayoutOpts, dict] = PageLayoutOpts(),
+        is_lazy: bool = False,
     ):
         self.js_host: str = js_host or CurrentConfig.ONLINE_HOST
         self.page_title = page_title
+        # init each chart only when its container scrolls into view
+        self.is_lazy: bool = is_lazy
         self.page_interval = interval
         self.layout = self._assembly_layout(layout)
         self.js_functions: utils.OrderedSet = utils.OrderedSet()
@@ -10,9 +10,16 @@ from ..mixins import CompositeMixin
 
 
 class Tab(CompositeMixin):
-    def __init__(self, page_title: str = CurrentConfig.PAGE_TITLE, js_host: str = ""):
+    def __init__(
+        self,
+        page_title: str = CurrentConfig.PAGE_TITLE,
+        js_host: str = "",
+        is_lazy: bool = False,
+    ):
         self.js_host: str = js_host or CurrentConfig.ONLINE_HOST
         self.page_title: str = page_title
+        # init each chart only when its tab is shown for the first time
+        self.is_lazy: bool = is_lazy
         self.download_button: bool = False
         self.js_functions: utils.OrderedSet = utils.OrderedSet()
         self.js_dependencies: utils.OrderedSet = utils.OrderedSet()
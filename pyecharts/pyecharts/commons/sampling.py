@@ -0,0 +1,135 @@
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    raise Exception("Please install numpy for array input and downsampling")
+
+from ..types import Any, Optional, Sequence
+
+# NumPy helpers of the rect charts (Line / Bar / Scatter). They are only imported
+# when a series gets an array or a `downsample` budget, pyecharts itself does not
+# depend on numpy.
+#
+# Arrays are turned into series data with ndarray.tolist(), which creates the
+# python numbers in C instead of looping over the points. With `downsample=n`
+# the series is reduced to about n points before it is shipped to the browser:
+#
+#     "lttb"    Largest-Triangle-Three-Buckets, keeps the visual shape of the line
+#     "minmax"  min and max of each bucket, keeps every peak (n / 2 buckets)
+#
+# Both methods keep original points only, x values are never interpolated.
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets,
+    the first and the last point are always kept
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # points 1 .. n-2 are split into threshold - 2 buckets, the last start is the
+    # last point, which is the "next bucket" of the last one
+    starts = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    counts = np.diff(np.append(starts, n))
+    avg_x = np.add.reduceat(x, starts) / counts
+    avg_y = np.add.reduceat(y, starts) / counts
+
+    index = np.empty(threshold, dtype=np.int64)
+    index[0], index[-1] = 0, n - 1
+    a = 0
+    for k in range(threshold - 2):
+        lo, hi = starts[k], starts[k + 1]
+        # twice the area of the triangle (a, point, average of the next bucket)
+        dx, dy = x[a] - avg_x[k + 1], avg_y[k + 1] - y[a]
+        area = np.abs(dx * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * dy)
+        a = lo + int(area.argmax())
+        index[k + 1] = a
+    return index
+
+
+def minmax(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the smallest and the largest point of threshold // 2 equal buckets
+    """
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    buckets = max(threshold // 2, 1)
+    bucket = np.arange(n) * buckets // n
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket, np.arange(buckets))
+    ends = np.append(starts[1:], n)
+    return np.unique(np.concatenate((order[starts], order[ends - 1])))
+
+
+def downsample(
+    x: np.ndarray, y: np.ndarray, threshold: int, method: str = "lttb"
+) -> np.ndarray:
+    """
+    :return: sorted indices of the points kept, at most `threshold` of them
+    """
+    if method == "lttb":
+        return lttb(x, y, threshold)
+    elif method == "minmax":
+        return minmax(y, threshold)
+    raise ValueError(
+        "Unknown downsample method: {}, expected one of {}".format(method, METHODS)
+    )
+
+
+def series_data(
+    x_data: Optional[Sequence],
+    y_data: Any,
+    threshold: Optional[int] = None,
+    method: str = "lttb",
+    is_pair: bool = True,
+) -> tuple:
+    """
+    Series data of a rect chart from an array (or a sequence) of y values.
+
+    :param x_data: x axis data, numbers are written as numbers, categories as they are
+    :param y_data: 1-d values, or 2-d rows of several dimensions (scatter)
+    :param threshold: point budget, no downsampling if None
+    :param method: "lttb" or "minmax", applied on the first y dimension
+    :param is_pair: write [x, y...] items, else only the y values; a downsampled
+                    series is always written in pairs since its points are no
+                    longer those of the x axis
+    :return: (data, indices of the points kept or None if not downsampled)
+    """
+    y = np.asarray(y_data)
+    if not is_pair and threshold is None:
+        return y.tolist(), None
+    if x_data is None or len(x_data) == 0:
+        x_data = range(len(y))
+    x = np.asarray(x_data)
+    # like zip(), the longer of x and y is cut
+    n = min(len(x), len(y))
+    x, y = x[:n], y[:n]
+    index = None
+    if threshold is not None and threshold < n:
+        is_numeric = x.dtype.kind in "iuf"
+        x_value = x.astype(np.float64) if is_numeric else np.arange(n, dtype=np.float64)
+        y_value = (y if y.ndim == 1 else y[:, 0]).astype(np.float64)
+        index = downsample(x_value, y_value, int(threshold), method)
+        x, y = x[index], y[index]
+
+    if x.dtype.kind in "iuf":
+        if (x.dtype.kind == "f") == (y.dtype.kind == "f"):
+            return np.column_stack((x, y)).tolist(), index
+        # an object array keeps integers as int next to floats
+        pairs = np.empty((len(x), 1 + (y.shape[1] if y.ndim > 1 else 1)), dtype=object)
+        pairs[:, 0] = x.astype(object)
+        pairs[:, 1:] = y.reshape(len(x), -1).astype(object)
+        return pairs.tolist(), index
+    x_list = take(x_data, index) if index is not None else list(x_data)[:n]
+    if y.ndim == 1:
+        return [[a, b] for a, b in zip(x_list, y.tolist())], index
+    return [[a] + b for a, b in zip(x_list, y.tolist())], index
+
+
+def take(data: Sequence, index: np.ndarray) -> list:
+    if hasattr(data, "__array__"):
+        return np.asarray(data)[index].tolist()
+    return [data[i] for i in index.tolist()]
@@ -1,6 +1,7 @@
 import re
 
-from ..datasets import EXTRA, FILENAMES
+from .. import datasets
+from ..datasets import EXTRA
 
 
 class JsCode:
@@ -32,8 +33,8 @@ def produce_require_dict(js_dependencies, js_host) -> dict:
         if name.startswith("https://api.map.baidu.com"):
             confs.append("'baidu_map_api{}':'{}'".format(len(name), name))
             libraries.append("'baidu_map_api{}'".format(len(name)))
-        if name in FILENAMES:
-            f, _ = FILENAMES[name]
+        if name in datasets.FILENAMES.exact:
+            f, _ = datasets.FILENAMES.exact[name]
             confs.append("'{}':'{}{}'".format(name, js_host, f))
             libraries.append("'{}'".format(name))
         else:
@@ -96,6 +97,11 @@ def _clean_array(myarray):
             yield value
 
 
+def is_array(data) -> bool:
+    # numpy arrays, pandas series... without importing numpy
+    return hasattr(data, "__array__") and not isinstance(data, (list, tuple))
+
+
 def remove_key_with_none_value(incoming_dict):
     if isinstance(incoming_dict, dict):
         return _expand(_clean_dict(incoming_dict))
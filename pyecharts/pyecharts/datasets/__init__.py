@@ -1,13 +1,40 @@
 import difflib
 import os
+import pickle
 import typing
-import urllib.request
+from collections import OrderedDict
 
 import simplejson as json
 
 
+def _bigrams(key: str) -> list:
+    """Padded bigrams of key in order of appearance, without duplicates"""
+    padded = "\x02" + key + "\x03"
+    return list(dict.fromkeys(a + b for a, b in zip(padded, padded[1:])))
+
+
+class _ExactView:
+    """Read-only view of a FuzzyDict which only matches keys exactly"""
+
+    def __init__(self, fuzzy_dict: "FuzzyDict"):
+        self._dict = fuzzy_dict
+
+    def __contains__(self, item: typing.Any):
+        return self._dict._dict_contains(item)
+
+    def __getitem__(self, key: typing.Any):
+        return self._dict._dict_getitem(key)
+
+
 class FuzzyDict(dict):
-    """Provides a dictionary that performs fuzzy lookup"""
+    """Provides a dictionary that performs fuzzy lookup
+
+    String keys are indexed by padded bigrams, a fuzzy lookup only scores the keys
+    sharing at least one bigram with the looked up string. Resolved lookups are kept
+    in a LRU cache which is cleared whenever the dictionary changes.
+    """
+
+    cache_size: int = 1024
 
     def __init__(self, cutoff: float = 0.6):
         """Construct a new FuzzyDict instance
@@ -23,6 +50,41 @@ class FuzzyDict(dict):
         self._dict_contains = lambda key: super(FuzzyDict, self).__contains__(key)
         self._dict_getitem = lambda key: super(FuzzyDict, self).__getitem__(key)
 
+        # bigram -> keys containing it, built on the first fuzzy lookup
+        self._index: typing.Optional[typing.Dict[str, typing.Dict[str, None]]] = None
+        self._cache: OrderedDict = OrderedDict()
+        self.exact = _ExactView(self)
+
+    def _index_key(self, key: typing.Any):
+        if isinstance(key, str):
+            for gram in _bigrams(key):
+                self._index.setdefault(gram, {})[key] = None
+
+    def _unindex_key(self, key: typing.Any):
+        if isinstance(key, str):
+            for gram in _bigrams(key):
+                self._index.get(gram, {}).pop(key, None)
+
+    def _changed(self, added: typing.Iterable = (), removed: typing.Iterable = ()):
+        self._cache.clear()
+        if self._index is not None:
+            for key in removed:
+                self._unindex_key(key)
+            for key in added:
+                self._index_key(key)
+
+    def _candidates(self, lookfor: str) -> list:
+        """Keys sharing bigrams with lookfor, most shared first"""
+        if self._index is None:
+            self._index = {}
+            for key in self:
+                self._index_key(key)
+        shared: typing.Dict[str, int] = {}
+        for gram in _bigrams(lookfor):
+            for key in self._index.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+        return sorted(shared, key=shared.get, reverse=True)
+
     def _search(self, lookfor: typing.Any, stop_on_first: bool = False):
         """Returns the value whose key best matches lookfor
 
@@ -34,31 +96,33 @@ class FuzzyDict(dict):
         if self._dict_contains(lookfor):
             return True, lookfor, self._dict_getitem(lookfor), 1
 
+        # only strings can be fuzzy matched
+        if not isinstance(lookfor, str):
+            return False, None, None, 0
+
+        cache_key = (lookfor, stop_on_first)
+        if cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+
         # set up the fuzzy matching tool
         ratio_calc = difflib.SequenceMatcher()
         ratio_calc.set_seq1(lookfor)
 
-        # test each key in the dictionary
+        # test each candidate key
         best_ratio = 0
         best_match = None
         best_key = None
-        for key in self:
-            # if the current key is not a string
-            # then we just skip it
-            try:
-                # set up the SequenceMatcher with other text
-                ratio_calc.set_seq2(key)
-            except TypeError:
+        for key in self._candidates(lookfor):
+            ratio_calc.set_seq2(key)
+            # upper bounds of ratio(), skip keys which can not be the best match
+            if ratio_calc.real_quick_ratio() <= best_ratio:
+                continue
+            if ratio_calc.quick_ratio() <= best_ratio:
                 continue
 
-            # we get an error here if the item to look for is not a
-            # string - if it cannot be fuzzy matched and we are here
-            # this it is definitely not in the dictionary
-            try:
-                # calculate the match value
-                ratio = ratio_calc.ratio()
-            except TypeError:
-                break
+            # calculate the match value
+            ratio = ratio_calc.ratio()
 
             # if this is the best ratio so far - save it and the value
             if ratio > best_ratio:
@@ -69,7 +133,11 @@ class FuzzyDict(dict):
             if stop_on_first and ratio >= self.cutoff:
                 break
 
-        return best_ratio >= self.cutoff, best_key, best_match, best_ratio
+        result = best_ratio >= self.cutoff, best_key, best_match, best_ratio
+        self._cache[cache_key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
 
     def __contains__(self, item: typing.Any):
         if self._search(item, True)[0]:
@@ -88,23 +156,118 @@ class FuzzyDict(dict):
 
         return item
 
+    def __setitem__(self, key: typing.Any, value: typing.Any):
+        is_new = not self._dict_contains(key)
+        super(FuzzyDict, self).__setitem__(key, value)
+        self._changed(added=(key,) if is_new else ())
+
+    def __delitem__(self, key: typing.Any):
+        super(FuzzyDict, self).__delitem__(key)
+        self._changed(removed=(key,))
+
+    def update(self, *args, **kwargs):
+        items = dict(*args, **kwargs)
+        added = [k for k in items if not self._dict_contains(k)]
+        super(FuzzyDict, self).update(items)
+        self._changed(added=added)
+
+    def setdefault(self, key: typing.Any, default: typing.Any = None):
+        if not self._dict_contains(key):
+            self[key] = default
+        return self._dict_getitem(key)
+
+    def pop(self, key: typing.Any, *args):
+        is_present = self._dict_contains(key)
+        value = super(FuzzyDict, self).pop(key, *args)
+        if is_present:
+            self._changed(removed=(key,))
+        return value
+
+    def popitem(self):
+        key, value = super(FuzzyDict, self).popitem()
+        self._changed(removed=(key,))
+        return key, value
+
+    def clear(self):
+        super(FuzzyDict, self).clear()
+        self._index = None
+        self._cache.clear()
+
 
 __HERE = os.path.abspath(os.path.dirname(__file__))
-with open(os.path.join(__HERE, "map_filename.json"), "r", encoding="utf8") as f:
-    FILENAMES: FuzzyDict = FuzzyDict()
-    for k, v in json.load(f).items():
-        FILENAMES[k] = v
 
-with open(os.path.join(__HERE, "city_coordinates.json"), "r", encoding="utf8") as f:
-    COORDINATES: FuzzyDict = FuzzyDict()
-    for k, v in json.load(f).items():
-        COORDINATES[k] = v
+# FILENAMES and COORDINATES are loaded on first access (PEP 562), most charts never
+# touch them. Set PYECHARTS_CACHE_DIR to cache the parsed json there as pickle,
+# the cache is off by default. Cache files are unpickled, so the directory must
+# only be writable by the user.
+_DATASET_FILES = {
+    "FILENAMES": "map_filename.json",
+    "COORDINATES": "city_coordinates.json",
+}
+
+
+def _cache_dir() -> str:
+    return os.environ.get("PYECHARTS_CACHE_DIR", "")
+
+
+def _load_json_with_cache(file_name: str) -> dict:
+    json_path = os.path.join(__HERE, file_name)
+    cache_dir = _cache_dir()
+    if not cache_dir:
+        with open(json_path, "r", encoding="utf8") as f:
+            return json.load(f)
+
+    stat = os.stat(json_path)
+    prefix = os.path.splitext(file_name)[0] + "."
+    cache_name = "{}{}-{}.pickle".format(prefix, stat.st_mtime_ns, stat.st_size)
+    cache_path = os.path.join(cache_dir, cache_name)
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        pass
+
+    with open(json_path, "r", encoding="utf8") as f:
+        data = json.load(f)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = "{}.{}.tmp".format(cache_path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+        # caches of older versions of the json file
+        for name in os.listdir(cache_dir):
+            stale = name.startswith(prefix) and name.endswith(".pickle")
+            if stale and name != cache_name:
+                os.remove(os.path.join(cache_dir, name))
+    except OSError:
+        pass
+    return data
+
+
+def _get_dataset(name: str) -> FuzzyDict:
+    dataset = globals().get(name)
+    if dataset is None:
+        dataset = FuzzyDict()
+        dataset.update(_load_json_with_cache(_DATASET_FILES[name]))
+        globals()[name] = dataset
+    return dataset
+
+
+def __getattr__(name: str):
+    if name in _DATASET_FILES:
+        return _get_dataset(name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
 
 EXTRA = {}
 
 
 def register_url(asset_url: str):
     if asset_url:
+        # urllib.request pulls in ssl / http.client, only import it when needed
+        import urllib.request
+
         registry = asset_url + "/registry.json"
         try:
             contents = urllib.request.urlopen(registry).read()
@@ -133,9 +296,9 @@ def register_url(asset_url: str):
 
 def register_files(asset_files: dict):
     if asset_files:
-        FILENAMES.update(asset_files)
+        _get_dataset("FILENAMES").update(asset_files)
 
 
 def register_coords(coords: dict):
     if coords:
-        COORDINATES.update(coords)
+        _get_dataset("COORDINATES").update(coords)
@@ -1,6 +1,6 @@
 import os
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 from pyecharts.commons.utils import JsCode
 
@@ -143,6 +143,19 @@ OnlineHostType = _OnlineHost()
 WarningType = _WarningControl()
 
 
+def _template_bytecode_cache(directory: str = None):
+    """
+    Compiled templates are stored in `directory` and reused by new processes,
+    the cache is disabled when `directory` is empty. Set it with the
+    PYECHARTS_TEMPLATE_CACHE_DIR environment variable or assign
+    `CurrentConfig.GLOBAL_ENV.bytecode_cache` directly.
+    """
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory)
+
+
 class _CurrentConfig:
     PAGE_TITLE = "Awesome-pyecharts"
     ONLINE_HOST = OnlineHostType.DEFAULT_HOST
@@ -156,6 +169,9 @@ class _CurrentConfig:
                 os.path.abspath(os.path.dirname(__file__)), "render", "templates"
             )
         ),
+        bytecode_cache=_template_bytecode_cache(
+            os.environ.get("PYECHARTS_TEMPLATE_CACHE_DIR")
+        ),
     )
 
 
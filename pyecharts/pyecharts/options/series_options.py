@@ -7,10 +7,30 @@ JSFunc = Union[str, JsCode]
 
 
 class BasicOpts:
-    __slots__ = ("opts",)
+    """
+    `opts` only stores the keys which have a value: keys set to None are never
+    rendered (see `remove_key_with_none_value`), so they are dropped when `opts`
+    is assigned or updated instead of being kept in every instance.
+    """
+
+    __slots__ = ("_opts",)
+
+    @property
+    def opts(self):
+        return self._opts
+
+    @opts.setter
+    def opts(self, value):
+        if isinstance(value, dict):
+            value = {k: v for k, v in value.items() if v is not None}
+        self._opts = value
 
     def update(self, **kwargs):
-        self.opts.update(kwargs)
+        for key, value in kwargs.items():
+            if value is None:
+                self._opts.pop(key, None)
+            else:
+                self._opts[key] = value
 
     def get(self, key: str) -> Any:
         return self.opts.get(key)
@@ -1 +1 @@
-from .snapshot import make_snapshot
+from .snapshot import make_snapshot, make_snapshots
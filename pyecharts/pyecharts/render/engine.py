@@ -4,7 +4,8 @@ from collections.abc import Iterable
 from jinja2 import Environment
 
 from ..commons import utils
-from ..datasets import EXTRA, FILENAMES
+from .. import datasets
+from ..datasets import EXTRA
 from ..globals import CurrentConfig, NotebookType
 from ..types import Any, Optional
 from .display import HTML, Javascript
@@ -28,8 +29,8 @@ class RenderEngine:
             # TODO: if?
             if dep.startswith("https://api.map.baidu.com"):
                 links.append(dep)
-            if dep in FILENAMES:
-                f, ext = FILENAMES[dep]
+            if dep in datasets.FILENAMES.exact:
+                f, ext = datasets.FILENAMES.exact[dep]
                 links.append("{}{}.{}".format(chart.js_host, f, ext))
             else:
                 for url, files in EXTRA.items():
@@ -112,6 +113,6 @@ def render_notebook(self, notebook_template, lab_template):
 def load_javascript(chart):
     scripts = []
     for dep in chart.js_dependencies.items:
-        f, ext = FILENAMES[dep]
+        f, ext = datasets.FILENAMES.exact[dep]
         scripts.append("{}{}.{}".format(CurrentConfig.ONLINE_HOST, f, ext))
     return Javascript(lib=scripts)
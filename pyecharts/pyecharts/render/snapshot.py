@@ -2,9 +2,12 @@ import base64
 import codecs
 import logging
 import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from io import BytesIO
 
-from ..types import Any
+from ..types import Any, Iterable, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,13 @@ SVG_FORMAT = "svg"
 EPS_FORMAT = "eps"
 B64_FORMAT = "base64"
 
+# base64 text decoded per write
+DECODE_CHUNK_SIZE = 1 << 20
+
+SnapshotResult = namedtuple(
+    "SnapshotResult", "file_name output_name engine_time save_time error"
+)
+
 
 def make_snapshot(
     engine: Any,
@@ -61,6 +71,123 @@ def make_snapshot(
     logger.info(f"File saved in {output_name}")
 
 
+def make_snapshots(
+    engine: Any,
+    jobs: Iterable[Sequence[str]],
+    delay: float = 2,
+    pixel_ratio: int = 2,
+    is_remove_html: bool = False,
+    max_workers: Optional[int] = None,
+    executor: str = "thread",
+    **kwargs,
+) -> list:
+    """
+    Snapshot many html files with one engine session.
+
+    Engine calls run one by one in the calling thread, so a session passed in kwargs
+    (e.g. `driver=` of snapshot-selenium) is shared by every file; they are not
+    parallel, browser sessions are not thread safe. Decoding, converting (Pillow for
+    pdf / gif / eps) and writing the output run in a worker pool while the engine
+    renders the next file. Use executor="process" when the conversions dominate,
+    the output of the engine is then copied to the worker processes.
+
+    :param jobs: (html file, output file) pairs
+    :param max_workers: size of the worker pool used for saving
+    :param executor: "thread" or "process" worker pool
+    :return: one SnapshotResult per job, in order; times are in seconds and
+        error holds the exception of a failed job
+    """
+    if executor not in ("thread", "process"):
+        raise ValueError(
+            f"Unknown executor: {executor}, expected 'thread' or 'process'"
+        )
+    pool = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    jobs = [tuple(job) for job in jobs]
+    logger.info(f"Generating {len(jobs)} files ...")
+    pending = []
+    with pool(max_workers=max_workers) as workers:
+        for file_name, output_name in jobs:
+            start = time.perf_counter()
+            try:
+                content = engine.make_snapshot(
+                    html_path=file_name,
+                    file_type=output_name.split(".")[-1],
+                    delay=delay,
+                    pixel_ratio=pixel_ratio,
+                    **kwargs,
+                )
+            except Exception as err:
+                pending.append((file_name, output_name, 0.0, None, err))
+                continue
+            engine_time = time.perf_counter() - start
+            future = workers.submit(_timed_save, content, output_name)
+            pending.append((file_name, output_name, engine_time, future, None))
+
+        results = []
+        for file_name, output_name, engine_time, future, error in pending:
+            save_time = 0.0
+            if future is not None:
+                save_time, error = future.result()
+            if error is not None:
+                logger.warning(f"Failed to generate {output_name}: {error!r}")
+            elif is_remove_html and not file_name.startswith("http"):
+                os.unlink(file_name)
+            results.append(
+                SnapshotResult(file_name, output_name, engine_time, save_time, error)
+            )
+    saved = sum(r.error is None for r in results)
+    logger.info(f"{saved} of {len(results)} files saved")
+    return results
+
+
+def _timed_save(content: str, output_name: str) -> tuple:
+    start = time.perf_counter()
+    try:
+        save_content(content, output_name)
+    except Exception as err:
+        return time.perf_counter() - start, err
+    return time.perf_counter() - start, None
+
+
+def save_content(content: str, output_name: str):
+    """
+    Save the content returned by an engine according to the output file type.
+    """
+    file_type = output_name.split(".")[-1]
+    if file_type in [SVG_FORMAT, B64_FORMAT]:
+        save_as_text(content, output_name)
+        return
+
+    # skip the "data:image/xxx;base64," prefix without copying the payload
+    comma = content.find(",")
+    if comma < 0 or content.find(",", comma + 1) >= 0:
+        raise OSError(content.split(","))
+    if file_type in [PNG_FORMAT, JPG_FORMAT]:
+        save_base64_stream(content, output_name, comma + 1)
+    elif file_type in [PDF_FORMAT, GIF_FORMAT, EPS_FORMAT]:
+        _, _, payload = content.partition(",")
+        save_as(decode_base64(payload), output_name, file_type)
+    else:
+        raise TypeError(f"Not supported file type '{file_type}'")
+
+
+def save_base64_stream(data: str, output_name: str, start: int = 0):
+    """
+    Decode data[start:] chunk by chunk and write it to output_name,
+    padding being optional and whitespace (line breaks) ignored like decodebytes.
+    """
+    rest = ""
+    with open(output_name, "wb") as f:
+        for pos in range(start, len(data), DECODE_CHUNK_SIZE):
+            # the characters after the last full group of 4 wait for the next chunk
+            chunk = rest + "".join(data[pos:pos + DECODE_CHUNK_SIZE].split())
+            cut = len(chunk) - len(chunk) % 4
+            f.write(base64.b64decode(chunk[:cut]))
+            rest = chunk[cut:]
+        if rest:
+            f.write(base64.b64decode(rest + "=" * (4 - len(rest))))
+
+
 def decode_base64(data: str) -> bytes:
     """Decode base64, padding being optional.
 
@@ -0,0 +1,763 @@
+import base64
+import math
+import re
+from collections import namedtuple
+from io import BytesIO
+from xml.sax.saxutils import escape, quoteattr
+
+import simplejson as json
+
+from ..types import Any, Optional, Sequence
+
+# In-process snapshot engine for Graph charts. It draws the series options directly,
+# without a browser, so it can be used on headless servers and in worker processes:
+#
+#     from pyecharts.render import make_snapshot, snapshot_svg
+#     make_snapshot(snapshot_svg, graph.render(), "graph.svg")
+#
+# Output: svg (no extra dependency), png / jpeg / gif / pdf / eps through Pillow.
+# Only the static look of graph series is drawn: node positions, symbols, sizes,
+# colors, link widths/colors/curveness and labels, plus the title.
+# Nodes without x/y are placed on a circle, as ECharts does for layout="circular".
+# The charts of a Tab or Page are drawn one below the other, unless chart_id is given.
+# Lines series on cartesian2d are drawn below the graph when the first graph series
+# is on cartesian2d too: their coords share the coordinates of the nodes.
+
+DEFAULT_WIDTH = 900
+DEFAULT_HEIGHT = 500
+DEFAULT_COLORS = (
+    "#c23531 #2f4554 #61a0a8 #d48265 #91c7ae #749f83 "
+    "#ca8622 #bda29a #6e7074 #546570 #c4ccd3"
+).split()
+LABEL_DISTANCE = 5
+CURVE_SEGMENTS = 16
+
+_OPTION_PATTERNS = (
+    re.compile(r"var option_(\w+) = (.*?);\s*chart_\1\.setOption", re.S),
+    re.compile(r'<script type="text/plain" id="option_(\w+)">(.*?)</script>', re.S),
+)
+_SIZE_PATTERN = re.compile(
+    r'<div id="(\w+)" class="chart-container" style="width:(.*?); height:(.*?);"'
+)
+
+# scene items, coordinates are in css pixels
+Polyline = namedtuple("Polyline", "points color width opacity dash")
+Symbol = namedtuple("Symbol", "shape x y w h fill stroke stroke_width opacity")
+Text = namedtuple("Text", "x y text size color anchor baseline weight")
+Scene = namedtuple("Scene", "width height background items")
+
+
+def make_snapshot(
+    html_path: str,
+    file_type: str = "svg",
+    delay: float = 2,
+    pixel_ratio: int = 2,
+    chart: Any = None,
+    chart_id: Optional[str] = None,
+    **kwargs,
+) -> str:
+    """
+    Engine entry used by `pyecharts.render.make_snapshot`.
+
+    :param html_path: html file rendered by pyecharts, ignored when chart is given
+    :param file_type: svg, png, jpeg, gif, pdf, eps or base64
+    :param delay: unused, there is no animation to wait for
+    :param pixel_ratio: scale of raster output
+    :param chart: a Graph object, skips reading and parsing the html file
+    :param chart_id: chart to draw when the html file holds several charts (Tab / Page),
+                     by default all of them are drawn one below the other
+    :return: svg text, or a base64 data url for raster output
+    """
+    if chart is not None:
+        options = json.loads(_strip_js_functions(chart.dump_options()))
+        width, height = _parse_size(chart.width, chart.height)
+        charts = [(options, width, height)]
+    else:
+        with open(html_path, "r", encoding="utf-8") as f:
+            html = f.read()
+        if chart_id is None:
+            charts = [chart[1:] for chart in load_all_options(html)]
+        else:
+            charts = [load_options(html, chart_id)]
+    scenes = [
+        build_scene(options, kwargs.get("width", width), kwargs.get("height", height))
+        for options, width, height in charts
+    ]
+    scene = stack_scenes(scenes)
+    if file_type == "svg":
+        return to_svg(scene)
+    image_format = "jpeg" if file_type == "jpeg" else "png"
+    data = to_image_bytes(scene, image_format, pixel_ratio)
+    return "data:image/{};base64,{}".format(
+        image_format, base64.b64encode(data).decode("ascii")
+    )
+
+
+def load_options(html: str, chart_id: Optional[str] = None) -> tuple:
+    """
+    Extract the options of one chart from rendered html.
+
+    :param chart_id: required when the html holds several charts
+    :return: (options, width, height)
+    """
+    charts = load_all_options(html)
+    if chart_id is None:
+        if len(charts) > 1:
+            raise ValueError(
+                "Html holds {} charts, pass one of chart_id {}".format(
+                    len(charts), [chart[0] for chart in charts]
+                )
+            )
+        chart_id = charts[0][0]
+    for cid, options, width, height in charts:
+        if cid == chart_id:
+            return options, width, height
+    raise ValueError("Chart '{}' not found in html".format(chart_id))
+
+
+def load_all_options(html: str) -> list:
+    """
+    Extract the options of every chart from rendered html, in order.
+
+    :return: [(chart_id, options, width, height)]
+    """
+    found = {}
+    for pattern in _OPTION_PATTERNS:
+        for cid, text in pattern.findall(html):
+            found.setdefault(cid, text)
+    if not found:
+        raise ValueError("No chart options found in html")
+    sizes = {cid: _parse_size(w, h) for cid, w, h in _SIZE_PATTERN.findall(html)}
+    charts = []
+    for cid, text in found.items():
+        text = _strip_js_functions(text.replace("<\\/", "</"))
+        width, height = sizes.get(cid, (DEFAULT_WIDTH, DEFAULT_HEIGHT))
+        charts.append((cid, json.loads(text), width, height))
+    return charts
+
+
+def _px(value: Any, default: float) -> float:
+    value = str(value).strip()
+    if value.endswith("px"):
+        value = value[:-2]
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def _parse_size(width: str, height: str) -> tuple:
+    return _px(width, DEFAULT_WIDTH), _px(height, DEFAULT_HEIGHT)
+
+
+def _strip_js_functions(text: str) -> str:
+    # JsCode is written as raw javascript, replace every function with null
+    # so that the rest of the options can be read as json
+    out = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '"':
+            end = _skip_string(text, i)
+            out.append(text[i:end])
+            i = end
+        elif text.startswith("function", i) and (
+            i == 0 or not (text[i - 1].isalnum() or text[i - 1] in "_$")
+        ):
+            start = text.find("{", i)
+            if start < 0:
+                break
+            i = _skip_block(text, start)
+            out.append("null")
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _skip_string(text: str, i: int) -> int:
+    quote, i = text[i], i + 1
+    while i < len(text) and text[i] != quote:
+        i += 2 if text[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_block(text: str, i: int) -> int:
+    depth = 0
+    while i < len(text):
+        ch = text[i]
+        if ch in "\"'`":
+            i = _skip_string(text, i)
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _merge(*dicts) -> dict:
+    result = {}
+    for d in dicts:
+        if isinstance(d, dict):
+            result.update({k: v for k, v in d.items() if v is not None})
+    return result
+
+
+def _solid_color(color: Any, default: str) -> str:
+    # gradients are drawn with their first color stop
+    if isinstance(color, dict):
+        stops = color.get("colorStops") or [{}]
+        color = stops[0].get("color")
+    if isinstance(color, str) and color:
+        return color
+    return default
+
+
+def _format_label(formatter: Any, series_name: str, name: Any, value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        value = ",".join(str(v) for v in value)
+    if not isinstance(formatter, str) or formatter.startswith("--x_x--"):
+        return "" if name is None else str(name)
+    return (
+        formatter.replace("{a}", str(series_name or ""))
+        .replace("{b}", "" if name is None else str(name))
+        .replace("{c}", "" if value is None else str(value))
+    )
+
+
+def _symbol_size(size: Any) -> tuple:
+    if isinstance(size, (list, tuple)):
+        return float(size[0]), float(size[-1])
+    if isinstance(size, (int, float)):
+        return float(size), float(size)
+    return 10.0, 10.0
+
+
+def _layout_nodes(nodes: Sequence[dict], box: tuple) -> tuple:
+    """
+    Map node coordinates into box (left, top, width, height), keeping the aspect ratio.
+    Nodes without coordinates are placed on a circle around the others.
+
+    :return: (positions, (scale, ox, oy)), a point maps to
+             (ox + x * scale, oy + y * scale)
+    """
+    left, top, width, height = box
+    points = []
+    for node in nodes:
+        x, y = node.get("x"), node.get("y")
+        if isinstance(x, (int, float)) and isinstance(y, (int, float)):
+            points.append((float(x), float(y)))
+        else:
+            points.append(None)
+    placed = [p for p in points if p is not None]
+    missing = [i for i, p in enumerate(points) if p is None]
+    if missing:
+        if placed:
+            xs, ys = [p[0] for p in placed], [p[1] for p in placed]
+            cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+            r = max(max(xs) - min(xs), max(ys) - min(ys), 1) / 2
+        else:
+            cx, cy, r = 0.0, 0.0, 1.0
+        for k, i in enumerate(missing):
+            angle = 2 * math.pi * k / len(missing) - math.pi / 2
+            points[i] = (cx + r * math.cos(angle), cy + r * math.sin(angle))
+    if not points:
+        return [], (1.0, 0.0, 0.0)
+
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    span_x, span_y = max(xs) - min(xs), max(ys) - min(ys)
+    scale = min(
+        width / span_x if span_x else math.inf, height / span_y if span_y else math.inf
+    )
+    if scale == math.inf:
+        scale = 1.0
+    ox = left + (width - span_x * scale) / 2 - min(xs) * scale
+    oy = top + (height - span_y * scale) / 2 - min(ys) * scale
+    return [(ox + x * scale, oy + y * scale) for x, y in points], (scale, ox, oy)
+
+
+def _label_anchor(position: Any, x: float, y: float, w: float, h: float) -> tuple:
+    if position == "bottom":
+        return x, y + h / 2 + LABEL_DISTANCE, "middle", "top"
+    if position == "left":
+        return x - w / 2 - LABEL_DISTANCE, y, "end", "middle"
+    if position == "right":
+        return x + w / 2 + LABEL_DISTANCE, y, "start", "middle"
+    if position in ("inside", "insideLeft", "insideRight", "insideTop", "insideBottom"):
+        return x, y, "middle", "middle"
+    return x, y - h / 2 - LABEL_DISTANCE, "middle", "bottom"
+
+
+def _link_points(p1: tuple, p2: tuple, curveness: float) -> list:
+    if not curveness:
+        return [p1, p2]
+    # same control point as ECharts: offset the midpoint along the normal
+    cx = (p1[0] + p2[0]) / 2 - (p1[1] - p2[1]) * curveness
+    cy = (p1[1] + p2[1]) / 2 - (p2[0] - p1[0]) * curveness
+    points = []
+    for k in range(CURVE_SEGMENTS + 1):
+        t = k / CURVE_SEGMENTS
+        points.append(
+            (
+                (1 - t) ** 2 * p1[0] + 2 * (1 - t) * t * cx + t**2 * p2[0],
+                (1 - t) ** 2 * p1[1] + 2 * (1 - t) * t * cy + t**2 * p2[1],
+            )
+        )
+    return points
+
+
+def _title_items(options: dict, width: float) -> tuple:
+    items = []
+    bottom = 0.0
+    titles = options.get("title") or []
+    if isinstance(titles, dict):
+        titles = [titles]
+    for title in titles:
+        if not isinstance(title, dict) or title.get("show") is False:
+            continue
+        left = title.get("left", "auto")
+        if left == "center":
+            x, anchor = width / 2, "middle"
+        elif left == "right":
+            x, anchor = width - 5, "end"
+        else:
+            x, anchor = _px(left, 5), "start"
+        y = 5.0
+        for key, size, color, weight in (
+            ("text", 18, "#333", "bold"),
+            ("subtext", 12, "#aaa", "normal"),
+        ):
+            if title.get(key):
+                style = title.get(key + "Style") or {}
+                size = style.get("fontSize") or size
+                items.append(
+                    Text(
+                        x,
+                        y,
+                        str(title[key]),
+                        size,
+                        style.get("color") or color,
+                        anchor,
+                        "top",
+                        style.get("fontWeight") or weight,
+                    )
+                )
+                y += size + 6
+        bottom = max(bottom, y)
+    return items, bottom
+
+
+def _lines_items(options: dict, transform: tuple) -> list:
+    """
+    Polylines of the lines series on cartesian2d, see Polyline
+    """
+    scale, ox, oy = transform
+    items = []
+    for series in options.get("series") or []:
+        is_cartesian = series.get("coordinateSystem") == "cartesian2d"
+        if series.get("type") != "lines" or not is_cartesian:
+            continue
+        series_line = _merge(
+            {"width": 2, "color": "#aaa", "opacity": 0.5}, series.get("lineStyle")
+        )
+        for item in series.get("data") or []:
+            coords = item.get("coords") or []
+            if len(coords) < 2:
+                continue
+            line = _merge(series_line, item.get("lineStyle"))
+            points = [(ox + x * scale, oy + y * scale) for x, y in coords]
+            if not series.get("polyline"):
+                points = _link_points(points[0], points[-1], line.get("curveness", 0))
+            items.append(
+                Polyline(
+                    points,
+                    _solid_color(line.get("color"), "#aaa"),
+                    line.get("width", 2),
+                    line.get("opacity", 0.5),
+                    line.get("type", "solid"),
+                )
+            )
+    return items
+
+
+def build_scene(options: dict, width: float, height: float) -> Scene:
+    """
+    Turn the options of a Graph chart into a flat list of drawing items.
+    """
+    series_list = [s for s in options.get("series") or [] if s.get("type") == "graph"]
+    if not series_list:
+        raise TypeError("snapshot_svg only draws graph series")
+    palette = options.get("color") or DEFAULT_COLORS
+    background = _solid_color(options.get("backgroundColor"), "#ffffff")
+
+    items, title_bottom = _title_items(options, width)
+    box = (
+        40,
+        max(title_bottom, 20) + 20,
+        width - 80,
+        height - max(title_bottom, 20) - 60,
+    )
+    link_items, node_items = [], []
+    for index, series in enumerate(series_list):
+        nodes = series.get("data") or series.get("nodes") or []
+        links = series.get("links") or series.get("edges") or []
+        categories = series.get("categories") or []
+        positions, transform = _layout_nodes(nodes, box)
+        if index == 0 and series.get("coordinateSystem") == "cartesian2d":
+            link_items += _lines_items(options, transform)
+
+        series_label = series.get("label") or {}
+        series_item = series.get("itemStyle") or {}
+        name_index, styles = {}, []
+        for i, (node, (x, y)) in enumerate(zip(nodes, positions)):
+            name_index.setdefault(node.get("name"), i)
+            category = node.get("category")
+            category_opts = {}
+            if isinstance(category, int) and 0 <= category < len(categories):
+                category_opts = categories[category] or {}
+            item_style = _merge(
+                series_item, category_opts.get("itemStyle"), node.get("itemStyle")
+            )
+            default_color = palette[
+                (category if isinstance(category, int) else index) % len(palette)
+            ]
+            fill = _solid_color(item_style.get("color"), default_color)
+            w, h = _symbol_size(node.get("symbolSize", series.get("symbolSize")))
+            shape = _merge(
+                {"symbol": "circle"},
+                series,
+                category_opts,
+                {"symbol": node.get("symbol")},
+            )["symbol"]
+            opacity = item_style.get("opacity", 1)
+            styles.append(fill)
+            node_items.append(
+                Symbol(
+                    shape,
+                    x,
+                    y,
+                    w,
+                    h,
+                    fill,
+                    _solid_color(item_style.get("borderColor"), ""),
+                    item_style.get("borderWidth", 0),
+                    opacity,
+                )
+            )
+            label = _merge(series_label, category_opts.get("label"), node.get("label"))
+            if label.get("show"):
+                lx, ly, anchor, baseline = _label_anchor(
+                    label.get("position"), x, y, w, h
+                )
+                inside = anchor == "middle" and baseline == "middle"
+                node_items.append(
+                    Text(
+                        lx,
+                        ly,
+                        _format_label(
+                            label.get("formatter", "{b}"),
+                            series.get("name"),
+                            node.get("name"),
+                            node.get("value"),
+                        ),
+                        label.get("fontSize") or 12,
+                        label.get("color") or ("#fff" if inside else "#333"),
+                        anchor,
+                        baseline,
+                        label.get("fontWeight") or "normal",
+                    )
+                )
+
+        series_line = _merge(
+            {"width": 1, "color": "#aaa", "opacity": 0.5}, series.get("lineStyle")
+        )
+        series_edge_label = series.get("edgeLabel") or {}
+        for link in links:
+            ends = []
+            for key in ("source", "target"):
+                ref = link.get(key)
+                ends.append(
+                    ref
+                    if isinstance(ref, int) and ref < len(nodes)
+                    else name_index.get(ref)
+                )
+            if None in ends:
+                continue
+            line = _merge(series_line, link.get("lineStyle"))
+            if line.get("show") is False:
+                continue
+            color = line.get("color")
+            if color == "source":
+                color = styles[ends[0]]
+            elif color == "target":
+                color = styles[ends[1]]
+            points = _link_points(
+                positions[ends[0]], positions[ends[1]], line.get("curveness", 0)
+            )
+            link_items.append(
+                Polyline(
+                    points,
+                    _solid_color(color, "#aaa"),
+                    line.get("width", 1),
+                    line.get("opacity", 0.5),
+                    line.get("type", "solid"),
+                )
+            )
+            label = _merge(series_edge_label, link.get("label"))
+            if label.get("show"):
+                mx, my = (
+                    points[len(points) // 2]
+                    if len(points) > 2
+                    else (
+                        (points[0][0] + points[1][0]) / 2,
+                        (points[0][1] + points[1][1]) / 2,
+                    )
+                )
+                link_items.append(
+                    Text(
+                        mx,
+                        my - 2,
+                        _format_label(
+                            label.get("formatter", "{c}"),
+                            series.get("name"),
+                            None,
+                            link.get("value"),
+                        ),
+                        label.get("fontSize") or 12,
+                        label.get("color") or "#333",
+                        "middle",
+                        "bottom",
+                        label.get("fontWeight") or "normal",
+                    )
+                )
+    # links are drawn below nodes
+    return Scene(width, height, background, link_items + node_items + items)
+
+
+def stack_scenes(scenes: Sequence[Scene]) -> Scene:
+    """
+    Put the scenes one below the other, like the charts of a Page
+    """
+    if len(scenes) == 1:
+        return scenes[0]
+    items, top = [], 0.0
+    for scene in scenes:
+        for item in scene.items:
+            if isinstance(item, Polyline):
+                item = item._replace(points=[(x, y + top) for x, y in item.points])
+            else:
+                item = item._replace(y=item.y + top)
+            items.append(item)
+        top += scene.height
+    width = max(scene.width for scene in scenes)
+    return Scene(width, top, scenes[0].background, items)
+
+
+def _symbol_path(s: Symbol) -> list:
+    """
+    Polygon vertices of a symbol, None for circle like symbols
+    """
+    x, y, hw, hh = s.x, s.y, s.w / 2, s.h / 2
+    if s.shape in ("triangle", "arrow"):
+        return [(x, y - hh), (x + hw, y + hh), (x - hw, y + hh)]
+    if s.shape == "diamond":
+        return [(x, y - hh), (x + hw, y), (x, y + hh), (x - hw, y)]
+    if s.shape in ("rect", "roundRect"):
+        return [(x - hw, y - hh), (x + hw, y - hh), (x + hw, y + hh), (x - hw, y + hh)]
+    return None
+
+
+_SVG_BASELINE = {"top": "hanging", "middle": "central", "bottom": "auto"}
+_SVG_DASH = {"dashed": "4,4", "dotted": "1,3"}
+
+
+def to_svg(scene: Scene) -> str:
+    def _num(v):
+        return "{:.2f}".format(v).rstrip("0").rstrip(".")
+
+    out = [
+        '<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+        'width="{0}" height="{1}" viewBox="0 0 {0} {1}">'.format(
+            _num(scene.width), _num(scene.height)
+        ),
+        '<rect width="100%" height="100%" fill={}/>'.format(quoteattr(scene.background)),
+    ]
+    for item in scene.items:
+        if isinstance(item, Polyline):
+            dash = _SVG_DASH.get(item.dash)
+            out.append(
+                '<polyline points="{}" fill="none" stroke={} stroke-width="{}" '
+                'stroke-opacity="{}"{}/>'.format(
+                    " ".join("{},{}".format(_num(x), _num(y)) for x, y in item.points),
+                    quoteattr(item.color),
+                    _num(item.width),
+                    _num(item.opacity),
+                    ' stroke-dasharray="{}"'.format(dash) if dash else "",
+                )
+            )
+        elif isinstance(item, Symbol):
+            if item.shape == "none":
+                continue
+            style = 'fill={} fill-opacity="{}"'.format(
+                quoteattr(item.fill), _num(item.opacity)
+            )
+            if item.stroke and item.stroke_width:
+                style += ' stroke={} stroke-width="{}"'.format(
+                    quoteattr(item.stroke), _num(item.stroke_width)
+                )
+            vertices = _symbol_path(item)
+            if item.shape == "roundRect":
+                out.append(
+                    '<rect x="{}" y="{}" width="{}" height="{}" rx="{}" {}/>'.format(
+                        _num(item.x - item.w / 2),
+                        _num(item.y - item.h / 2),
+                        _num(item.w),
+                        _num(item.h),
+                        _num(min(item.w, item.h) / 4),
+                        style,
+                    )
+                )
+            elif vertices:
+                out.append(
+                    '<polygon points="{}" {}/>'.format(
+                        " ".join("{},{}".format(_num(x), _num(y)) for x, y in vertices),
+                        style,
+                    )
+                )
+            else:
+                out.append(
+                    '<ellipse cx="{}" cy="{}" rx="{}" ry="{}" {}/>'.format(
+                        _num(item.x),
+                        _num(item.y),
+                        _num(item.w / 2),
+                        _num(item.h / 2),
+                        style,
+                    )
+                )
+        elif isinstance(item, Text):
+            if not item.text:
+                continue
+            out.append(
+                '<text x="{}" y="{}" font-size="{}" font-weight="{}" fill={} '
+                'text-anchor="{}" dominant-baseline="{}" '
+                'font-family="sans-serif">{}</text>'.format(
+                    _num(item.x),
+                    _num(item.y),
+                    _num(item.size),
+                    item.weight,
+                    quoteattr(item.color),
+                    item.anchor,
+                    _SVG_BASELINE.get(item.baseline, "auto"),
+                    escape(item.text),
+                )
+            )
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+def _rgba(color: str, opacity: float = 1) -> tuple:
+    from PIL import ImageColor
+
+    color = color.strip()
+    match = re.match(r"rgba?\(([^)]*)\)", color)
+    if match:
+        parts = [float(v) for v in match.group(1).split(",")]
+        alpha = parts[3] if len(parts) > 3 else 1
+        rgb = tuple(int(v) for v in parts[:3])
+    else:
+        try:
+            rgb = ImageColor.getrgb(color)[:3]
+        except ValueError:
+            rgb = (170, 170, 170)
+        alpha = 1
+    return rgb + (int(round(255 * alpha * opacity)),)
+
+
+def _load_font(size: float, bold: bool):
+    from PIL import ImageFont
+
+    name = "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf"
+    try:
+        return ImageFont.truetype(name, int(size))
+    except OSError:
+        return ImageFont.load_default()
+
+
+def to_image(scene: Scene, pixel_ratio: float = 1):
+    """
+    Rasterize the scene with Pillow, returns a RGBA image
+    """
+    try:
+        from PIL import Image, ImageDraw
+    except ModuleNotFoundError:
+        raise Exception("Please install PIL for raster snapshot output")
+
+    r = pixel_ratio
+    image = Image.new(
+        "RGBA", (int(scene.width * r), int(scene.height * r)), _rgba(scene.background)
+    )
+    draw = ImageDraw.Draw(image, "RGBA")
+    fonts = {}
+    for item in scene.items:
+        if isinstance(item, Polyline):
+            draw.line(
+                [(x * r, y * r) for x, y in item.points],
+                fill=_rgba(item.color, item.opacity),
+                width=max(1, int(round(item.width * r))),
+            )
+        elif isinstance(item, Symbol):
+            if item.shape == "none":
+                continue
+            fill = _rgba(item.fill, item.opacity)
+            outline = _rgba(item.stroke) if item.stroke and item.stroke_width else None
+            border = max(1, int(round(item.stroke_width * r))) if outline else 0
+            vertices = _symbol_path(item)
+            box = [
+                (item.x - item.w / 2) * r,
+                (item.y - item.h / 2) * r,
+                (item.x + item.w / 2) * r,
+                (item.y + item.h / 2) * r,
+            ]
+            if item.shape == "roundRect" and hasattr(draw, "rounded_rectangle"):
+                draw.rounded_rectangle(
+                    box,
+                    radius=min(item.w, item.h) / 4 * r,
+                    fill=fill,
+                    outline=outline,
+                    width=border,
+                )
+            elif vertices:
+                draw.polygon(
+                    [(x * r, y * r) for x, y in vertices], fill=fill, outline=outline
+                )
+            else:
+                draw.ellipse(box, fill=fill, outline=outline, width=border)
+        elif isinstance(item, Text):
+            if not item.text:
+                continue
+            key = (item.size, item.weight == "bold")
+            if key not in fonts:
+                fonts[key] = _load_font(item.size * r, key[1])
+            left, top, right, bottom = draw.textbbox((0, 0), item.text, font=fonts[key])
+            w, h = right - left, bottom - top
+            x = item.x * r - {"start": 0, "middle": w / 2, "end": w}[item.anchor]
+            y = item.y * r - {"top": 0, "middle": h / 2, "bottom": h}[item.baseline]
+            draw.text(
+                (x - left, y - top), item.text, fill=_rgba(item.color), font=fonts[key]
+            )
+    return image
+
+
+def to_image_bytes(
+    scene: Scene, image_format: str = "png", pixel_ratio: float = 1
+) -> bytes:
+    image = to_image(scene, pixel_ratio)
+    if image_format == "jpeg":
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, image_format)
+    return buffer.getvalue()
@@ -20,6 +20,7 @@ __extra_requires__ = {
     "phantomjs": ["snapshot-phantomjs"],
     "pyppeteer": ["snapshot-pyppeteer"],
     "images": ["PIL"],
+    "numpy": ["numpy"],
 }
 
 __keywords__ = ["Echarts", "charts", "plotting-tool"]
@@ -4,6 +4,7 @@ from io import StringIO
 from test import stdout_redirect
 from unittest.mock import patch
 
+import numpy as np
 from nose.tools import assert_equal, assert_greater, assert_in, assert_not_in
 
 from pyecharts import options as opts
@@ -288,3 +289,36 @@ def test_bar_with_brush(fake_writer):
     c.render()
     _, content = fake_writer.call_args[0]
     assert_in("brush", content)
+
+
+def test_bar_numpy_data():
+    c = Bar().add_xaxis(np.array(["A", "B", "C"])).add_yaxis("s", np.array([1, 2, 4]))
+    assert_equal(c.options["series"][0]["data"], [1, 2, 4])
+    assert_in('"A"', c.dump_options())
+    c = (
+        Bar()
+        .add_xaxis(list("ABCDEF"))
+        .add_yaxis(
+            "s", np.array([1, 5, 2, 8, 3, 1]), downsample=4, downsample_method="minmax"
+        )
+    )
+    assert_equal(
+        c.options["series"][0]["data"], [["A", 1], ["B", 5], ["D", 8], ["F", 1]]
+    )
+    assert_equal(c.options["xAxis"][0]["data"], list("ABCDEF"))
+
+
+def test_bar_downsample_mixed_series():
+    # the raw series keeps its categories next to a downsampled one
+    y = np.arange(1000)
+    c = (
+        Bar()
+        .add_xaxis(np.arange(1000))
+        .add_yaxis("raw", y)
+        .add_yaxis("sampled", y * 2, downsample=50)
+    )
+    assert_equal(c.options["xAxis"][0]["data"].tolist(), list(range(1000)))
+    assert_equal(c.options["series"][0]["data"], list(range(1000)))
+    data = c.options["series"][1]["data"]
+    assert_equal(len(data), 50)
+    assert_equal(all(b == 2 * a and isinstance(a, int) for a, b in data), True)
@@ -1,9 +1,12 @@
+import os
+import tempfile
 from unittest.mock import patch
 
 from nose.tools import assert_equal, assert_not_in
 
 from pyecharts.charts import Bar
 from pyecharts.charts.base import Base
+from pyecharts.globals import CurrentConfig, _template_bytecode_cache
 
 
 def test_base_add_functions():
@@ -30,3 +33,14 @@ def test_render(fake_writer):
     bar = Bar()
     bar.add_xaxis(["1"]).add_yaxis("", [1]).render(my_render_content=my_render_content)
     assert "test ok" == "test ok"
+
+
+def test_render_with_template_bytecode_cache():
+    assert_equal(_template_bytecode_cache(""), None)
+    cache_dir = os.path.join(tempfile.mkdtemp(), "templates")
+    env = CurrentConfig.GLOBAL_ENV.overlay(
+        bytecode_cache=_template_bytecode_cache(cache_dir), cache_size=0
+    )
+    content = Bar().add_xaxis(["A"]).add_yaxis("B", [1]).render_embed(env=env)
+    assert_equal(len(os.listdir(cache_dir)), 2)  # simple_chart.html and macro
+    assert_not_in("{%", content)
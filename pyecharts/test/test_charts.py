@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+from nose.tools import assert_equal, assert_in, assert_not_in, raises
+
+from pyecharts import charts
+
+
+def test_lazy_chart_import():
+    code = (
+        "import sys\n"
+        "from pyecharts.charts import Graph\n"
+        "print(' '.join(m for m in sys.modules if m.startswith('pyecharts.charts.')))"
+    )
+    env = dict(os.environ)
+    package_dir = os.path.dirname(os.path.dirname(charts.__file__))
+    env["PYTHONPATH"] = os.path.dirname(package_dir)
+    loaded = subprocess.run(
+        [sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True
+    ).stdout.split()
+    assert_in("pyecharts.charts.basic_charts.graph", loaded)
+    assert_not_in("pyecharts.charts.basic_charts.geo", loaded)
+    assert_not_in("pyecharts.charts.three_axis_charts.map3D", loaded)
+
+
+def test_chart_exports():
+    from pyecharts.charts.basic_charts.kline import Kline
+
+    assert_equal(charts.Candlestick, Kline)
+    for name in charts.__all__:
+        cls_name = "Kline" if name == "Candlestick" else name
+        assert_equal(getattr(charts, name).__name__, cls_name)
+    assert_in("Graph", dir(charts))
+
+
+@raises(AttributeError)
+def test_chart_unknown_attribute():
+    _ = charts.NotAChart
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from unittest.mock import patch
 
 from nose.tools import assert_equal, raises
@@ -6,7 +7,7 @@ from nose.tools import assert_equal, raises
 from pyecharts.datasets import EXTRA, FuzzyDict, register_url
 
 
-@patch("pyecharts.datasets.urllib.request.urlopen")
+@patch("urllib.request.urlopen")
 def test_register_url(fake):
     current_path = os.path.dirname(__file__)
     fake_registry = os.path.join(current_path, "fixtures", "registry.json")
@@ -36,3 +37,75 @@ def test_fuzzy_search_key_error():
     fd = FuzzyDict()
     fd.cutoff = 0.9
     _ = fd["我是北京"]
+
+
+def test_lazy_datasets_with_cache():
+    import pyecharts.datasets as datasets
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        stale = os.path.join(cache_dir, "map_filename.1-2.pickle")
+        open(stale, "wb").close()
+        with patch.dict(os.environ, {"PYECHARTS_CACHE_DIR": cache_dir}):
+            from_json = datasets._load_json_with_cache("map_filename.json")
+            # the cache of an older json file is replaced
+            assert_equal(len(os.listdir(cache_dir)), 1)
+            assert_equal(os.path.exists(stale), False)
+            from_cache = datasets._load_json_with_cache("map_filename.json")
+    assert_equal(from_json, from_cache)
+    assert_equal(datasets.FILENAMES["echarts"], from_json["echarts"])
+
+
+def test_lazy_datasets_cache_off_by_default():
+    import pyecharts.datasets as datasets
+
+    with patch.dict(os.environ, clear=True):
+        with patch("pickle.dump") as fake_dump:
+            datasets._load_json_with_cache("map_filename.json")
+    assert_equal(fake_dump.called, False)
+
+
+@raises(AttributeError)
+def test_datasets_unknown_attribute():
+    import pyecharts.datasets as datasets
+
+    _ = datasets.NOT_A_DATASET
+
+
+def test_fuzzy_dict_index_follows_updates():
+    fd = FuzzyDict()
+    fd["我是北京市"] = [1, 2]
+    assert_equal(fd["我是北京"], [1, 2])
+    fd["我是北京"] = [3, 4]
+    assert_equal(fd["我是北京"], [3, 4])
+    del fd["我是北京"]
+    fd.pop("我是北京市")
+    assert_equal("我是北京" in fd, False)
+    fd.update({"我是上海市": [5, 6]})
+    assert_equal(fd["我是上海"], [5, 6])
+
+
+def test_fuzzy_dict_lru_cache():
+    fd = FuzzyDict()
+    fd.cache_size = 2
+    fd.update({"北京市": 1, "上海市": 2, "广州市": 3})
+    for name in ("北京", "上海", "广州"):
+        _ = fd[name]
+    assert_equal(list(k for k, _ in fd._cache), ["上海", "广州"])
+    fd["深圳市"] = 4
+    assert_equal(len(fd._cache), 0)
+
+
+def test_fuzzy_dict_exact_view():
+    fd = FuzzyDict()
+    fd.update({"echarts": ["echarts.min", "js"]})
+    assert_equal("echarts" in fd.exact, True)
+    assert_equal("echart" in fd.exact, False)
+    assert_equal("echart" in fd, True)
+    assert_equal(fd.exact["echarts"], ["echarts.min", "js"])
+
+
+@raises(KeyError)
+def test_fuzzy_dict_exact_view_key_error():
+    fd = FuzzyDict()
+    fd.update({"echarts": ["echarts.min", "js"]})
+    _ = fd.exact["echart"]
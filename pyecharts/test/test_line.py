@@ -1,6 +1,7 @@
 from unittest.mock import patch
 
-from nose.tools import assert_equal, assert_in
+import numpy as np
+from nose.tools import assert_equal, assert_in, assert_not_in
 
 from pyecharts import options as opts
 from pyecharts.charts import Line
@@ -90,3 +91,31 @@ def test_line_opts_with_zlevel_z(fake_writer):
     _, content = fake_writer.call_args[0]
     assert_in("zlevel", content)
     assert_in("z", content)
+
+
+def test_line_numpy_data():
+    x = np.arange(4)
+    y = np.array([1.5, 2.0, np.nan, 4.0])
+    c = Line().add_xaxis(x).add_yaxis("series0", y)
+    data = c.options["series"][0]["data"]
+    assert_equal(data[:2], [[0, 1.5], [1, 2]])
+    content = c.dump_options()
+    assert_in("null", content)
+    assert_not_in("NaN", content)
+
+
+def test_line_downsample():
+    x = np.arange(100000)
+    y = np.sin(x / 1000)
+    c = (
+        Line()
+        .add_xaxis(x)
+        .add_yaxis("series0", y, downsample=200)
+        .add_yaxis("series1", y * 2, downsample=200, downsample_method="minmax")
+    )
+    data = c.options["series"][0]["data"]
+    assert_equal(len(data), 200)
+    assert_equal(data[0], [0, 0])
+    # x values keep their dtype, the x axis keeps all of its data
+    assert_equal(type(data[-1][0]), int)
+    assert_equal(len(c.get_options()["xAxis"][0]["data"]), 100000)
@@ -163,3 +163,20 @@ def test_page_resize():
     )
     assert_not_in(".resizable()", content)
     assert_not_in(".draggable()", content)
+
+
+def test_page_lazy_render_embed():
+    bar = _create_bar()
+    line = _create_line()
+    content = Page(is_lazy=True).add(bar, line, _create_table()).render_embed()
+    assert_in("IntersectionObserver", content)
+    assert_in("pyecharts_lazy_charts['{}']".format(bar.chart_id), content)
+    assert_in('<script type="text/plain" id="option_{}">'.format(line.chart_id), content)
+    assert_in("fl-table", content)
+    # charts are only initialized inside the lazy init functions
+    assert_not_in("var chart_{} = echarts.init".format(bar.chart_id), content)
+
+
+def test_page_not_lazy_by_default():
+    content = Page().add(_create_bar()).render_embed()
+    assert_not_in("IntersectionObserver", content)
@@ -0,0 +1,54 @@
+import numpy as np
+from nose.tools import assert_equal, assert_in, assert_true, raises
+
+from pyecharts.commons import sampling
+
+
+def _series(n: int = 10000):
+    x = np.arange(n, dtype=np.float64)
+    y = np.sin(x / 300) + np.random.RandomState(0).normal(0, 0.05, n)
+    y[n // 2] = 10
+    return x, y
+
+
+def test_lttb():
+    x, y = _series()
+    index = sampling.lttb(x, y, 500)
+    assert_equal(len(index), 500)
+    assert_equal((index[0], index[-1]), (0, len(y) - 1))
+    assert_true((np.diff(index) > 0).all())
+    # the spike is the largest triangle of its bucket
+    assert_in(5000, index)
+
+
+def test_lttb_small_input():
+    x, y = _series(10)
+    assert_equal(sampling.lttb(x, y, 20).tolist(), list(range(10)))
+
+
+def test_minmax():
+    x, y = _series()
+    index = sampling.minmax(y, 500)
+    assert_true(len(index) <= 500)
+    assert_true((np.diff(index) > 0).all())
+    assert_in(5000, index)
+    assert_in(int(y.argmin()), index)
+
+
+@raises(ValueError)
+def test_downsample_unknown_method():
+    x, y = _series(100)
+    sampling.downsample(x, y, 10, "average")
+
+
+def test_series_data():
+    data, index = sampling.series_data(["a", "b", "c"], np.array([1, 2, 3]))
+    assert_equal(data, [["a", 1], ["b", 2], ["c", 3]])
+    assert_equal(index, None)
+    data, _ = sampling.series_data([1, 2], np.array([[5, 6], [7, 8]]))
+    assert_equal(data, [[1, 5, 6], [2, 7, 8]])
+    data, _ = sampling.series_data(["a", "b"], np.array([1.5, 2]), is_pair=False)
+    assert_equal(data, [1.5, 2.0])
+    data, index = sampling.series_data(list("abcdef"), [1, 5, 2, 8, 3, 1], 4, "minmax")
+    assert_equal(data, [["a", 1], ["b", 5], ["d", 8], ["f", 1]])
+    assert_equal(index.tolist(), [0, 1, 3, 5])
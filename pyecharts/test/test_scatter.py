@@ -1,5 +1,6 @@
 from unittest.mock import patch
 
+import numpy as np
 from nose.tools import assert_equal
 
 from pyecharts import options as opts
@@ -38,3 +39,10 @@ def test_scatter_item_base(fake_writer):
     _, content = fake_writer.call_args[0]
     assert_equal(c.theme, "white")
     assert_equal(c.renderer, "canvas")
+
+
+def test_scatter_numpy_data():
+    c = Scatter().add_xaxis([1, 2]).add_yaxis("s", np.array([[3, 4], [5, 6]]))
+    assert_equal(c.options["series"][0]["data"], [[1, 3, 4], [2, 5, 6]])
+    c = Scatter().add_yaxis("s", np.array([3, 4]))
+    assert_equal(c.options["series"][0]["data"], [3, 4])
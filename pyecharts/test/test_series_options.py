@@ -1,6 +1,6 @@
 from nose.tools import assert_equal
 
-from pyecharts.options.series_options import LabelOpts
+from pyecharts.options.series_options import LabelOpts, LineStyleOpts
 
 
 def test_label_options_defaults():
@@ -8,23 +8,7 @@ def test_label_options_defaults():
     expected = {
         "show": True,
         "position": "top",
-        "color": None,
-        "distance": None,
-        "rotate": None,
         "margin": 8,
-        "interval": None,
-        "fontSize": None,
-        "fontStyle": None,
-        "fontWeight": None,
-        "fontFamily": None,
-        "align": None,
-        "verticalAlign": None,
-        "formatter": None,
-        "backgroundColor": None,
-        "borderColor": None,
-        "borderWidth": None,
-        "borderRadius": None,
-        "rich": None,
     }
     assert_equal(expected, option.opts)
 
@@ -36,22 +20,24 @@ def test_label_options_custom():
     expected = {
         "show": True,
         "position": "top",
-        "color": None,
-        "distance": None,
-        "rotate": None,
         "margin": 8,
-        "interval": None,
-        "fontSize": None,
-        "fontStyle": None,
-        "fontWeight": None,
-        "fontFamily": None,
-        "align": None,
-        "verticalAlign": None,
-        "formatter": None,
         "backgroundColor": "red",
         "borderColor": "green",
         "borderWidth": 1,
         "borderRadius": 2,
-        "rich": None,
+    }
+    assert_equal(expected, option.opts)
+
+
+def test_options_update_none_removes_key():
+    option = LineStyleOpts(width=2, color="red")
+    option.update(color=None, shadowBlur=3)
+    expected = {
+        "show": True,
+        "width": 2,
+        "opacity": 1,
+        "curveness": 0,
+        "type": "solid",
+        "shadowBlur": 3,
     }
     assert_equal(expected, option.opts)
@@ -1,9 +1,18 @@
+import base64
+import os
 from unittest.mock import patch
 
-from nose.tools import assert_equal, raises
+from nose.tools import (
+    assert_equal,
+    assert_is_instance,
+    assert_is_none,
+    assert_true,
+    raises,
+)
 
 from pyecharts.charts import Bar
-from pyecharts.render import make_snapshot
+from pyecharts.render import make_snapshot, make_snapshots
+from pyecharts.render.snapshot import save_content
 
 
 def _gen_faker_engine(content: str):
@@ -64,3 +73,75 @@ def test_make_snapshot_text(fake_writer):
     make_snapshot(eng, _gen_bar_chart(), "make_snapshot.svg")
     _ = fake_writer.call_args[0]
     assert_equal("test ok", "test ok")
+
+
+def test_make_snapshots():
+    class Engine:
+        def __init__(self):
+            self.calls = []
+
+        def make_snapshot(self, html_path, file_type, **kwargs):
+            self.calls.append((html_path, file_type, kwargs["driver"]))
+            if html_path == "bad.html":
+                raise OSError("bad file")
+            payload = base64.b64encode(html_path.encode("utf-8")).decode("utf-8")
+            if file_type == "svg":
+                return "<svg/>"
+            return "data:image/png;base64," + payload.rstrip("=")
+
+    eng = Engine()
+    jobs = [
+        ("a.html", "make_snapshots_a.png"),
+        ("bad.html", "make_snapshots_bad.png"),
+        ("c.html", "make_snapshots_c.svg"),
+    ]
+    results = make_snapshots(eng, jobs, driver="session", max_workers=2)
+    # the same engine session is used for every file
+    assert_equal([c[2] for c in eng.calls], ["session"] * 3)
+    assert_equal([r.output_name for r in results], [j[1] for j in jobs])
+    assert_is_none(results[0].error)
+    assert_is_instance(results[1].error, OSError)
+    assert_is_none(results[2].error)
+    assert_true(all(r.engine_time >= 0 and r.save_time >= 0 for r in results))
+    with open("make_snapshots_a.png", "rb") as f:
+        assert_equal(f.read(), b"a.html")
+    with open("make_snapshots_c.svg", "r") as f:
+        assert_equal(f.read(), "<svg/>")
+    os.unlink("make_snapshots_a.png")
+    os.unlink("make_snapshots_c.svg")
+
+
+def test_save_base64_stream():
+    data = bytes(range(256)) * 50
+    content = "data:image/png;base64," + base64.b64encode(data).decode("utf-8")
+    with patch("pyecharts.render.snapshot.DECODE_CHUNK_SIZE", 64):
+        save_content(content, "save_base64_stream.png")
+    with open("save_base64_stream.png", "rb") as f:
+        assert_equal(f.read(), data)
+    # line breaks of MIME base64 do not shift the groups of 4 characters
+    content = "data:image/png;base64," + base64.encodebytes(data).decode("utf-8")
+    with patch("pyecharts.render.snapshot.DECODE_CHUNK_SIZE", 50):
+        save_content(content.rstrip("=\n"), "save_base64_stream.png")
+    with open("save_base64_stream.png", "rb") as f:
+        assert_equal(f.read(), data)
+    os.unlink("save_base64_stream.png")
+
+
+def test_make_snapshots_process_pool():
+    eng = _gen_faker_engine("<svg/>")
+    jobs = [("a.html", "make_snapshots_p.svg")]
+    results = make_snapshots(eng, jobs, max_workers=1, executor="process")
+    assert_is_none(results[0].error)
+    with open("make_snapshots_p.svg", "r") as f:
+        assert_equal(f.read(), "<svg/>")
+    os.unlink("make_snapshots_p.svg")
+
+
+@raises(ValueError)
+def test_make_snapshots_unknown_executor():
+    make_snapshots(_gen_faker_engine(""), [], executor="fiber")
+
+
+@raises(OSError)
+def test_save_content_raise_os_error():
+    save_content("fake content", "save_content.png")
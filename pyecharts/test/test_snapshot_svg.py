@@ -0,0 +1,142 @@
+import os
+
+from nose.tools import assert_equal, assert_in, assert_not_in, raises
+
+from pyecharts import options as opts
+from pyecharts.charts import Bar, Graph, Page, Tab
+from pyecharts.commons.utils import JsCode
+from pyecharts.render import make_snapshot, snapshot_svg
+
+
+def _gen_graph(**kwargs) -> Graph:
+    nodes = [
+        opts.GraphNode(name="A", x=0, y=0, symbol_size=20, category=0),
+        opts.GraphNode(name="B<1>", x=100, y=50, symbol="rect", category=1),
+        opts.GraphNode(name="C", x=50, y=100, symbol="diamond", value=[3, 4]),
+    ]
+    links = [
+        opts.GraphLink(
+            source="A",
+            target="B<1>",
+            value=5,
+            linestyle_opts=opts.LineStyleOpts(width=4, color="green"),
+        ),
+        opts.GraphLink(source="B<1>", target="C"),
+    ]
+    categories = [opts.GraphCategory(name="c0"), opts.GraphCategory(name="c1")]
+    return (
+        Graph(opts.InitOpts(width="600px", height="400px"))
+        .add("", nodes, links, categories, layout="none", **kwargs)
+        .set_global_opts(title_opts=opts.TitleOpts(title="Snapshot"))
+    )
+
+
+def test_snapshot_svg_from_chart():
+    content = snapshot_svg.make_snapshot("", "svg", chart=_gen_graph())
+    assert_in('width="600" height="400"', content)
+    assert_equal(content.count("<polyline"), 2)
+    assert_equal(content.count("<ellipse"), 1)
+    assert_equal(content.count("<polygon"), 2)
+    assert_in('stroke="green" stroke-width="4"', content)
+    assert_in(">Snapshot</text>", content)
+    assert_in(">B&lt;1&gt;</text>", content)
+    # category colors follow the palette
+    assert_in('fill="#c23531"', content)
+    assert_in('fill="#2f4554"', content)
+
+
+def test_snapshot_svg_label_formatter():
+    c = _gen_graph(label_opts=opts.LabelOpts(formatter="{b}:{c}"))
+    content = snapshot_svg.make_snapshot("", "svg", chart=c)
+    assert_in(">C:3,4</text>", content)
+
+
+def test_snapshot_svg_js_formatter():
+    c = _gen_graph(
+        label_opts=opts.LabelOpts(formatter=JsCode("function(p){return '}';}"))
+    )
+    content = snapshot_svg.make_snapshot("", "svg", chart=c)
+    assert_not_in("function", content)
+    assert_in(">A</text>", content)
+
+
+def test_snapshot_svg_from_html():
+    html = _gen_graph().render("snapshot_svg.html")
+    make_snapshot(snapshot_svg, html, "snapshot_svg.svg", is_remove_html=True)
+    with open("snapshot_svg.svg", "r", encoding="utf-8") as f:
+        content = f.read()
+    os.unlink("snapshot_svg.svg")
+    assert_in('width="600" height="400"', content)
+    assert_equal(content.count("<polyline"), 2)
+
+
+def test_snapshot_svg_lazy_tab():
+    c0, c1 = _gen_graph(), Graph().add("", [opts.GraphNode(name="X")], [])
+    tab = Tab(is_lazy=True)
+    tab.add(c0, "c0")
+    tab.add(c1, "c1")
+    html = tab.render("snapshot_svg_tab.html")
+    with open(html, "r", encoding="utf-8") as f:
+        options, width, height = snapshot_svg.load_options(f.read(), c1.chart_id)
+    os.unlink(html)
+    assert_equal(options["series"][0]["data"][0]["name"], "X")
+    assert_equal((width, height), (900, 500))
+
+
+def test_snapshot_svg_all_charts_of_page():
+    c0, c1 = _gen_graph(), Graph().add("", [opts.GraphNode(name="X")], [])
+    html = Page().add(c0, c1).render("snapshot_svg_page.html")
+    make_snapshot(snapshot_svg, html, "snapshot_svg_page.svg")
+    with open("snapshot_svg_page.svg", "r", encoding="utf-8") as f:
+        content = f.read()
+    os.unlink("snapshot_svg_page.svg")
+    # both charts, one below the other
+    assert_in('width="900" height="900"', content)
+    assert_equal(content.count("<ellipse"), 2)
+    with open(html, "r", encoding="utf-8") as f:
+        text = f.read()
+    os.unlink(html)
+    try:
+        snapshot_svg.load_options(text)
+    except ValueError as err:
+        assert_in(c1.chart_id, str(err))
+    else:
+        raise AssertionError("several charts without chart_id")
+
+
+def test_snapshot_svg_lines_on_cartesian():
+    c = _gen_graph()
+    c.options["series"][0].update(coordinateSystem="cartesian2d")
+    c.options["series"].append(
+        {
+            "type": "lines",
+            "coordinateSystem": "cartesian2d",
+            "polyline": True,
+            "lineStyle": {"color": "#868e96", "width": 1},
+            "data": [{"coords": [[0, 0], [50, 20], [100, 50]]}],
+        }
+    )
+    content = snapshot_svg.make_snapshot("", "svg", chart=c)
+    assert_equal(content.count("<polyline"), 3)
+    # the polyline ends on the nodes A and B<1>
+    scene = snapshot_svg.build_scene(
+        snapshot_svg.json.loads(c.dump_options()), 600, 400
+    )
+    line = scene.items[0]
+    symbols = [item for item in scene.items if isinstance(item, snapshot_svg.Symbol)]
+    assert_equal(line.color, "#868e96")
+    assert_equal(len(line.points), 3)
+    assert_equal(line.points[0], (symbols[0].x, symbols[0].y))
+    assert_equal(line.points[-1], (symbols[1].x, symbols[1].y))
+
+
+def test_snapshot_svg_missing_positions():
+    c = Graph().add("", [opts.GraphNode(name=str(i)) for i in range(4)], [])
+    content = snapshot_svg.make_snapshot("", "svg", chart=c)
+    assert_equal(content.count("<ellipse"), 4)
+
+
+@raises(TypeError)
+def test_snapshot_svg_not_graph():
+    c = Bar().add_xaxis(["A"]).add_yaxis("s", [1])
+    snapshot_svg.make_snapshot("", "svg", chart=c)
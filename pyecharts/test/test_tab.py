@@ -3,6 +3,7 @@ from unittest.mock import patch
 
 from nose.tools import assert_equal, assert_in, assert_true
 
+from pyecharts import options as opts
 from pyecharts.charts import Bar, Line, Tab
 from pyecharts.commons.utils import OrderedSet
 from pyecharts.components import Table
@@ -84,3 +85,14 @@ def test_tab_attr():
     tab = Tab()
     assert_true(isinstance(tab.js_functions, OrderedSet))
     assert_true(isinstance(tab._charts, list))
+
+
+def test_tab_lazy_render_embed():
+    bar = _create_bar()
+    bar.set_global_opts(title_opts=opts.TitleOpts(title="</script>"))
+    tab = Tab(is_lazy=True).add(bar, "bar-example").add(_create_line(), "line-example")
+    content = tab.render_embed()
+    assert_in("pyechartsLazyInit(chartID)", content)
+    assert_in("pyecharts_lazy_charts['{}']".format(bar.chart_id), content)
+    assert_equal(content.count("echarts.init("), 2)
+    assert_in('"<\\/script>"', content)
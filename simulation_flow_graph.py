@@ -1,14 +1,23 @@
 #! /usr/bin/python3
 # -*- encoding:utf-8 -*-
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 from deprecated import deprecated
 from tqdm import tqdm
 
 from pyecharts import options as opts
 from pyecharts.globals import ThemeType
-from pyecharts.charts import Graph
+from pyecharts.charts import Graph, Page, Tab, Timeline
 from pyecharts.render import make_snapshot
+from pyecharts.render import engine
+from edge_bundling import bundle as bundle_paths
+from graph_core import GraphCore, TABLE_DTYPE, last_occurrence, lookup, undirected_key
+from flow_diff import diff_flows, ABS_TOL, REL_TOL, ADDED, REMOVED, INCREASED, DECREASED
+from flow_rollup import FlowRollup
+from flow_store import FlowStore
+from profiling import StageProfiler, profile_hook
+from validate_data import validate, describe, report, ERROR
 import numpy as np
 import json
 import logging
@@ -24,8 +33,80 @@ handler = logging.StreamHandler()
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
-
-def g_make(nodes, links, categories, layout, title) -> Graph:
+data_source_dir = "data_source/"
+topo_file = data_source_dir + "community_small.txt"
+flow_data_file = data_source_dir + "flow_data.txt"
+flow_data_new_file = data_source_dir + "flow_data_new.txt"
+layout_file = data_source_dir + "layout.txt"
+node_type_file = data_source_dir + "node_type.txt"
+
+NODE_NORMAL_SIZE = 15  # Identifies the standard size of a common no-flow node
+TRAFFIC_UNIT = 10 ** 6  # * The magnitude of traffic data
+TRAFFIC_UNIT_PRINT = "1M"  # * The unit of traffic data for print, need to change with the TRAFFIC_UNIT
+CAPACITY_UNIT = 10 ** 6  # * link capacity of the topology file (BRITE bandwidth, Mbps) in units of the traffic data
+GRAPH_CHART_ID = "1a53dbfa024e4c22b72f77a579c0c63b"  # chart id of the single graph rendered by run()
+BGN_TYPE = 4  # node type of BGN, see load_type_data()
+LINK_WIDTH_RANGE = (2, 8)  # line width of links with flow, mapped from the link load
+LINK_COLOR_RANGE = ("#adb5bd", "#495057")  # color of links in flow_data, mapped from the link load
+LINK_NEW_COLOR = "green"  # color of links in flow_data_new
+# color of changed links by flow_diff status, links in flow_data_new without a status use LINK_NEW_COLOR
+LINK_DELTA_COLORS = {ADDED: "green", REMOVED: "#adb5bd", INCREASED: "#e03131", DECREASED: "#1971c2"}
+LINK_VISUAL_ID = "link_visual"
+# hotspot 编码: 按利用率百分位分段着色, 线宽在 LINK_WIDTH_RANGE 之间按百分位映射
+HOTSPOT_PERCENTILES = (0.5, 0.9, 0.99)
+HOTSPOT_COLORS = ("#adb5bd", "#fab005", "#f76707", "#e03131")
+# 边捆绑: 被捆绑的边画成一个 lines 序列, large 模式下所有折线共用一个样式
+BUNDLE_LINE_STYLE = {"color": "#868e96", "width": 1, "opacity": 0.4}
+BUNDLE_MARGIN = (60, 80)  # 直角坐标系到图表左右、上下边缘的最小距离(像素)
+
+# visualMap 不作用于关系图的边, 由这段js按 visualMap 选中的范围计算边的线宽与颜色:
+# 包装 setOption, 每次设置 option 前更新有流量的边(flag > 0)的样式, 拖动 visualMap 时只重设边
+LINK_VISUAL_JS = """
+    (function(chart, visual) {
+        var range = [visual.min, visual.max];
+        function applyLinkVisual(option) {
+            (option.series || []).forEach(function(series) {
+                (series.links || []).forEach(function(link) {
+                    if (!link.flag) {
+                        return;
+                    }
+                    var span = range[1] - range[0];
+                    var t = span > 0 ? (Math.min(Math.max(link.value, range[0]), range[1]) - range[0]) / span : 1;
+                    var inRange = link.value >= range[0] && link.value <= range[1];
+                    link.lineStyle = {
+                        width: visual.width[0] + t * (visual.width[1] - visual.width[0]),
+                        color: link.flag === 2 ? (visual.deltaColor[link.delta] || visual.newColor)
+                                               : echarts.color.lerp(t, visual.color),
+                        opacity: inRange ? 0.8 : 0.1,
+                        type: link.delta === visual.removed ? 'dashed' : 'solid'
+                    };
+                    link.label = {show: inRange, position: 'middle', formatter: '{c}', distance: 1};
+                });
+            });
+        }
+        var setOption = chart.setOption;
+        chart.setOption = function(option) {
+            if (option) {
+                applyLinkVisual(option);
+            }
+            return setOption.apply(this, arguments);
+        };
+        chart.on('datarangeselected', function(params) {
+            if (params.visualMapId !== visual.id) {
+                return;
+            }
+            range = params.selected;
+            chart.setOption({series: chart.getOption().series.map(function(series) {
+                return {links: series.links};
+            })});
+        });
+    })(chart_%(id)s, %(visual)s);
+"""
+
+
+def g_make(nodes, links, categories, layout, title, chart_id=GRAPH_CHART_ID, visualmap_opts=None,
+           **series_opts) -> Graph:
+    series_opts.setdefault("tooltip_opts", opts.TooltipOpts(formatter="ID:{b}, Load:{c}"))
     c = (
         Graph(
             opts.InitOpts(
@@ -33,7 +114,7 @@ def g_make(nodes, links, categories, layout, title) -> Graph:
                 page_title="FlowGraph",
                 theme=ThemeType.WHITE,
                 js_host="./js/",
-                chart_id="1a53dbfa024e4c22b72f77a579c0c63b",
+                chart_id=chart_id,
                 animation_opts=opts.AnimationOpts()
             )
         )
@@ -45,12 +126,13 @@ def g_make(nodes, links, categories, layout, title) -> Graph:
             repulsion=300,
             is_draggable=True,
             layout=layout,
-            tooltip_opts=opts.TooltipOpts(formatter="ID:{b}, Load:{c}"),
+            **series_opts,
             # itemstyle_opts=opts.ItemStyleOpts(color="rgb(230,73,74)", border_color="rgb(255,148,149)", border_width=3)
         )
         .set_global_opts(
             title_opts=opts.TitleOpts(title=title, subtitle="Link unit: " + TRAFFIC_UNIT_PRINT),
             legend_opts=opts.LegendOpts(legend_icon="circle"),
+            visualmap_opts=visualmap_opts,
             toolbox_opts=opts.ToolboxOpts(is_show=True, orient="vertical", pos_left="right",
                                           feature=opts.ToolBoxFeatureOpts(
                                               data_view=opts.ToolBoxFeatureDataViewOpts(),
@@ -64,13 +146,20 @@ def g_make(nodes, links, categories, layout, title) -> Graph:
 
 def load_flow_data(file: str):
     logger.info("Loading flow data from file: {}".format(file))
-    flow_arr = np.loadtxt(file, delimiter=" ").astype(np.float64)
+    flow_arr = np.loadtxt(file, delimiter=" ", ndmin=2).astype(np.float64)
+    if flow_arr.size == 0:
+        flow_arr = np.zeros((0, 5), dtype=np.float64)
     return flow_arr
 
 
 def load_topology_data(file: str):
+    """
+    :return: [src dst src_as dst_as delay capacity] 数组, 只有前四列的拓扑文件时延和容量为 nan
+    """
     logger.info("Loading topology data from file: {}".format(file))
-    topo_arr = np.loadtxt(file, skiprows=1).astype(int)
+    topo_arr = np.loadtxt(file, skiprows=1, ndmin=2)
+    if topo_arr.shape[1] < 6:
+        topo_arr = np.hstack((topo_arr, np.full((len(topo_arr), 6 - topo_arr.shape[1]), np.nan)))
     return topo_arr
 
 
@@ -108,6 +197,7 @@ def load_axis_to_dict(file: str) -> dict:
     return node_axis_dict
 
 
+@deprecated(reason="Use flow_diff.diff_flows() instead.")
 def sieve_flow_data(flow_old_file, flow_new_file):
     res_list = []
     with open(flow_old_file, 'r') as f_old:
@@ -116,60 +206,57 @@ def sieve_flow_data(flow_old_file, flow_new_file):
         for line in f_new.read().splitlines():
             if line in data_set:
                 continue
-            res_list.append([int(i) for i in line.split(" ")])
-    return np.array(res_list)
+            res_list.append([float(i) for i in line.split(" ")])
+    return np.array(res_list, dtype=np.float64).reshape(-1, 5)
 
 
-def dataHandler(flow_arr: np.ndarray, flow_new_arr: np.ndarray, topo_arr: np.ndarray):
+def dataHandler(flow_arr: np.ndarray, flow_new_arr: np.ndarray, topo_arr: np.ndarray,
+                link_delta: tuple = None) -> np.ndarray:
     """
     根据节点流数据和节点拓扑文件生成最终数据表
-    数据表共8列数据，的格式为：
-    [Node1 Node2 Community1 Category2 load_val1 load_val2 link_val flag]
-    flag: {0: 普通记录, 1: flow_data记录, 2: flow_data_new记录}
+    数据表每行对应拓扑中的一条边，列定义见 graph_core.TABLE_DTYPE：
+    [src dst src_as dst_as src_load dst_load link_val flag delta delay capacity util]
+    flag: {0: 普通记录, 1: flow_data记录, 2: flow_data_new记录}, delta: flag为2时的变化类型
+    util: 利用率 link_val / (capacity * CAPACITY_UNIT), 拓扑文件中没有容量(或容量为0)的边为 nan
+    节点负载取该节点在流数据中最后一次出现时的负载，边的负载和flag取 (src,dst) 或 (dst,src) 最后一次出现的记录，
+    flow_new_arr 中的记录在 flow_arr 之后生效。
     :param flow_new_arr:
     :param flow_arr: 节点的流数组
-    :param topo_arr: 节点拓扑数组
-    :return:  整合之后的数组
+    :param topo_arr: 节点拓扑数组, 见 load_topology_data()
+    :param link_delta: (keys, status), 见 flow_diff.FlowDiff.changed(); 给出时只有其中的边 flag 为 2 (包括被删除的边),
+                       delta 列为其变化类型, flow_new_arr 中负载没有变化的边 flag 为 1
+    :return:  整合之后的数据表
     """
     logger.info("Data handler start...")
-    topo_arr = np.hstack((topo_arr, np.zeros((len(topo_arr), 4), dtype=int)))
-    # 使用flow_arr中的每一行更新topo_arr
-    for flow_line in tqdm(flow_arr, desc="update flow_arr: "):
-        for topo_line in topo_arr:
-            if flow_line[0] == topo_line[0]:
-                topo_line[4] = flow_line[2]
-            if flow_line[1] == topo_line[1]:
-                topo_line[5] = flow_line[3]
-            if flow_line[0] == topo_line[0] and flow_line[1] == topo_line[1]:
-                topo_line[6] = flow_line[4]
-                topo_line[7] = 1
-            if flow_line[0] == topo_line[1]:
-                topo_line[5] = flow_line[2]
-            if flow_line[1] == topo_line[0]:
-                topo_line[4] = flow_line[3]
-            if flow_line[0] == topo_line[1] and flow_line[1] == topo_line[0]:
-                topo_line[6] = flow_line[4]
-                topo_line[7] = 1
-
-    # 使用flow_new_arr中的每一行更新topo_arr
-    for flow_line in tqdm(flow_new_arr, desc="update flow_new_arr: "):
-        for topo_line in topo_arr:
-            if flow_line[0] == topo_line[0]:
-                topo_line[4] = flow_line[2]
-            if flow_line[1] == topo_line[1]:
-                topo_line[5] = flow_line[3]
-            if flow_line[0] == topo_line[0] and flow_line[1] == topo_line[1]:
-                topo_line[6] = flow_line[4]
-                topo_line[7] = 2
-            if flow_line[0] == topo_line[1]:
-                topo_line[5] = flow_line[2]
-            if flow_line[1] == topo_line[0]:
-                topo_line[4] = flow_line[3]
-            if flow_line[0] == topo_line[1] and flow_line[1] == topo_line[0]:
-                topo_line[6] = flow_line[4]
-                topo_line[7] = 2
-
-    return topo_arr
+    table = np.zeros(len(topo_arr), dtype=TABLE_DTYPE)
+    for i, field in enumerate(("src", "dst", "src_as", "dst_as", "delay", "capacity")):
+        table[field] = topo_arr[:, i] if i < topo_arr.shape[1] else np.nan
+    table["util"] = np.nan
+    flows = np.vstack((flow_arr, flow_new_arr))
+    flags = np.concatenate((np.full(len(flow_arr), 1, dtype=np.uint8), np.full(len(flow_new_arr), 2, dtype=np.uint8)))
+    if len(flows) == 0:
+        table["util"][table["capacity"] > 0] = 0.0
+        return table
+    flow_src = flows[:, 0].astype(np.int64)
+    flow_dst = flows[:, 1].astype(np.int64)
+    # 节点负载
+    node_ids, last = last_occurrence(np.column_stack((flow_src, flow_dst)).ravel())
+    node_loads = flows[:, 2:4].ravel()[last]
+    table["src_load"], _ = lookup(table["src"].astype(np.int64), node_ids, node_loads, 0.0)
+    table["dst_load"], _ = lookup(table["dst"].astype(np.int64), node_ids, node_loads, 0.0)
+    # 边负载, 不区分方向
+    link_keys, last = last_occurrence(undirected_key(flow_src, flow_dst))
+    topo_keys = undirected_key(table["src"].astype(np.int64), table["dst"].astype(np.int64))
+    table["link_val"], _ = lookup(topo_keys, link_keys, flows[last, 4], 0.0)
+    table["flag"], _ = lookup(topo_keys, link_keys, flags[last], 0)
+    if link_delta is not None:
+        delta_keys, delta_status = link_delta
+        table["delta"], changed = lookup(topo_keys, delta_keys, delta_status, 0)
+        table["flag"][(table["flag"] == 2) & ~changed] = 1
+        table["flag"][changed] = 2
+    has_capacity = table["capacity"] > 0
+    table["util"][has_capacity] = table["link_val"][has_capacity] / (table["capacity"][has_capacity] * CAPACITY_UNIT)
+    return table
 
 
 @deprecated(reason="This method is deprecated.")
@@ -273,68 +360,159 @@ def manual_set_node(key: str) -> tuple:
     return _is_fixed, _x, _y
 
 
-def get_node_num(nodes: dict) -> None:
+def get_node_num(core: GraphCore) -> None:
     """
     获取每个社区的节点数目并输出在console中
-    :param nodes: 节点字典，格式为：{NodeID: (val, Category, type)}
+    :param core: 图的整数索引存储，见 graph_core.GraphCore
     """
-    num_dict = {}
-    for node, item in nodes.items():
-        category = int(item[1])
-        num_dict[category] = num_dict.setdefault(category, 0) + 1
+    num_dict = core.count_by_category()
     print("{ 社区编号: 节点数 }")
     print(json.dumps(num_dict, sort_keys=True, indent=4))
 
 
-def run(layout: str = "force", title="Simulation_Flow_Graph", showlabel=True) -> Graph:
+def check_inputs(layout: str = "force") -> list:
     """
-    主函数，按照需求生成所有节点和边，并渲染输出
-    :param title: 生成html文件的标题
-    :param layout: 共三种方式，"force","manual","file"
-    :param showlabel: 是否显示节点标签
-    :return: Graph 对象
-    "force"   是力引导模型，用于调试，可以拖动;
-    "manual"  可以初始化时确定部分点的坐标，坐标在 manual_set_node() 中确定;
-    "file"    从layout文件中读取坐标"
+    检查输入文件之间的一致性 (拓扑、流数据、坐标、节点类型), 见 validate_data.validate();
+    警告输出到日志, 有错误 (run() 会因此失败) 时在读取数据之前抛出 ValueError
+    :param layout: "file" 时缺少坐标的节点是错误
+    :return: 问题列表
     """
-    # if flow_data file or flow_data_new file is not exist, create it
-    if not os.path.exists(flow_data_file):
-        with open(flow_data_file, "w") as f:
-            f.write("")
-    if not os.path.exists(flow_data_new_file):
-        with open(flow_data_new_file, "w") as f:
-            f.write("")
+    files = {"topo": topo_file, "flow": flow_data_file, "flow_new": flow_data_new_file, "layout": layout_file,
+             "node_type": node_type_file}
+    problems = validate(data_source_dir, require_layout=layout == "file", files=files)
+    for problem in problems:
+        if problem.level != ERROR:
+            logger.warning(describe(problem))
+    errors = [problem for problem in problems if problem.level == ERROR]
+    if errors:
+        raise ValueError("Invalid input files:\n" + report(errors))
+    return problems
+
+
+def load_all_data(profiler: StageProfiler = None, abs_tol: float = ABS_TOL, rel_tol: float = REL_TOL,
+                  mark_removed: bool = False, store: FlowStore = None, at: float = None) -> tuple:
+    """
+    读取全部数据文件并生成最终数据表
+    :param abs_tol, rel_tol: flow_data_new 相对 flow_data 的负载变化容差, 见 flow_diff.diff_flows();
+                             flow_data_new 为空时不做比较, 所有流记录 flag 为 1
+    :param mark_removed: flow_data_new 是完整的快照时设为 True, 只在 flow_data 中出现的边标记为删除;
+                         默认 flow_data_new 只包含更新的记录
+    :param store: 流快照库, 给出时不读取 flow_data / flow_data_new 文件, 见 store_flows()
+    :param at: 快照时间, 默认为最后一个快照
+    :param profiler: 记录 load / sieve / merge 三个阶段
+    :return: (all_data, type_data, layout_data)
+    """
+    profiler = profiler or StageProfiler(enabled=False)
+    if store is None:
+        # if flow_data file or flow_data_new file is not exist, create it
+        if not os.path.exists(flow_data_file):
+            with open(flow_data_file, "w") as f:
+                f.write("")
+        if not os.path.exists(flow_data_new_file):
+            with open(flow_data_new_file, "w") as f:
+                f.write("")
+
+    with profiler.stage("load") as rec:
+        topo_data = load_topology_data(topo_file)
+        type_data = load_type_data(node_type_file)
+        layout_data = load_axis_to_dict(layout_file)
+        rec["bytes"] = sum(os.path.getsize(f) for f in (topo_file, node_type_file, layout_file))
+        if store is None:
+            flow_data = load_flow_data(flow_data_file)
+            flow_data_n = load_flow_data(flow_data_new_file)
+            rec["bytes"] += os.path.getsize(flow_data_file) + os.path.getsize(flow_data_new_file)
+        else:
+            flow_data, flow_data_n = store_flows(store, at)
+            mark_removed = True
+            rec["bytes"] += flow_data.nbytes + flow_data_n.nbytes
+    all_data = merge_flows(flow_data, flow_data_n, topo_data, abs_tol, rel_tol, mark_removed, profiler)
+    return all_data, type_data, layout_data
 
-    flow_data = load_flow_data(flow_data_file)
-    flow_data_n = sieve_flow_data(flow_data_file, flow_data_new_file)
-    topo_data = load_topology_data(topo_file)
-    type_data = load_type_data(node_type_file)
-    layout_data = load_axis_to_dict(layout_file)
-    all_data = dataHandler(flow_data, flow_data_n, topo_data)
+
+def merge_flows(flow_data: np.ndarray, flow_data_n: np.ndarray, topo_data: np.ndarray, abs_tol: float = ABS_TOL,
+                rel_tol: float = REL_TOL, mark_removed: bool = False, profiler: StageProfiler = None) -> np.ndarray:
+    """
+    比较 flow_data_new 与 flow_data, 并与拓扑合并成最终数据表, 参数见 load_all_data()
+    :param profiler: 记录 sieve / merge 两个阶段
+    """
+    profiler = profiler or StageProfiler(enabled=False)
+    with profiler.stage("sieve") as rec:
+        link_delta = None
+        if len(flow_data_n):
+            diff = diff_flows(flow_data, flow_data_n, abs_tol, rel_tol)
+            logger.info("Flow diff: " + diff.summary())
+            link_delta = diff.changed(include_removed=mark_removed)
+        rec["bytes"] = flow_data_n.nbytes
+    with profiler.stage("merge") as rec:
+        all_data = dataHandler(flow_data, flow_data_n, topo_data, link_delta)
+        rec["bytes"] = all_data.nbytes
+    return all_data
+
+
+def store_flows(store: FlowStore, at: float = None) -> tuple:
+    """
+    从流快照库中取 at 时刻生效的快照作为 flow_data_new, 它的前一个快照作为 flow_data,
+    这样每个时刻都按相对上一个快照的变化着色; 第一个快照没有前一个快照, 此时它作为 flow_data, flow_data_new 为空
+    :return: (flow_data, flow_data_new)
+    """
+    number = store.snapshot_at(np.inf if at is None else at)
+    empty = np.zeros((0, 5), dtype=np.float64)
+    if number < 0:
+        logger.warning("No flow snapshot at {} in {}".format(at, store.path))
+        return empty, empty
+    if number == 0:
+        return store.snapshot(0), empty
+    return store.snapshot(number - 1), store.snapshot(number)
+
+
+def node_positions(core: GraphCore, layout: str = "force") -> list:
+    """
+    :return: 每个节点的 (x, y, ctrl, is_fixed), ctrl 标记属于哪个控制域
+    """
+    node_ids = core.node_id.tolist()
+    node_ctrls = core.ctrl.tolist()
+    node_xs = core.x.tolist()
+    node_ys = core.y.tolist()
+    has_layout = core.has_layout.tolist()
+    positions = []
+    for i in range(core.num_nodes):
+        if layout == "file":
+            if not has_layout[i]:
+                raise KeyError(str(node_ids[i]))
+            positions.append((node_xs[i], node_ys[i], node_ctrls[i], True))
+        elif layout == "manual":
+            _is_fixed, _x, _y = manual_set_node(str(node_ids[i]))
+            positions.append((_x, _y, 0, _is_fixed))
+        elif has_layout[i]:
+            positions.append((node_xs[i], node_ys[i], node_ctrls[i], False))
+        else:
+            positions.append((None, None, 0, False))
+    return positions
+
+
+def build_nodes(core: GraphCore, layout: str = "force", showlabel=True, progress=True) -> list:
+    """
+    :return: GraphNode 列表, 顺序与 core 中的节点顺序一致
+    """
     nodes_data = []
-    links_data = []
-    category_data = []
-    nodes = {}  # 存放所有节点的集合
     symbol_list = ["circle", "roundRect", "rect", "triangle", "diamond"]  # 分别代表router, receiver，source，switch，bgn
     labels_tuple = ("RCV", "SRC", "SW", "BGN")
     # ! 创建节点 ======================================================================
-    max_val = 0
-    for line in all_data:
-        startNode, endNode, s_cat, e_cat, s_val, e_val = line[:6]
-        nodes[startNode] = (s_val, s_cat, type_data.get(str(startNode), 0))
-        nodes[endNode] = (e_val, e_cat, type_data.get(str(endNode), 0))
-        max_val = max(max_val, s_val, e_val)
-    # print(nodes.keys())
-    for key in tqdm(nodes.keys(), desc="Creating Nodes: "):
-        _name = str(key)
-        _ctrl = 0  # 标记属于哪个控制域
-        # _symbol_size 控制在一倍的NODE_NORMAL_SIZE - 两倍的NODE_NORMAL_SIZE之间
-        _symbol_size = NODE_NORMAL_SIZE + nodes[key][0] / max_val * NODE_NORMAL_SIZE * 0.8
+    # 节点属性一次性转换为 Python 列表, 避免逐个访问 numpy 标量
+    symbol_sizes = core.symbol_sizes(NODE_NORMAL_SIZE).tolist()
+    node_ids = core.node_id.tolist()
+    node_loads = core.load.tolist()
+    node_cats = core.as_id.tolist()
+    node_types = core.type.tolist()
+    positions = node_positions(core, layout)
+    for i in tqdm(range(core.num_nodes), desc="Creating Nodes: ", disable=not progress):
+        _name = str(node_ids[i])
+        _symbol_size = symbol_sizes[i]
+        _type = node_types[i]
         # 对特殊节点进行单独标识 -----------------------------------------------------
-        if nodes[key][2] > 0:
-            _symbol_size = _symbol_size * 1.2
-            _label_formatter = labels_tuple[nodes[key][2] - 1] + ":{b}"
-            _formatter = labels_tuple[nodes[key][2] - 1] + ":{b}, load,ctrl:{c} "
+        if _type > 0:
+            _label_formatter = labels_tuple[_type - 1] + ":{b}"
+            _formatter = labels_tuple[_type - 1] + ":{b}, load,ctrl:{c} "
             # _item_style_opts = opts.ItemStyleOpts(border_width=2, border_color="red")
             _item_style_opts = None
             _label_opts = opts.LabelOpts(is_show=showlabel, position="bottom", font_size=14, font_weight="bold",
@@ -347,32 +525,36 @@ def run(layout: str = "force", title="Simulation_Flow_Graph", showlabel=True) ->
             _item_style_opts = None
             _tooltip_opts = opts.TooltipOpts(formatter=_formatter)
         # 添加节点
-        if layout == "file":
-            _x, _y, _ctrl = layout_data[str(key)]
-            _is_fixed = True
-        elif layout == "manual":
-            _is_fixed, _x, _y = manual_set_node(key)
-        else:
-            _x, _y, _ctrl = layout_data.get(str(key), (None, None, 0))
-            _is_fixed = False
+        _x, _y, _ctrl, _is_fixed = positions[i]
         nodes_data.append(
             opts.GraphNode(name=_name,
                            x=_x, y=_y, is_fixed=_is_fixed,
-                           symbol=str(symbol_list[nodes[key][2]]),
+                           symbol=str(symbol_list[_type]),
                            # symbol="image://pics/acc-sw.svg",
                            symbol_size=_symbol_size,
-                           value=[str(round(nodes[key][0] / TRAFFIC_UNIT, 2)), _ctrl],
-                           category=int(nodes[key][1] - 1),
+                           value=[str(round(node_loads[i] / TRAFFIC_UNIT, 2)), _ctrl],
+                           category=int(node_cats[i] - 1),
                            label_opts=_label_opts,
                            tooltip_opts=_tooltip_opts,
                            itemstyle_opts=_item_style_opts  # 如果没改源码需要把这行注释掉！
                            )
         )
+    return nodes_data
+
+
+def build_links(core: GraphCore, progress=True) -> list:
+    """
+    :return: GraphLink 列表, 顺序与 core 中的边顺序一致
+    """
+    links_data = []
     # ! 创建边 ========================================================================
-    max_line_val = 0
-    for line in tqdm(all_data, desc="Creating Links: "):
-        startNode, endNode, s_cat, e_cat, s_val, e_val, link_val, flag = line
-        max_line_val = max(max_line_val, link_val)
+    max_line_val = float(core.link_val.max(initial=0)) or 1.0
+    edge_src = core.node_id[core.src].tolist()
+    edge_dst = core.node_id[core.dst].tolist()
+    for startNode, endNode, link_val, flag, delta in tqdm(zip(edge_src, edge_dst, core.link_val.tolist(),
+                                                              core.flag.tolist(), core.delta.tolist()),
+                                                          total=core.num_edges, desc="Creating Links: ",
+                                                          disable=not progress):
         # color_r = str(150 - link_val)
         # color = "rgb(" + color_r + "," + color_r + "," + color_r + ")"
         if flag == 0:
@@ -406,8 +588,9 @@ def run(layout: str = "force", title="Simulation_Flow_Graph", showlabel=True) ->
                                value=int(link_val),
                                symbol=["none", "none"],
                                symbol_size=10 + int(link_val / TRAFFIC_UNIT),
-                               linestyle_opts=opts.LineStyleOpts(width=2 + link_val / max_line_val * 6, type_="solid",
-                                                                 color="green"),
+                               linestyle_opts=opts.LineStyleOpts(width=2 + link_val / max_line_val * 6,
+                                                                 type_="dashed" if delta == REMOVED else "solid",
+                                                                 color=LINK_DELTA_COLORS.get(delta, LINK_NEW_COLOR)),
                                label_opts=opts.LabelOpts(is_show=True, position="middle",
                                                          formatter="{c}",
                                                          distance=1,
@@ -415,48 +598,416 @@ def run(layout: str = "force", title="Simulation_Flow_Graph", showlabel=True) ->
                                                          )
                                )
             )
+    return links_data
+
+
+def build_links_hotspot(core: GraphCore, progress=True) -> list:
+    """
+    hotspot 编码模式下的边: 有流量的边按利用率的百分位着色和设置线宽, 最高一段的边显示标签;
+    有容量的边的值为利用率(%), 没有流量或没有容量的边为细线. 样式全部由数组计算, 逐条边只生成字典
+    :return: 边字典列表, 顺序与 core 中的边顺序一致
+    """
+    edge_src = core.node_id[core.src].astype(str).tolist()
+    edge_dst = core.node_id[core.dst].astype(str).tolist()
+    percentile = core.util_percentile()
+    loaded = np.isfinite(percentile)
+    level = np.where(loaded, np.digitize(np.nan_to_num(percentile), HOTSPOT_PERCENTILES, right=True), 0)
+    colors = np.array(HOTSPOT_COLORS)[level].tolist()
+    low, high = LINK_WIDTH_RANGE
+    widths = np.round(np.where(loaded, low + np.nan_to_num(percentile) * (high - low), 1.0), 2).tolist()
+    values = np.round(np.nan_to_num(core.util) * 100, 2).tolist()
+    links_data = [{"source": s, "target": t, "lineStyle": {"width": w, "color": c}}
+                  for s, t, w, c in tqdm(zip(edge_src, edge_dst, widths, colors), total=core.num_edges,
+                                         desc="Creating Links: ", disable=not progress)]
+    for i in np.flatnonzero(np.isfinite(core.util)).tolist():
+        links_data[i]["value"] = values[i]
+    for i in np.flatnonzero(level == len(HOTSPOT_PERCENTILES)).tolist():
+        links_data[i]["label"] = {"show": True, "formatter": "{c}%"}
+    return links_data
+
+
+def build_nodes_visual(core: GraphCore, layout: str = "force", showlabel=True, progress=True) -> list:
+    """
+    visualMap 编码模式下的节点: 只输出位置、形状、类别和原始负载, 大小由 visualMap 按负载映射;
+    普通节点的标签和提示框使用序列级别的配置, 见 visual_encoding()
+    :return: 节点字典列表, 顺序与 core 中的节点顺序一致
+    """
+    nodes_data = []
+    symbol_list = ["circle", "roundRect", "rect", "triangle", "diamond"]  # 分别代表router, receiver，source，switch，bgn
+    labels_tuple = ("RCV", "SRC", "SW", "BGN")
+    node_ids = core.node_id.tolist()
+    node_loads = np.round(core.load / TRAFFIC_UNIT, 2).tolist()
+    node_cats = (core.as_id.astype(np.int64) - 1).tolist()
+    node_types = core.type.tolist()
+    positions = node_positions(core, layout)
+    for i in tqdm(range(core.num_nodes), desc="Creating Nodes: ", disable=not progress):
+        _x, _y, _ctrl, _is_fixed = positions[i]
+        _type = node_types[i]
+        node = {"name": str(node_ids[i]), "x": _x, "y": _y, "fixed": _is_fixed, "symbol": symbol_list[_type],
+                "value": [node_loads[i], _ctrl], "category": node_cats[i]}
+        if _type > 0:
+            node["label"] = opts.LabelOpts(is_show=showlabel, position="bottom", font_size=14, font_weight="bold",
+                                           formatter=labels_tuple[_type - 1] + ":{b}")
+            node["tooltip"] = opts.TooltipOpts(trigger="item",
+                                               formatter=labels_tuple[_type - 1] + ":{b}, load,ctrl:{c} ")
+        nodes_data.append(node)
+    return nodes_data
+
+
+def build_links_visual(core: GraphCore, progress=True) -> list:
+    """
+    visualMap 编码模式下的边: 只输出端点、负载和 flag (flag 为 2 时还有 delta),
+    有流量的边的样式由 LINK_VISUAL_JS 在浏览器中计算
+    :return: 边字典列表, 顺序与 core 中的边顺序一致
+    """
+    edge_src = core.node_id[core.src].astype(str).tolist()
+    edge_dst = core.node_id[core.dst].astype(str).tolist()
+    values = np.round(core.link_val / TRAFFIC_UNIT, 2).tolist()
+    flags = core.flag.tolist()
+    links_data = [{"source": s, "target": t, "value": v, "flag": f}
+                  for s, t, v, f in tqdm(zip(edge_src, edge_dst, values, flags), total=core.num_edges,
+                                         desc="Creating Links: ", disable=not progress)]
+    for i in np.flatnonzero(core.flag == 2).tolist():
+        links_data[i]["delta"] = int(core.delta[i])
+    return links_data
+
+
+def visual_encoding(core: GraphCore, showlabel=True) -> tuple:
+    """
+    visualMap 编码模式的序列配置、visualMap 组件和边样式的js参数
+    节点大小: 按负载在 NODE_NORMAL_SIZE ~ 1.8 * NODE_NORMAL_SIZE 之间映射 (visualMap 维度0)
+    边的线宽和颜色: 由第二个 visualMap 控制, 它不作用于任何序列, 只用来在浏览器中调整映射范围
+    :return: (series_opts, visualmap_opts, link_visual)
+    """
+    max_node = max(round(core.max_load / TRAFFIC_UNIT, 2), 0.01)
+    flow = core.flag > 0
+    max_link = max(round(float(core.link_val[flow].max(initial=0)) / TRAFFIC_UNIT, 2), 0.01)
+    series_opts = {
+        "label_opts": opts.LabelOpts(is_show=showlabel, position="bottom", font_size=12, font_weight="normal"),
+        "tooltip_opts": opts.TooltipOpts(formatter="ID:{b}, load, ctrl = {c}"),
+        "linestyle_opts": opts.LineStyleOpts(width=1.0),
+    }
+    node_visual = opts.VisualMapOpts(type_="size", min_=0, max_=max_node, dimension=0, series_index=0,
+                                     range_size=[NODE_NORMAL_SIZE, NODE_NORMAL_SIZE * 1.8], range_text=["node", ""],
+                                     pos_left="left", pos_bottom="20")
+    node_visual.update(outOfRange={"symbolSize": [NODE_NORMAL_SIZE / 2, NODE_NORMAL_SIZE / 2]})
+    link_visual = opts.VisualMapOpts(type_="color", min_=0, max_=max_link, range_color=list(LINK_COLOR_RANGE),
+                                     range_text=["link", ""], pos_left="left", pos_bottom="200")
+    link_visual.update(id=LINK_VISUAL_ID, seriesIndex=[])
+    js_args = {"id": LINK_VISUAL_ID, "min": 0, "max": max_link, "width": list(LINK_WIDTH_RANGE),
+               "color": list(LINK_COLOR_RANGE), "newColor": LINK_NEW_COLOR,
+               "deltaColor": {str(k): v for k, v in LINK_DELTA_COLORS.items()}, "removed": REMOVED}
+    return series_opts, [node_visual, link_visual], js_args
+
+
+def bundle_mask(core: GraphCore) -> np.ndarray:
+    """
+    :return: 被捆绑的边: 两端属于不同社区(AS)且没有流量的边; 有流量的边保留在关系图中, 样式和标签不变
+    """
+    return (core.as_id[core.src] != core.as_id[core.dst]) & (core.flag == 0)
+
+
+def bundle_overlay(graph_: Graph, core: GraphCore, mask: np.ndarray) -> int:
+    """
+    把关系图放到隐藏坐标轴的直角坐标系上, 被捆绑的边由 edge_bundling.bundle() 计算成折线, 作为 lines 序列
+    (polyline, large) 画在关系图下面. 节点坐标取自节点数据的 x, y, 因此要求所有节点都有坐标.
+    直角坐标系上的关系图从 value 的前两维读取坐标, 且只保留这两维 (不支持 encode), 因此坐标插入到节点 value
+    的前面, 提示框和标签中的 {c} 替换为原来的 value; 按 value 映射节点大小的 visualMap 不再可用
+    :param mask: 被捆绑的边, 见 bundle_mask(); 这些边应已从关系图的边中去掉
+    :return: 折线数目
+    """
+    series = graph_.options["series"][0]
+    nodes = series["data"]
+    xs, ys = [node.get("x") for node in nodes], [node.get("y") for node in nodes]
+    if None in xs or None in ys:
+        raise ValueError("Edge bundling needs the coordinates of all nodes, see {}".format(layout_file))
+    # 没有单独提示框的节点使用序列的提示框格式
+    default_tooltip = series.get("tooltip")
+    default_tooltip = getattr(default_tooltip, "opts", default_tooltip) or {}
+    for node, x, y in zip(nodes, xs, ys):
+        value = list(node["value"])
+        text = ",".join(str(v) for v in value)
+        if node.get("tooltip") is None and isinstance(default_tooltip.get("formatter"), str):
+            node["tooltip"] = {"formatter": default_tooltip["formatter"]}
+        for key in ("label", "tooltip"):
+            item = getattr(node.get(key), "opts", node.get(key))
+            if item and isinstance(item.get("formatter"), str):
+                item["formatter"] = item["formatter"].replace("{c}", text)
+        node["value"] = [x, y] + value
+    series.update(layout="none", coordinateSystem="cartesian2d")
+
+    xy = np.column_stack((xs, ys)).astype(np.float64)
+    paths = bundle_paths(xy[core.src[mask]], xy[core.dst[mask]])
+    graph_.options["series"].append({
+        "type": "lines", "coordinateSystem": "cartesian2d", "polyline": True, "large": True, "silent": True,
+        "z": 1, "lineStyle": BUNDLE_LINE_STYLE, "data": [{"coords": p} for p in np.round(paths, 2).tolist()],
+    })
+    # 隐藏坐标轴, y 轴向下与关系图一致; 坐标系保持 x, y 的比例并居中
+    (x0, y0), (x1, y1) = xy.min(axis=0), xy.max(axis=0)
+    width, height = max(x1 - x0, 1.0), max(y1 - y0, 1.0)
+    chart_w, chart_h = int(graph_.width.rstrip("px")), int(graph_.height.rstrip("px"))
+    scale = min((chart_w - 2 * BUNDLE_MARGIN[0]) / width, (chart_h - 2 * BUNDLE_MARGIN[1]) / height)
+    graph_.options.update(
+        xAxis=[{"type": "value", "show": False, "min": float(x0), "max": float(x1)}],
+        yAxis=[{"type": "value", "show": False, "min": float(y0), "max": float(y1), "inverse": True}],
+        grid=[{"left": round((chart_w - width * scale) / 2), "top": round((chart_h - height * scale) / 2),
+               "width": round(width * scale), "height": round(height * scale)}],
+    )
+    return len(paths)
+
+
+def build_graph(all_data: np.ndarray, type_data: dict, layout_data: dict, layout: str = "force",
+                title="Simulation_Flow_Graph", showlabel=True, categories=None, chart_id=GRAPH_CHART_ID,
+                progress=True, profiler: StageProfiler = None, encoding: str = "style",
+                bundle: bool = False) -> tuple:
+    """
+    根据数据表生成所有节点和边
+    :param all_data: 整合之后的数据表, 见 dataHandler()
+    :param categories: 社区编号列表, 默认为 all_data 中出现的社区; 分区渲染时传入全局列表以保证各图颜色一致
+    :param chart_id: 为 None 时随机生成
+    :param progress: 是否显示进度条
+    :param profiler: 记录 core (GraphCore.from_table) / node build / link build 三个阶段
+    :param encoding: "style"  在 Python 中计算每个节点的大小和每条边的样式;
+                     "visual" 只输出原始负载, 由 visualMap 映射节点大小、边的线宽和颜色, 可在浏览器中交互调整;
+                     "hotspot" 节点同 "style", 边按利用率的百分位着色和设置线宽, 见 build_links_hotspot()
+    :param bundle: 不同社区之间没有流量的边做边捆绑, 画成 lines 折线, 见 bundle_overlay(); 需要所有节点的坐标,
+                   layout 为 "file" 或 "none", 不支持 "visual" 编码; 节点不能拖动
+    :return: (Graph 对象, GraphCore 对象)
+    """
+    if encoding not in ("style", "visual", "hotspot"):
+        raise ValueError("Unknown encoding: {}, expected 'style', 'visual' or 'hotspot'".format(encoding))
+    if bundle and encoding == "visual":
+        raise ValueError("Edge bundling supports the 'style' and 'hotspot' encodings only")
+    if bundle and layout not in ("file", "none"):
+        raise ValueError("Edge bundling needs fixed node positions, use layout='file' instead of '{}'".format(layout))
+    profiler = profiler or StageProfiler(enabled=False)
+    with profiler.stage("core"):
+        core = GraphCore.from_table(all_data, type_data, layout_data)
+    with profiler.stage("node build"):
+        if encoding == "visual":
+            nodes_data = build_nodes_visual(core, layout, showlabel, progress)
+        else:
+            nodes_data = build_nodes(core, layout, showlabel, progress)
+    with profiler.stage("link build"):
+        if encoding == "visual":
+            links_data = build_links_visual(core, progress)
+        elif encoding == "hotspot":
+            links_data = build_links_hotspot(core, progress)
+        else:
+            links_data = build_links(core, progress)
+    if bundle:
+        mask = bundle_mask(core)
+        links_data = [link for link, bundled in zip(links_data, mask.tolist()) if not bundled]
+    category_data = []
     # ! 创建类别 ========================================================================
-    category_set = set(list(all_data[:, 2]) + list(all_data[:, 3]))
-    for cate in category_set:
+    if categories is None:
+        categories = core.categories().tolist()
+    for cate in categories:
         category_data.append(
             opts.GraphCategory(name="AS:" + str(cate))
         )
     # ! 生成关系图 =======================================================================
-    graph_ = g_make(nodes_data, links_data, category_data, layout, title)
+    if encoding == "visual":
+        series_opts, visualmap_opts, link_visual = visual_encoding(core, showlabel)
+        graph_ = g_make(nodes_data, links_data, category_data, layout, title, chart_id=chart_id,
+                        visualmap_opts=visualmap_opts, **series_opts)
+        graph_.add_js_funcs(LINK_VISUAL_JS % {"id": graph_.chart_id, "visual": json.dumps(link_visual)})
+    else:
+        graph_ = g_make(nodes_data, links_data, category_data, layout, title, chart_id=chart_id)
+    if bundle:
+        with profiler.stage("bundle") as rec:
+            rec["links"] = bundle_overlay(graph_, core, mask)
     logger.info("Graph Created!")
 
+    if bundle:
+        # 直角坐标系上节点的位置取自 value, 下面的拖动代码不适用, 捆绑的折线也不会跟随节点
+        return graph_, core
     # 增加鼠标拖动点固定位置的js代码
     graph_.add_js_funcs(
         '''
-            chart_1a53dbfa024e4c22b72f77a579c0c63b.on('mouseup',
+            chart_%(id)s.on('mouseup',
             function(params){
-                var option=chart_1a53dbfa024e4c22b72f77a579c0c63b.getOption();
+                var option=chart_%(id)s.getOption();
                 option.series[0].data[params.dataIndex].x=params.event.offsetX;
                 option.series[0].data[params.dataIndex].y=params.event.offsetY;
                 option.series[0].data[params.dataIndex].fixed=true;
-                chart_1a53dbfa024e4c22b72f77a579c0c63b.setOption(option);
+                chart_%(id)s.setOption(option);
             }
         )
-        '''
+        ''' % {"id": graph_.chart_id}
     )
-    graph_.render(title + ".html")
+    return graph_, core
+
+
+def run(layout: str = "force", title="Simulation_Flow_Graph", showlabel=True, profiler: StageProfiler = None,
+        encoding: str = "style", store: FlowStore = None, at: float = None, validate_inputs: bool = True,
+        bundle: bool = False) -> Graph:
+    """
+    主函数，按照需求生成所有节点和边，并渲染输出
+    :param title: 生成html文件的标题
+    :param layout: 共三种方式，"force","manual","file"
+    :param showlabel: 是否显示节点标签
+    :return: Graph 对象
+    "force"   是力引导模型，用于调试，可以拖动;
+    "manual"  可以初始化时确定部分点的坐标，坐标在 manual_set_node() 中确定;
+    "file"    从layout文件中读取坐标"
+    :param encoding: "style"、"visual" 或 "hotspot", 见 build_graph()
+    :param store, at: 从流快照库中读取 at 时刻的流数据, 见 load_all_data()
+    :param validate_inputs: 先检查输入文件的一致性, 见 check_inputs()
+    :param bundle: 不同社区之间没有流量的边做边捆绑, 见 build_graph(); 需要所有节点的坐标和 layout="file"
+    :param profiler: 各阶段耗时统计, 见 profiling.StageProfiler; 结果用 profiler.to_dict() / to_json() 获取
+    环境变量 SIM_PROFILER=cprofile|pyinstrument 时对整个运行过程做函数级 profile, 见 profiling.profile_hook()
+    """
+    profiler = profiler or StageProfiler()
+    with profile_hook(title):
+        if validate_inputs:
+            with profiler.stage("validate"):
+                check_inputs(layout)
+        all_data, type_data, layout_data = load_all_data(profiler, store=store, at=at)
+        graph_, core = build_graph(all_data, type_data, layout_data, layout, title, showlabel, profiler=profiler,
+                                   encoding=encoding, bundle=bundle)
+        # 等价于 graph_.render(), 拆开以便分别统计序列化与模板渲染的耗时
+        with profiler.stage("serialize") as rec:
+            graph_._prepare_render()
+            rec["bytes"] = len(graph_.json_contents)
+        with profiler.stage("render") as rec:
+            path = engine.render(graph_, title + ".html", "simple_chart.html", None)
+            rec["bytes"] = os.path.getsize(path)
     # make_snapshot(snapshot, graph_.render(), title + ".pdf")
-    get_node_num(nodes)  # 获取每个社区的节点数目
+    get_node_num(core)  # 获取每个社区的节点数目
+    logger.info("Stage profile:\n" + profiler.report())
     return graph_
 
 
-if __name__ == '__main__':
-    data_source_dir = "data_source/"
-    topo_file = data_source_dir + "community_small.txt"
-    flow_data_file = data_source_dir + "flow_data.txt"
-    flow_data_new_file = data_source_dir + "flow_data_new.txt"
-    layout_file = data_source_dir + "layout.txt"
-    node_type_file = data_source_dir + "node_type.txt"
+def run_timeline(store: FlowStore, times: list = None, layout: str = "none", title="Simulation_Flow_Graph",
+                 showlabel=True, play_interval: int = 2000, max_frames: int = None, stat: str = "mean") -> Timeline:
+    """
+    按快照时间生成 Timeline, 每个时间点一张关系图, 有变化的边按相对上一个快照的变化着色, 见 store_flows()
+    拓扑、节点类型和坐标文件只读取一次; Timeline 只保存各图的 option, 因此只支持 "style" 编码
+    :param store: 流快照库, 见 flow_store.FlowStore
+    :param times: 时间点列表, 默认为全部快照
+    :param layout: 建议使用 "none", 各时间点的节点位置保持不变
+    :param play_interval: 自动播放的间隔(毫秒)
+    :param max_frames: 时间点多于 max_frames 时改为从汇总层读取, 每个时间桶一张图, 见 rollup_flows()
+    :param stat: 汇总层中每个时间桶的负载统计量, 见 flow_rollup.STATS
+    :return: Timeline 对象
+    """
+    times = store.times().tolist() if times is None else list(times)
+    if max_frames is not None and len(times) > max_frames:
+        frames = rollup_flows(FlowRollup(store), times[0], times[-1], max_frames, stat)
+    else:
+        frames = ((t,) + store_flows(store, t) for t in times)
+    topo_data = load_topology_data(topo_file)
+    type_data = load_type_data(node_type_file)
+    layout_data = load_axis_to_dict(layout_file)
+    timeline = Timeline(opts.InitOpts(width="1600px", height="950px", page_title="FlowGraph", theme=ThemeType.WHITE,
+                                      js_host="./js/"))
+    timeline.add_schema(play_interval=play_interval, pos_bottom="10px")
+    for t, flow_data, flow_data_n in tqdm(frames, desc="Creating Timeline: "):
+        all_data = merge_flows(flow_data, flow_data_n, topo_data, mark_removed=True)
+        graph_, _ = build_graph(all_data, type_data, layout_data, layout, "{} @ {}".format(title, t), showlabel,
+                                chart_id=None, progress=False)
+        timeline.add(graph_, str(t))
+    timeline.render(title + ".html")
+    return timeline
+
+
+def rollup_flows(rollup: FlowRollup, start: float, stop: float, max_frames: int, stat: str = "mean") -> list:
+    """
+    从汇总层中选取 [start, stop] 内时间桶不超过 max_frames 个的最细一层, 每个时间桶的负载统计量作为一个快照,
+    与 store_flows() 一样, 每个时间桶相对前一个时间桶比较
+    :return: [(时间桶, flow_data, flow_data_new), ...]
+    """
+    if rollup.store.mode == "a" and rollup.is_stale():
+        rollup.update()
+    resolution, buckets = rollup.frames(start, stop, max_frames)
+    logger.info("Rollup level {:g}s: {} frames".format(resolution, len(buckets)))
+    flows = [rollup.window(t, t + resolution, stat, resolution) for t in buckets]
+    empty = np.zeros((0, 5), dtype=np.float64)
+    return [(t, flows[k - 1] if k else flows[0], flows[k] if k else empty) for k, t in enumerate(buckets.tolist())]
+
+
+def split_by_as(all_data: np.ndarray, type_data: dict) -> dict:
+    """
+    按社区拆分数据表
+    "Overview": 跨社区的边界链路, 以及两端都是BGN节点的链路
+    "AS:<id>":  该社区内部的链路
+    :return: {分区名: 数据表}, "Overview" 在最前, 其余按社区编号排序
+    """
+    bgn_nodes = np.array([int(k) for k, v in type_data.items() if k.isdigit() and v == BGN_TYPE], dtype=np.int64)
+    boundary = all_data["src_as"] != all_data["dst_as"]
+    backbone = np.isin(all_data["src"], bgn_nodes) & np.isin(all_data["dst"], bgn_nodes)
+    parts = {"Overview": all_data[boundary | backbone]}
+    inner = all_data[~boundary]
+    for as_id in np.unique(inner["src_as"]).tolist():
+        parts["AS:" + str(as_id)] = inner[inner["src_as"] == as_id]
+    return parts
 
-    NODE_NORMAL_SIZE = 15  # Identifies the standard size of a common no-flow node
-    TRAFFIC_UNIT = 10 ** 6  # * The magnitude of traffic data
-    TRAFFIC_UNIT_PRINT = "1M"  # * The unit of traffic data for print, need to change with the TRAFFIC_UNIT
 
+class _SerializedGraph(Graph):
+    """
+    在子进程中已经序列化好的 Graph, 只把 json 字符串传回主进程, 避免 pickle 整个 options
+    """
+
+    def __init__(self, graph_: Graph):
+        self.__dict__.update(graph_.__dict__)
+        self.json_contents = graph_.dump_options()
+        self.options = {}
+
+    def dump_options(self) -> str:
+        return self.json_contents
+
+
+def _build_partition(args: tuple) -> tuple:
+    name, part, type_data, layout_data, layout, title, showlabel, categories, encoding = args
+    graph_, core = build_graph(part, type_data, layout_data, layout, title + " - " + name, showlabel,
+                               categories=categories, chart_id=None, progress=False, encoding=encoding)
+    return name, _SerializedGraph(graph_), core.num_nodes, core.num_edges
+
+
+def run_partitioned(layout: str = "force", title="Simulation_Flow_Graph", showlabel=True, container="tab",
+                    processes=None, encoding: str = "style", validate_inputs: bool = True):
+    """
+    分区渲染: 每个社区(AS)生成一个独立的关系图, 另加一个只包含边界链路和BGN节点的总览图,
+    各图在子进程中并行生成, 最后组合到 Tab 或 Page 中, 未显示的图在切换或滚动到时才初始化
+    :param container: "tab" 或 "page"
+    :param processes: 进程数, 默认为CPU核数
+    :param encoding: "style"、"visual" 或 "hotspot", 见 build_graph()
+    :param validate_inputs: 先检查输入文件的一致性, 见 check_inputs()
+    :return: Tab 或 Page 对象
+    """
+    if container not in ("tab", "page"):
+        raise ValueError("Unknown container: {}, expected 'tab' or 'page'".format(container))
+    if validate_inputs:
+        check_inputs(layout)
+    all_data, type_data, layout_data = load_all_data()
+    parts = split_by_as(all_data, type_data)
+    categories = np.unique(np.concatenate((all_data["src_as"], all_data["dst_as"]))).tolist()
+    tasks = [(name, part, type_data, layout_data, layout, title, showlabel, categories, encoding)
+             for name, part in parts.items()]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = list(tqdm(executor.map(_build_partition, tasks), total=len(tasks), desc="Creating Graphs: "))
+
+    if container == "tab":
+        chart = Tab(page_title=title, js_host="./js/", is_lazy=True)
+        for name, graph_, num_nodes, num_edges in results:
+            chart.add(graph_, name)
+    else:
+        chart = Page(page_title=title, js_host="./js/", is_lazy=True)
+        chart.add(*[graph_ for _, graph_, _, _ in results])
+    for name, _, num_nodes, num_edges in results:
+        logger.info("{}: {} nodes, {} links".format(name, num_nodes, num_edges))
+    chart.render(title + ".html")
+    return chart
+
+
+if __name__ == '__main__':
     # graph = run(layout="force", title="TISCALI_SEA Topology", showlabel=False)
     graph = run(layout="force", title="Test Topology", showlabel=False)
+    # 大规模多AS拓扑: 每个AS单独一张图, 外加边界链路总览, 多进程并行生成
+    # graph = run_partitioned(layout="force", title="Test Topology", showlabel=False, container="tab")
+    # 流快照库: python flow_store.py ingest data_source/flows.store flow_data_<time>.txt ...
+    # graph = run_timeline(FlowStore("data_source/flows.store", mode="r"), title="Test Topology", showlabel=False)
+    # 长时间运行: python flow_rollup.py build data_source/flows.store, 超过100个快照时按汇总层的时间桶生成
+    # graph = run_timeline(FlowStore("data_source/flows.store", mode="r"), title="Test Topology", max_frames=100)
     print("done!")
@@ -0,0 +1,385 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Local tile server for topologies too large to load into the browser at once.
+
+The page holds only the nodes and links of the current viewport. On every roam of the graph it asks the
+server for the tile of the new viewport and replaces the series data with a partial setOption(). Two
+invisible anchor nodes at the corners of the layout keep the bounding box, and so the roam center and zoom,
+the same for every tile.
+
+Zoom level L shows 1 / 2**L of the layout side (level = floor(log2(zoom)) of the ECharts roam zoom).
+Below the detail level, whose viewport holds about TILE_NODES nodes on average, the nodes are aggregated
+into clusters: the layout is cut into CLUSTER_CELLS * 2**L cells per side, the nodes of one AS in one cell
+form a cluster at their mean position, links between clusters are summed and links inside one are dropped.
+Every level is precomputed once. A level keeps a uniform grid index of its node positions (one sorted
+array, cells are contiguous per column) and the links of every node, so a query only touches the cells
+and links of the viewport. A tile holds the visible nodes, their links (the MAX_LINKS heaviest ones) and
+the other ends of those links.
+
+    index = load_index()
+    index.query(0, 0, 500, 300, zoom=4)   # {"level", "aggregated", "nodes", "links"}
+    serve(index, port=8000)
+
+    $ python tile_server.py --port 8000       # then open http://127.0.0.1:8000/
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from graph_core import GraphCore, undirected_key
+from simulation_flow_graph import (LINK_COLOR_RANGE, LINK_WIDTH_RANGE, NODE_NORMAL_SIZE, TRAFFIC_UNIT, check_inputs,
+                                   g_make, load_all_data)
+
+logger = logging.getLogger("main")
+
+TILE_NODES = 5000  # nodes of a viewport at the detail level, on average
+MAX_LINKS = 20000  # links of a tile, the heaviest ones are kept
+CLUSTER_CELLS = 32  # clusters per side of the layout at level 0 (per AS)
+NODES_PER_CELL = 4  # nodes of a grid index cell, on average
+CLUSTER_SIZE_RANGE = (10, 40)  # symbol size of clusters, mapped from the log of their node count
+SYMBOLS = ("circle", "roundRect", "rect", "triangle", "diamond")  # router, receiver, source, switch, bgn
+JS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "js")
+ROAM_DELAY = 150  # ms without roaming before a tile is requested
+
+# after a roam, request the tile of the viewport and replace the data and links of the series; responses of
+# older requests are dropped
+TILE_JS = """
+    (function (chart, url) {
+        var timer = null, last = null, sequence = 0;
+        function request() {
+            var p0 = chart.convertFromPixel({seriesIndex: 0}, [0, 0]);
+            var p1 = chart.convertFromPixel({seriesIndex: 0}, [chart.getWidth(), chart.getHeight()]);
+            var zoom = chart.getOption().series[0].zoom || 1;
+            var query = "bbox=" + [p0[0], p0[1], p1[0], p1[1]].map(function (v) {
+                return v.toFixed(2);
+            }).join(",") + "&zoom=" + zoom.toFixed(4);
+            if (query === last) {
+                return;
+            }
+            last = query;
+            var current = ++sequence;
+            fetch(url + "?" + query).then(function (response) {
+                return response.json();
+            }).then(function (tile) {
+                if (current === sequence) {
+                    chart.setOption({series: [{data: tile.nodes, links: tile.links}]});
+                }
+            });
+        }
+        chart.on("graphroam", function () {
+            clearTimeout(timer);
+            timer = setTimeout(request, %(delay)d);
+        });
+    })(chart_%(id)s, "/tile");
+"""
+
+
+def _unique(values: np.ndarray) -> np.ndarray:
+    # sort based, much faster than the hash table of np.unique for large int64 arrays
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+
+
+def _gather(starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """
+    :return: concatenation of the ranges [starts[i], stops[i])
+    """
+    counts = stops - starts
+    total = int(counts.sum())
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+
+
+class GridIndex:
+    """
+    Uniform grid over points: the point indices are sorted by cell (column-major), so the cells of one
+    column of a query box are one contiguous slice
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, origin: tuple, side: float, cells: int):
+        self.x, self.y = x, y
+        self.origin, self.cells = origin, cells
+        self.size = side / cells
+        key = self._cell(x, origin[0]) * cells + self._cell(y, origin[1])
+        self.order = np.argsort(key, kind="stable")
+        self.starts = np.searchsorted(key[self.order], np.arange(cells * cells + 1))
+
+    def _cell(self, v, origin: float):
+        return np.clip(np.floor((np.asarray(v) - origin) / self.size), 0, self.cells - 1).astype(np.int64)
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """
+        :return: sorted indices of the points inside the box
+        """
+        (i0, i1), (j0, j1) = self._cell([x0, x1], self.origin[0]), self._cell([y0, y1], self.origin[1])
+        columns = np.arange(i0, i1 + 1) * self.cells
+        candidates = self.order[_gather(self.starts[columns + j0], self.starts[columns + j1 + 1])]
+        x, y = self.x[candidates], self.y[candidates]
+        return np.sort(candidates[(x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)])
+
+
+class Layer:
+    """
+    Nodes and links of one zoom level, with a grid index of the node positions and the links of every node
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, src: np.ndarray, dst: np.ndarray, weight: np.ndarray,
+                 origin: tuple, side: float):
+        self.x, self.y, self.src, self.dst, self.weight = x, y, src, dst, weight
+        cells = int(np.clip(np.sqrt(len(x) / NODES_PER_CELL), 1, 2048))
+        self.grid = GridIndex(x, y, origin, side, cells)
+        ends = np.concatenate((src, dst))
+        order = np.argsort(ends, kind="stable")
+        self.incident = order % max(len(src), 1)
+        self.incident_starts = np.searchsorted(ends[order], np.arange(len(x) + 1))
+
+    def query(self, x0: float, y0: float, x1: float, y1: float, max_links: int = MAX_LINKS) -> tuple:
+        """
+        :return: (nodes, links) indices: the visible nodes, at most max_links of their links (the heaviest)
+                 and the other ends of those links
+        """
+        visible = self.grid.query(x0, y0, x1, y1)
+        links = _unique(self.incident[_gather(self.incident_starts[visible], self.incident_starts[visible + 1])])
+        if len(links) > max_links:
+            links = np.sort(links[np.argpartition(-self.weight[links], max_links)[:max_links]])
+        nodes = _unique(np.concatenate((visible, self.src[links], self.dst[links])))
+        return nodes, links
+
+
+def aggregate(core: GraphCore, category: np.ndarray, origin: tuple, side: float, cells: int) -> dict:
+    """
+    Cluster the nodes of one AS in one of cells x cells layout cells, and sum the links between clusters
+    :param category: index of the AS of every node
+    :return: {"cluster": cluster of every node, "x", "y", "count", "load", "category" of the clusters,
+              "src", "dst", "count_links", "link_val", "flag" of the links between clusters}
+    """
+    cx = np.clip(((core.x - origin[0]) / side * cells).astype(np.int64), 0, cells - 1)
+    cy = np.clip(((core.y - origin[1]) / side * cells).astype(np.int64), 0, cells - 1)
+    key = (cx * cells + cy) * (int(category.max(initial=0)) + 1) + category
+    order = np.argsort(key, kind="stable")
+    first = np.flatnonzero(np.concatenate(([True], key[order][1:] != key[order][:-1])))
+    cluster = np.empty(len(key), dtype=np.int64)
+    cluster[order] = np.repeat(np.arange(len(first)), np.diff(np.append(first, len(key))))
+    count = np.bincount(cluster, minlength=len(first))
+    result = {"cluster": cluster, "count": count, "category": category[order[first]],
+              "x": np.bincount(cluster, core.x, len(first)) / count,
+              "y": np.bincount(cluster, core.y, len(first)) / count,
+              "load": np.bincount(cluster, core.load, len(first))}
+    a, b = cluster[core.src], cluster[core.dst]
+    between = a != b
+    link_key = undirected_key(a[between], b[between])
+    order = np.argsort(link_key, kind="stable")
+    link_key = link_key[order]
+    first = np.flatnonzero(np.concatenate(([True], link_key[1:] != link_key[:-1]))) if len(link_key) else first[:0]
+    result.update(src=link_key[first] >> 32, dst=link_key[first] & 0xFFFFFFFF,
+                  count_links=np.diff(np.append(first, len(link_key))),
+                  link_val=np.add.reduceat(core.link_val[between][order], first) if len(first) else np.zeros(0),
+                  flag=np.maximum.reduceat(core.flag[between][order], first) if len(first) else np.zeros(0))
+    return result
+
+
+class TileIndex:
+    """
+    Zoom levels of a graph whose nodes all have coordinates: aggregated levels 0 .. detail - 1, then the
+    graph itself at the detail level
+    """
+
+    def __init__(self, core: GraphCore, tile_nodes: int = TILE_NODES, max_links: int = MAX_LINKS):
+        if not core.has_layout.all():
+            raise ValueError("The tile server needs the coordinates of all nodes, {} missing"
+                             .format(int((~core.has_layout).sum())))
+        self.core, self.max_links = core, max_links
+        self.categories = core.categories()
+        category = np.searchsorted(self.categories, core.as_id)
+        low, high = np.array([core.x.min(), core.y.min()]), np.array([core.x.max(), core.y.max()])
+        self.origin, self.side = (float(low[0]), float(low[1])), max(float((high - low).max()), 1.0)
+        self.bounds = [float(low[0]), float(low[1]), float(high[0]), float(high[1])]
+        # smallest level whose viewport holds at most tile_nodes nodes on average
+        self.detail = max(int(np.ceil(np.log(max(core.num_nodes / tile_nodes, 1)) / np.log(4))), 0)
+        self.clusters = [aggregate(core, category, self.origin, self.side, CLUSTER_CELLS * 2 ** level)
+                         for level in range(self.detail)]
+        self.layers = [Layer(c["x"], c["y"], c["src"], c["dst"], c["link_val"] + c["count_links"], self.origin,
+                             self.side) for c in self.clusters]
+        self.layers.append(Layer(core.x, core.y, core.src, core.dst, core.link_val, self.origin, self.side))
+        self.category = category
+        self.sizes = core.symbol_sizes(NODE_NORMAL_SIZE)
+
+    def level(self, x0: float, y0: float, x1: float, y1: float, zoom: float = None) -> int:
+        """
+        :param zoom: roam zoom of the graph, 1 shows the whole layout; derived from the box if None
+        """
+        if zoom is None:
+            zoom = self.side / max(x1 - x0, y1 - y0, 1e-9)
+        return int(np.clip(np.floor(np.log2(max(zoom, 1e-9))), 0, self.detail))
+
+    def anchors(self) -> list:
+        """
+        :return: invisible nodes at the corners of the layout, they fix the bounding box of the graph
+        """
+        hidden = {"symbolSize": 0, "label": {"show": False}, "tooltip": {"show": False}, "silent": True}
+        return [dict(hidden, name="_anchor_min", x=self.bounds[0], y=self.bounds[1]),
+                dict(hidden, name="_anchor_max", x=self.bounds[2], y=self.bounds[3])]
+
+    def query(self, x0: float, y0: float, x1: float, y1: float, zoom: float = None) -> dict:
+        """
+        :return: {"level", "aggregated", "nodes", "links"}, nodes and links are ECharts graph data items
+        """
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        level = self.level(x0, y0, x1, y1, zoom)
+        nodes, links = self.layers[level].query(x0, y0, x1, y1, self.max_links)
+        if level < self.detail:
+            nodes_data, links_data = self._cluster_items(level, nodes, links)
+        else:
+            nodes_data, links_data = self._node_items(nodes, links)
+        return {"level": level, "aggregated": level < self.detail, "nodes": nodes_data + self.anchors(),
+                "links": links_data}
+
+    def _node_items(self, nodes: np.ndarray, links: np.ndarray) -> tuple:
+        core = self.core
+        names = core.node_id[nodes].astype(str).tolist()
+        loads = np.round(core.load[nodes] / TRAFFIC_UNIT, 2).tolist()
+        sizes = np.round(self.sizes[nodes], 2).tolist()
+        nodes_data = [{"name": name, "x": x, "y": y, "value": [load, ctrl], "category": cat, "symbol": SYMBOLS[t],
+                       "symbolSize": size}
+                      for name, x, y, load, ctrl, cat, t, size in zip(
+                          names, core.x[nodes].tolist(), core.y[nodes].tolist(), loads, core.ctrl[nodes].tolist(),
+                          self.category[nodes].tolist(), core.type[nodes].tolist(), sizes)]
+        # like build_links(): the width of links with flow is mapped from their load
+        loaded = core.flag[links] > 0
+        link_val = core.link_val[links]
+        low, high = LINK_WIDTH_RANGE
+        widths = np.where(loaded, low + link_val / (core.link_val.max(initial=0) or 1.0) * (high - low), 1.0)
+        links_data = [{"source": s, "target": t, "value": v, "lineStyle": {"width": w, "color": c}}
+                      for s, t, v, w, c in zip(core.node_id[core.src[links]].astype(str).tolist(),
+                                               core.node_id[core.dst[links]].astype(str).tolist(),
+                                               np.round(link_val / TRAFFIC_UNIT, 2).tolist(),
+                                               np.round(widths, 2).tolist(),
+                                               np.where(loaded, LINK_COLOR_RANGE[1], LINK_COLOR_RANGE[0]).tolist())]
+        return nodes_data, links_data
+
+    def _cluster_items(self, level: int, nodes: np.ndarray, links: np.ndarray) -> tuple:
+        """
+        Clusters are named L<level>:<index>, their value is [nodes, load]; links between clusters are wider
+        the more links they sum up, and dark if any of them has flow
+        """
+        c = self.clusters[level]
+        prefix = "L{}:".format(level)
+        low, high = CLUSTER_SIZE_RANGE
+        sizes = low + np.log(c["count"][nodes]) / np.log(max(int(c["count"].max()), 2)) * (high - low)
+        nodes_data = [{"name": prefix + str(i), "x": x, "y": y, "value": [count, load], "category": cat,
+                       "symbol": "circle", "symbolSize": size}
+                      for i, x, y, count, load, cat, size in zip(
+                          nodes.tolist(), c["x"][nodes].tolist(), c["y"][nodes].tolist(), c["count"][nodes].tolist(),
+                          np.round(c["load"][nodes] / TRAFFIC_UNIT, 2).tolist(), c["category"][nodes].tolist(),
+                          np.round(sizes, 2).tolist())]
+        low, high = LINK_WIDTH_RANGE
+        count = c["count_links"][links]
+        widths = low + np.log(count) / np.log(max(int(c["count_links"].max(initial=0)), 2)) * (high - low)
+        colors = np.where(c["flag"][links] > 0, LINK_COLOR_RANGE[1], LINK_COLOR_RANGE[0])
+        links_data = [{"source": prefix + str(s), "target": prefix + str(t), "value": v,
+                       "lineStyle": {"width": w, "color": color}}
+                      for s, t, v, w, color in zip(c["src"][links].tolist(), c["dst"][links].tolist(),
+                                                   np.round(c["link_val"][links] / TRAFFIC_UNIT, 2).tolist(),
+                                                   np.round(widths, 2).tolist(), colors.tolist())]
+        return nodes_data, links_data
+
+    def page(self, title: str = "Simulation_Flow_Graph") -> str:
+        """
+        :return: html of the graph with the tile of the whole layout and the js which requests the next tiles
+        """
+        tile = self.query(*self.bounds, zoom=1)
+        categories = [{"name": "AS:" + str(cate)} for cate in self.categories.tolist()]
+        graph_ = g_make(tile["nodes"], tile["links"], categories, "none", title,
+                        tooltip_opts={"formatter": "{b}: {c}"})
+        graph_.add_js_funcs(TILE_JS % {"id": graph_.chart_id, "delay": ROAM_DELAY})
+        return graph_.render_embed()
+
+
+def load_index(validate_inputs: bool = True, tile_nodes: int = TILE_NODES, max_links: int = MAX_LINKS) -> TileIndex:
+    """
+    Build the tile index from the input files of simulation_flow_graph.py, see load_all_data()
+    """
+    if validate_inputs:
+        check_inputs("file")
+    all_data, type_data, layout_data = load_all_data()
+    start = time.perf_counter()
+    index = TileIndex(GraphCore.from_table(all_data, type_data, layout_data), tile_nodes, max_links)
+    logger.info("Tile index: {} nodes, {} links, {} aggregated levels, {:.2f}s".format(
+        index.core.num_nodes, index.core.num_edges, index.detail, time.perf_counter() - start))
+    return index
+
+
+class TileHandler(BaseHTTPRequestHandler):
+    """
+    GET /                               the page, see TileIndex.page()
+    GET /tile?bbox=x0,y0,x1,y1&zoom=z   the tile of a viewport in layout coordinates, zoom is optional
+    GET /js/<file>                      echarts from the js directory of the repository
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/":
+            self._send(200, "text/html; charset=utf-8", self.server.page.encode())
+        elif url.path == "/tile":
+            query = parse_qs(url.query)
+            try:
+                bbox = [float(v) for v in query["bbox"][0].split(",")]
+                if len(bbox) != 4:
+                    raise ValueError("bbox needs 4 values")
+                zoom = float(query["zoom"][0]) if "zoom" in query else None
+                if not all(math.isfinite(v) for v in bbox + ([] if zoom is None else [zoom])):
+                    raise ValueError("bbox and zoom must be finite")
+            except (KeyError, ValueError) as e:
+                self._send(400, "text/plain", "Bad tile query: {}".format(e).encode())
+                return
+            start = time.perf_counter()
+            body = json.dumps(self.server.index.query(*bbox, zoom=zoom)).encode()
+            logger.debug("Tile {} zoom {}: {} bytes, {:.3f}s".format(
+                bbox, zoom, len(body), time.perf_counter() - start))
+            self._send(200, "application/json", body)
+        elif url.path.startswith("/js/") and os.path.isfile(os.path.join(JS_DIR, os.path.basename(url.path))):
+            with open(os.path.join(JS_DIR, os.path.basename(url.path)), "rb") as f:
+                self._send(200, "application/javascript", f.read())
+        else:
+            self._send(404, "text/plain", b"Not found")
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve(index: TileIndex, host: str = "127.0.0.1", port: int = 8000, title: str = "Simulation_Flow_Graph"):
+    server = ThreadingHTTPServer((host, port), TileHandler)
+    server.index, server.page = index, index.page(title)
+    logger.info("Serving tiles on http://{}:{}/".format(host, server.server_port))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="viewport tile server of large topologies")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--title", default="Simulation_Flow_Graph")
+    parser.add_argument("--tile-nodes", type=int, default=TILE_NODES, help="nodes of a viewport at the detail level")
+    parser.add_argument("--max-links", type=int, default=MAX_LINKS, help="links of a tile")
+    parser.add_argument("--no-validate", action="store_true", help="skip the check of the input files")
+    args = parser.parse_args()
+
+    serve(load_index(not args.no_validate, args.tile_nodes, args.max_links), args.host, args.port, args.title)
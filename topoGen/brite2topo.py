@@ -109,13 +109,15 @@ def largest_connected_component_subgraph(topology):
     return topology.subgraph(c)
 
 
-def dump_node_type(file_name: str, out_file: str, recv_ratio: float):
+def dump_node_type(file_name: str, out_file: str, recv_ratio: float, seed: int = None):
     """
     Get node type information from brite file
     :param file_name: input brite file name
     :param out_file: output file name (node type file)
     :param recv_ratio: receiver ratio(0 ~ 1.0), choose receivers in which node degree == 1, the other is source
+    :param seed: seed of the receiver choice, the global random state is used if None
     """
+    rng = random if seed is None else random.Random(seed)
     #  dump node type in: {"receiver", "source", "switch", "bgn"}
     topology = fnss.parse_brite(file_name).to_undirected()
     topology = largest_connected_component_subgraph(topology)
@@ -124,7 +126,7 @@ def dump_node_type(file_name: str, out_file: str, recv_ratio: float):
     # print(min(deg))
     one_deg = [v for v in topology.nodes() if deg[v] == 1]
     # get receivers
-    receiver = random.sample(one_deg, int(len(one_deg) * recv_ratio))
+    receiver = rng.sample(one_deg, int(len(one_deg) * recv_ratio))
     # get sources
     source = [v for v in one_deg if v not in receiver]
     # get switches(nodes which connect to receivers and sources)
@@ -161,21 +163,25 @@ def dump_topology(file_name: str, out_file: str, node_n: int, edge_n: int):
     df = pd.read_csv(file_name, skiprows=edge_line, sep="\t", header=None, skip_blank_lines=True)
     # format: edge_id, from_node, to_node, len, delay, capacity, from_as, to_as, type
     df[[6, 7]] += 1
-    df = pd.DataFrame(df[[1, 2, 6, 7]])
+    # output: from_node, to_node, from_as, to_as, delay, capacity
+    df = pd.DataFrame(df[[1, 2, 6, 7, 4, 5]])
     with open(out_file, "w") as f:
         f.write(str(node_n) + " " + str(edge_n) + "\n")
     df.to_csv(out_file, sep="\t", header=False, index=False, mode="a")
     print(">>> Generate topo done! nodes: {} / edges: {}, output to {}".format(node_n, edge_n, out_file))
 
 
-def extent_brite_topo(file_name: str, out_file: str, one_deg_n: int, sw_ratio: float = 0.3):
+def extent_brite_topo(file_name: str, out_file: str, one_deg_n: int, sw_ratio: float = 0.3, seed: int = None):
     """
     Extend brite topology file, add receivers and sources which has degree one to the file
     :param sw_ratio: the first sw_ratio * node_n access switches will be random chosen
     :param one_deg_n: receiver number + source number
     :param file_name: input brite file name
     :param out_file: output file name (brite file with extend information)
+    :param seed: seed of the access switches, positions and links of the new nodes, the global random state is
+                 used if None
     """
+    rng = random if seed is None else random.Random(seed)
     with open(file_name, 'r') as f:
         lines = f.readlines()
     # The first line is: Topology: (xx Nodes, xx Edges), xx += one_deg_n
@@ -213,18 +219,18 @@ def extent_brite_topo(file_name: str, out_file: str, one_deg_n: int, sw_ratio: f
     edge_line = findEdgesLine(file_name) - 1
     for i in range(one_deg_n):
         new_node = max_node_id + 1 + i
-        connect_node = random.choice(node_list)
+        connect_node = rng.choice(node_list)
         # print(connect_node, topology.nodes[connect_node])
         # construct new node line: NodeID, x, y, x-deg, y-deg, as_id
-        new_node_line = str(new_node) + "\t" + str(random.randint(0, 1000)) + "\t" + str(
-            random.randint(0, 1000)) + "\t" + "1" + "\t" + "1" + "\t" + str(
+        new_node_line = str(new_node) + "\t" + str(rng.randint(0, 1000)) + "\t" + str(
+            rng.randint(0, 1000)) + "\t" + "1" + "\t" + "1" + "\t" + str(
             topology.nodes[connect_node].get("AS", 0)) + "\t" + "RT_NODE" + "\n"
         lines.insert(edge_line - 1 + i, new_node_line)
         # construct new edge line: EdgeID, src, dst, distance, delay, capacity, from_as, to_as, type
         edge_id = max_edge_id + 1 + i
         from_as = to_as = topology.nodes[connect_node].get("AS", 0)
         new_edge_line = str(edge_id) + "\t" + str(new_node) + "\t" + str(connect_node) + "\t" + str(
-            random.random() * 1000) + "\t" + str(0.5 + random.random() / 4) + "\t" + str(10.0) + "\t" + str(
+            rng.random() * 1000) + "\t" + str(0.5 + rng.random() / 4) + "\t" + str(10.0) + "\t" + str(
             from_as) + "\t" + str(to_as) + "\t" + "E_RT" + "\t" + "U\n"
         lines.append(new_edge_line)
 
@@ -249,7 +255,7 @@ def check_layout_valid(layout_file: str, node_type_file: str, k: int):
         if not line.startswith("switch"):
             raise ValueError("The third line of node type file should start with 'switch'")
         line = line.strip("switch: ").strip("\n[]")
-        nodes = [int(v) for v in line.split(", ")]
+        nodes = {int(v) for v in line.split(", ")}
 
     if not nodes:
         raise ValueError("'switch' is none in node type file")
@@ -277,6 +283,7 @@ if __name__ == '__main__':
     SW_RAT = 0.8  # The ratio of switch candidates in all routers
     END_POINT_NUM = 30  # The number of end points(source + receiver)
     CONTROLLER_NUM = 3  # The number of controllers in each AS
+    # one fixed set of parameters, see sweep.py for a seeded grid of them
     path = "topology/DINNRS_topo/"  # brite file path
     # path = ""
     brite_file = path + "dinnrs.brite"
@@ -0,0 +1,268 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Synthetic topologies in BRITE format, without the BRITE tool:
+    waxman   flat router topology, incremental growth with the Waxman probability exp(-d / (beta * L))
+    ba       flat router topology, Barabasi-Albert preferential attachment
+    topdown  two-level hierarchy: an AS graph, a router graph in each AS, one router link per AS link
+
+The output has the Topology / Model / Nodes / Edges sections of a BRITE file with nodes and edges ordered
+by id, so it is read by fnss.parse_brite() and by extent_brite_topo(), dump_topology() and
+dump_axis_from_brite() of brite2topo.py like a file of the BRITE tool.
+
+Node ids are the join order: node i links to min(m, i) earlier nodes of its AS. Both models are sampled
+for all nodes at once with numpy in chunks of CHUNK links, so a million nodes take well under a minute,
+most of it writing the file. Everything is drawn from numpy.random.default_rng(seed).
+
+    $ python brite_gen.py big.brite --model waxman --nodes 1000000 --m 2 --seed 1
+    $ python brite_gen.py as.brite --as-nodes 20 --as-model ba --nodes 500 --model waxman --seed 1
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+MODELS = ("waxman", "ba")
+# model line of the BRITE file: (number, name)
+MODEL_IDS = {"waxman": (1, "RTWaxman"), "ba": (2, "RTBarabasi"), "topdown": (5, "TopDown")}
+HS = 1000  # side of the plane
+LS = 100  # side of the square of an AS in a top-down topology
+BETA = 0.2  # Waxman beta, BRITE default
+BW_MIN, BW_MAX = 10.0, 1024.0  # Mbps, uniform bandwidth, BRITE defaults
+SPEED = 300.0  # km per ms, delay = length / SPEED
+CHUNK = 1 << 22  # candidate links drawn at once
+MAX_DRAWS = 256  # candidates of a node in one round
+MAX_ROUNDS = 64  # Waxman rounds before the remaining links ignore the distance
+
+
+def _blocks(sizes) -> tuple:
+    """
+    :param sizes: number of nodes of each block (AS), the nodes of a block are consecutive
+    :return: (block of every node, first node of every block)
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    first = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    return np.repeat(np.arange(len(sizes)), sizes), first
+
+
+def _keys(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    return (src.astype(np.int64) << 32) | dst
+
+
+def _first_occurrence(keys: np.ndarray) -> np.ndarray:
+    """
+    :return: the keys without repetitions, in the order of their first occurrence
+    """
+    order = np.argsort(keys, kind="stable")
+    ordered = keys[order]
+    first = np.concatenate(([True], ordered[1:] != ordered[:-1])) if len(keys) else np.zeros(0, dtype=bool)
+    return keys[np.sort(order[first])]
+
+
+def _in_sorted(values: np.ndarray, ordered: np.ndarray) -> np.ndarray:
+    if len(ordered) == 0:
+        return np.zeros(len(values), dtype=bool)
+    pos = np.clip(np.searchsorted(ordered, values), 0, len(ordered) - 1)
+    return ordered[pos] == values
+
+
+def place_nodes(rng: np.random.Generator, n: int, side: int = HS) -> np.ndarray:
+    """
+    :return: (n, 2) int64 coordinates, uniform in the [0, side] square
+    """
+    return rng.integers(0, side + 1, (n, 2))
+
+
+def waxman_links(rng: np.random.Generator, xy: np.ndarray, sizes, m: int = 2, beta: float = BETA,
+                 scale: float = np.sqrt(2) * HS) -> tuple:
+    """
+    Incremental Waxman growth in every block: node i links to min(m, i) distinct earlier nodes of its block,
+    to an earlier node j with probability proportional to exp(-d(i, j) / (beta * scale)); BRITE's alpha
+    scales all of them and does not change the choice.
+    Candidates are drawn uniformly and accepted with that probability, in rounds for the nodes still short
+    of links. After MAX_ROUNDS rounds the distance is ignored, so that isolated nodes terminate.
+    :param xy: coordinates of all nodes
+    :param sizes: nodes of each block, links stay inside a block
+    :param scale: L, the largest distance in a block
+    :return: (src, dst) with dst < src
+    """
+    block, first = _blocks(sizes)
+    n = len(block)
+    offset = np.arange(n) - first[block]
+    need = np.minimum(offset, m)
+    # nodes with at most m earlier nodes link to all of them
+    small = np.flatnonzero((offset > 0) & (offset <= m))
+    counts = offset[small]
+    src = np.repeat(small, counts)
+    dst = first[block[src]] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    need[small] = 0
+    # sorted keys of all links so far
+    known = np.sort(_keys(src, dst))
+    oversample = 4.0
+    for round_ in range(MAX_ROUNDS + 1):
+        active = np.flatnonzero(need > 0)
+        if len(active) == 0:
+            break
+        draws = np.minimum(np.ceil(need[active] * oversample), MAX_DRAWS).astype(np.int64)
+        ends = np.cumsum(draws)
+        found = []
+        for part in np.split(np.arange(len(active)), np.searchsorted(ends, np.arange(CHUNK, ends[-1], CHUNK))):
+            nodes = np.repeat(active[part], draws[part])
+            cand = first[block[nodes]] + (rng.random(len(nodes)) * offset[nodes]).astype(np.int64)
+            if round_ < MAX_ROUNDS:
+                d = np.hypot(*(xy[nodes] - xy[cand]).T)
+                keep = rng.random(len(nodes)) < np.exp(-d / (beta * scale))
+                nodes, cand = nodes[keep], cand[keep]
+            found.append(_keys(nodes, cand))
+        keys = np.concatenate(found)
+        # twice the candidates the acceptance rate of this round asks for
+        oversample = float(np.clip(2.0 * ends[-1] / max(len(keys), 1), 2.0, MAX_DRAWS))
+        # drop repeated candidates and links of earlier rounds, keep the first `need` of every node
+        keys = _first_occurrence(keys)
+        keys = keys[~_in_sorted(keys, known)]
+        keys = keys[np.argsort(keys >> 32, kind="stable")]
+        nodes = keys >> 32
+        keys = keys[np.arange(len(keys)) - np.searchsorted(nodes, nodes) < need[nodes]]
+        need -= np.bincount(keys >> 32, minlength=n)
+        known = np.sort(np.concatenate((known, keys)))
+    return known >> 32, known & 0xFFFFFFFF
+
+
+def ba_links(rng: np.random.Generator, sizes, m: int = 2) -> tuple:
+    """
+    Barabasi-Albert growth in every block, sampled like Batagelj and Brandes: every node after the first of
+    its block adds m link slots, each slot copies the node of a uniformly chosen endpoint slot of the
+    earlier links of the block, which picks an earlier node with probability proportional to its degree.
+    Copies of copies are resolved by pointer jumping, repeated links are merged.
+    :param sizes: nodes of each block, links stay inside a block
+    :return: (src, dst) with dst < src
+    """
+    block, first = _blocks(sizes)
+    offset = np.arange(len(block)) - first[block]
+    src = np.repeat(np.flatnonzero(offset > 0), m)
+    g, o = block[src], offset[src]
+    # the links of a block are consecutive: block g starts at link (first[g] - g) * m
+    earlier = 2 * (o - 1) * m
+    pointer = 2 * (first[g] - g) * m + (rng.random(len(src)) * earlier).astype(np.int64)
+    # the second node of a block links to the first one, negative pointers are final nodes
+    pointer[earlier == 0] = -first[g[earlier == 0]] - 1
+    # slot 2k is src[k], slot 2k + 1 is the target of link k
+    while True:
+        odd = np.flatnonzero((pointer >= 0) & (pointer & 1 == 1))
+        if len(odd) == 0:
+            break
+        pointer[odd] = pointer[pointer[odd] >> 1]
+    dst = np.where(pointer < 0, -pointer - 1, src[np.maximum(pointer, 0) >> 1])
+    keys = _first_occurrence(_keys(src, dst))
+    return keys >> 32, keys & 0xFFFFFFFF
+
+
+def links(model: str, rng: np.random.Generator, xy: np.ndarray, sizes, m: int, beta: float = BETA,
+          scale: float = np.sqrt(2) * HS) -> tuple:
+    if model == "waxman":
+        return waxman_links(rng, xy, sizes, m, beta, scale)
+    elif model == "ba":
+        return ba_links(rng, sizes, m)
+    raise ValueError("Unknown model: {}, expected one of {}".format(model, MODELS))
+
+
+def flat_topology(model: str, n: int, m: int = 2, seed: int = 0, beta: float = BETA) -> dict:
+    """
+    :return: {"xy", "as_id", "src", "dst", "border", "rng"}, one AS without border routers
+    """
+    rng = np.random.default_rng(seed)
+    xy = place_nodes(rng, n)
+    src, dst = links(model, rng, xy, [n], m, beta)
+    return {"xy": xy, "as_id": np.zeros(n, dtype=np.int64), "src": src, "dst": dst,
+            "border": np.zeros(0, dtype=np.int64), "rng": rng}
+
+
+def top_down_topology(as_n: int, router_n: int, as_model: str = "waxman", router_model: str = "waxman",
+                      as_m: int = 2, router_m: int = 2, seed: int = 0, beta: float = BETA) -> dict:
+    """
+    Two-level topology like the top-down model of BRITE: as_n ASes in the HS plane, router_n routers in
+    the LS square of every AS, every AS link becomes a link between a random router of both ASes, whose
+    routers are RT_BORDER.
+    :return: {"xy", "as_id", "src", "dst", "border", "rng"}
+    """
+    rng = np.random.default_rng(seed)
+    as_xy = place_nodes(rng, as_n)
+    as_src, as_dst = links(as_model, rng, as_xy, [as_n], as_m, beta)
+    sizes = np.full(as_n, router_n)
+    as_id, first = _blocks(sizes)
+    xy = as_xy[as_id] + place_nodes(rng, len(as_id), LS)
+    src, dst = links(router_model, rng, xy, sizes, router_m, beta, np.sqrt(2) * LS)
+    a = first[as_src] + rng.integers(0, router_n, len(as_src))
+    b = first[as_dst] + rng.integers(0, router_n, len(as_dst))
+    return {"xy": xy, "as_id": as_id, "src": np.concatenate((src, a)), "dst": np.concatenate((dst, b)),
+            "border": np.unique(np.concatenate((a, b))), "rng": rng}
+
+
+def write_brite(topo: dict, file: str, model: str, params: str = "", bw: tuple = (BW_MIN, BW_MAX)):
+    """
+    :param topo: see flat_topology()
+    :param model: key of MODEL_IDS
+    :param params: text of the model line
+    :param bw: (min, max) of the uniform bandwidth
+    """
+    xy, as_id, src, dst = topo["xy"], topo["as_id"], topo["src"], topo["dst"]
+    n, e = len(as_id), len(src)
+    deg = np.bincount(np.concatenate((src, dst)), minlength=n)
+    is_border = np.zeros(n, dtype=bool)
+    is_border[topo["border"]] = True
+    length = np.hypot(*(xy[src] - xy[dst]).T)
+    nodes = pd.DataFrame({"id": np.arange(n), "x": xy[:, 0], "y": xy[:, 1], "in": deg, "out": deg, "as": as_id,
+                          "type": np.where(is_border, "RT_BORDER", "RT_NODE")})
+    edges = pd.DataFrame({"id": np.arange(e), "src": src, "dst": dst, "length": length, "delay": length / SPEED,
+                          "bw": topo["rng"].uniform(bw[0], bw[1], e), "src_as": as_id[src], "dst_as": as_id[dst],
+                          "type": np.where(as_id[src] == as_id[dst], "E_RT", "E_AS"), "dir": "U"})
+    with open(file, "w") as f:
+        f.write("Topology: ( {} Nodes, {} Edges )\n".format(n, e))
+        f.write("Model ({} - {}):  {}\n\n".format(*MODEL_IDS[model], params))
+        f.write("Nodes: ( {} )\n".format(n))
+        nodes.to_csv(f, sep="\t", header=False, index=False)
+        f.write("\n\nEdges: ( {} )\n".format(e))
+        edges.to_csv(f, sep="\t", header=False, index=False, float_format="%f")
+
+
+def generate(file: str, model: str = "waxman", n: int = 1000, m: int = 2, seed: int = 0, beta: float = BETA,
+             as_n: int = None, as_model: str = "waxman", as_m: int = 2, bw: tuple = (BW_MIN, BW_MAX)) -> tuple:
+    """
+    :param model: "waxman" or "ba", of the routers
+    :param n: number of routers, in every AS if as_n is set
+    :param m: links added by every router
+    :param as_n: number of ASes, a top-down topology if set, else a flat one
+    :param as_model: "waxman" or "ba", of the AS graph
+    :param as_m: links added by every AS
+    :return: (nodes, edges) written to file
+    """
+    if as_n:
+        topo = top_down_topology(as_n, n, as_model, model, as_m, m, seed, beta)
+        params = "{} ASes {} m={}, {} routers per AS {} m={}, beta={} seed={}".format(
+            as_n, as_model, as_m, n, model, m, beta, seed)
+        model = "topdown"
+    else:
+        topo = flat_topology(model, n, m, seed, beta)
+        params = "{} routers {} m={}, beta={} seed={}".format(n, model, m, beta, seed)
+    write_brite(topo, file, model, params, bw)
+    print(">>> Generate {} brite topology done! nodes: {} / edges: {}, output to {}".format(
+        model, len(topo["as_id"]), len(topo["src"]), file))
+    return len(topo["as_id"]), len(topo["src"])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="synthetic topology in BRITE format")
+    parser.add_argument("out_file")
+    parser.add_argument("--model", choices=MODELS, default="waxman", help="router model")
+    parser.add_argument("--nodes", type=int, default=1000, help="routers, in every AS if --as-nodes is set")
+    parser.add_argument("--m", type=int, default=2, help="links added by every router")
+    parser.add_argument("--as-nodes", type=int, help="ASes of a top-down topology")
+    parser.add_argument("--as-model", choices=MODELS, default="waxman", help="AS model")
+    parser.add_argument("--as-m", type=int, default=2, help="links added by every AS")
+    parser.add_argument("--beta", type=float, default=BETA, help="Waxman beta")
+    parser.add_argument("--bw", type=float, nargs=2, default=(BW_MIN, BW_MAX), help="min and max bandwidth, Mbps")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.out_file, args.model, args.nodes, args.m, args.seed, args.beta, args.as_nodes, args.as_model,
+             args.as_m, tuple(args.bw))
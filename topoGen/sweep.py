@@ -0,0 +1,156 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Seeded parameter sweep of brite2topo.py: every combination of the grid runs
+    extent_brite_topo -> dump_topology -> dump_node_type -> dump_axis_from_brite -> check_layout_valid
+in a process pool, each run in its own directory and with its own seed.
+
+The seed of a run is derived from the base seed, its parameters and its repeat number, so a run keeps its
+files when the grid is extended or reordered. manifest.json in the output directory lists every run with
+its parameters, seed, output files, stage timings and status; it is rewritten after each finished run.
+
+    $ python sweep.py topology/DINNRS_topo/dinnrs.brite sweep_out --end-points 30 60 --sw-ratio 0.3 0.8 \
+          --controllers 3 4 --repeats 2 --seed 7
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+import traceback
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from brite2topo import (check_layout_valid, dump_axis_from_brite, dump_node_type, dump_topology, extent_brite_topo,
+                        getNodesAndEdgesNumber)
+
+# parameters of one run, defaults are the constants of brite2topo.py's __main__
+PARAMS = {
+    "end_points": 30,  # END_POINT_NUM: receivers + sources
+    "recv_ratio": 0.8,  # RECV_RAT: receivers among the end points
+    "sw_ratio": 0.8,  # SW_RAT: share of routers which are access switch candidates
+    "controllers": 3,  # CONTROLLER_NUM: controllers in each AS
+}
+OUTPUT_FILES = {
+    "brite_extend": "extend.brite",
+    "topo": "community_small.txt",
+    "node_type": "node_type.txt",
+    "layout": "layout.txt",
+}
+
+
+def run_seed(params: dict, repeat: int, base_seed: int) -> int:
+    text = json.dumps(dict(params, repeat=repeat), sort_keys=True)
+    return (zlib.crc32(text.encode()) ^ base_seed) & 0x7FFFFFFF
+
+
+def run_name(params: dict, repeat: int) -> str:
+    return "ep{end_points}_recv{recv_ratio}_sw{sw_ratio}_ctrl{controllers}".format(**params) + "_r{}".format(repeat)
+
+
+def expand_grid(grid: dict, repeats: int = 1, base_seed: int = 0) -> list:
+    """
+    :param grid: {parameter: list of values}, missing parameters take their PARAMS default
+    :return: [{"name", "params", "repeat", "seed"}] for every combination and repeat
+    """
+    unknown = set(grid) - set(PARAMS)
+    if unknown:
+        raise ValueError("Unknown parameters: {}, expected some of {}".format(sorted(unknown), list(PARAMS)))
+    values = [grid.get(name) or [default] for name, default in PARAMS.items()]
+    runs = []
+    for combination in itertools.product(*values):
+        params = dict(zip(PARAMS, combination))
+        for repeat in range(repeats):
+            runs.append({"name": run_name(params, repeat), "params": params, "repeat": repeat,
+                         "seed": run_seed(params, repeat, base_seed)})
+    return runs
+
+
+def run_one(brite_file: str, out_dir: str, run: dict) -> dict:
+    """
+    Generate the files of one run into out_dir/<name>/
+    :return: run with "files", "timings" (seconds per stage), "valid", "status" and "error" added
+    """
+    params, seed = run["params"], run["seed"]
+    run_dir = os.path.join(out_dir, run["name"])
+    os.makedirs(run_dir, exist_ok=True)
+    files = {key: os.path.join(run_dir, name) for key, name in OUTPUT_FILES.items()}
+    result = dict(run, files=files, timings={}, valid=None, status="ok", error=None)
+    timings = result["timings"]
+    try:
+        start = time.perf_counter()
+        extent_brite_topo(brite_file, files["brite_extend"], params["end_points"], params["sw_ratio"], seed=seed)
+        timings["extend"] = time.perf_counter() - start
+        start = time.perf_counter()
+        node_num, edges_num = getNodesAndEdgesNumber(files["brite_extend"])
+        dump_topology(files["brite_extend"], files["topo"], node_num, edges_num)
+        timings["topology"] = time.perf_counter() - start
+        start = time.perf_counter()
+        # own stream, the receiver choice does not depend on how many draws the extension made
+        dump_node_type(files["brite_extend"], files["node_type"], params["recv_ratio"], seed=seed + 1)
+        timings["node_type"] = time.perf_counter() - start
+        start = time.perf_counter()
+        dump_axis_from_brite(files["brite_extend"], files["node_type"], files["layout"], node_num,
+                             params["controllers"])
+        timings["layout"] = time.perf_counter() - start
+        start = time.perf_counter()
+        result["valid"] = check_layout_valid(files["layout"], files["node_type"], params["controllers"])
+        timings["check"] = time.perf_counter() - start
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = "{}: {}\n{}".format(type(e).__name__, e, traceback.format_exc())
+    timings["total"] = sum(timings.values())
+    return result
+
+
+def write_manifest(file: str, manifest: dict):
+    with open(file + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(file + ".tmp", file)
+
+
+def sweep(brite_file: str, out_dir: str, grid: dict, repeats: int = 1, base_seed: int = 0,
+          processes: int = None) -> dict:
+    """
+    :param brite_file: source brite topology
+    :param grid: {parameter: list of values}, see PARAMS
+    :param repeats: runs per combination, each with its own seed
+    :param processes: size of the process pool, default is the number of CPUs
+    :return: the manifest, also written to out_dir/manifest.json
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    runs = expand_grid(grid, repeats, base_seed)
+    manifest_file = os.path.join(out_dir, "manifest.json")
+    manifest = {"brite_file": os.path.abspath(brite_file), "grid": grid, "repeats": repeats, "seed": base_seed,
+                "started": time.strftime("%Y-%m-%d %H:%M:%S"), "runs": []}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(run_one, brite_file, out_dir, run) for run in runs]
+        for future in as_completed(futures):
+            result = future.result()
+            manifest["runs"].append(result)
+            manifest["runs"].sort(key=lambda r: r["name"])
+            manifest["elapsed"] = time.perf_counter() - start
+            write_manifest(manifest_file, manifest)
+            print(">>> [{}/{}] {}: {} ({:.2f}s)".format(
+                len(manifest["runs"]), len(runs), result["name"], result["status"], result["timings"]["total"]))
+    failed = [r["name"] for r in manifest["runs"] if r["status"] != "ok"]
+    print(">>> Sweep done! {} runs, {} failed, manifest: {}".format(len(runs), len(failed), manifest_file))
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="seeded parameter sweep of brite2topo.py")
+    parser.add_argument("brite_file")
+    parser.add_argument("out_dir")
+    parser.add_argument("--end-points", type=int, nargs="+", help="END_POINT_NUM values")
+    parser.add_argument("--recv-ratio", type=float, nargs="+", help="RECV_RAT values")
+    parser.add_argument("--sw-ratio", type=float, nargs="+", help="SW_RAT values")
+    parser.add_argument("--controllers", type=int, nargs="+", help="CONTROLLER_NUM values")
+    parser.add_argument("--repeats", type=int, default=1, help="runs per combination")
+    parser.add_argument("--seed", type=int, default=0, help="base seed")
+    parser.add_argument("--processes", type=int, help="size of the process pool")
+    args = parser.parse_args()
+
+    sweep_grid = {name: getattr(args, name) for name in PARAMS if getattr(args, name)}
+    sweep(args.brite_file, args.out_dir, sweep_grid, args.repeats, args.seed, args.processes)
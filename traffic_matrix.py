@@ -0,0 +1,231 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+import logging
+import os
+
+import numpy as np
+
+from pyecharts import options as opts
+from pyecharts.charts import HeatMap
+
+logger = logging.getLogger("main")
+
+
+def _coalesce(rows: np.ndarray, cols: np.ndarray, values: np.ndarray, n_cols: int) -> tuple:
+    """
+    Merge duplicated (row, col) entries by summing their values, drop zero entries
+    :return: (rows, cols, values) sorted by row then col
+    """
+    keys = rows.astype(np.int64) * n_cols + cols.astype(np.int64)
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=len(uniq))
+    nonzero = sums != 0
+    uniq, sums = uniq[nonzero], sums[nonzero]
+    return (uniq // n_cols).astype(np.int32), (uniq % n_cols).astype(np.int32), sums
+
+
+class TrafficMatrix:
+    """
+    Sparse source x receiver demand matrix, stored as coalesced coordinate arrays.
+    row_labels / col_labels give the endpoint (or domain) of each row / column.
+    downsampled marks a matrix whose labels are "first~last" blocks, see downsample()
+    """
+
+    downsampled = False
+
+    def __init__(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray,
+                 row_labels: np.ndarray, col_labels: np.ndarray):
+        self.row_labels = np.asarray(row_labels)
+        self.col_labels = np.asarray(col_labels)
+        self.rows, self.cols, self.values = _coalesce(np.asarray(rows), np.asarray(cols),
+                                                      np.asarray(values, dtype=np.float64),
+                                                      max(len(self.col_labels), 1))
+
+    @classmethod
+    def from_triples(cls, src, dst, values, sources=None, receivers=None) -> "TrafficMatrix":
+        """
+        Build a matrix from (src, dst, value) triples
+        :param sources: optional row labels, triples whose src is not in sources are dropped
+        :param receivers: optional column labels, triples whose dst is not in receivers are dropped
+        """
+        src, dst = np.asarray(src), np.asarray(dst)
+        values = np.asarray(values, dtype=np.float64)
+        row_labels = np.unique(src) if sources is None else np.unique(np.asarray(sources))
+        col_labels = np.unique(dst) if receivers is None else np.unique(np.asarray(receivers))
+        keep = np.isin(src, row_labels) & np.isin(dst, col_labels)
+        rows = np.searchsorted(row_labels, src[keep])
+        cols = np.searchsorted(col_labels, dst[keep])
+        return cls(rows, cols, values[keep], row_labels, col_labels)
+
+    @classmethod
+    def from_flow_file(cls, file: str, value_col: int = 4, sources=None, receivers=None) -> "TrafficMatrix":
+        """
+        Load a matrix from a flow_data file: src dst src_load dst_load link_val (space separated)
+        :param value_col: column used as the matrix value, default is the link load
+        """
+        logger.info("Loading traffic matrix from flow file: {}".format(file))
+        arr = np.loadtxt(file, delimiter=" ", ndmin=2)
+        if arr.size == 0:
+            arr = np.zeros((0, 5))
+        return cls.from_triples(arr[:, 0].astype(np.int64), arr[:, 1].astype(np.int64), arr[:, value_col],
+                                sources, receivers)
+
+    @classmethod
+    def from_demand_file(cls, file: str, sources=None, receivers=None) -> "TrafficMatrix":
+        """
+        Load a matrix from a demand file: src dst volume (whitespace separated)
+        """
+        logger.info("Loading traffic matrix from demand file: {}".format(file))
+        arr = np.loadtxt(file, ndmin=2)
+        if arr.size == 0:
+            arr = np.zeros((0, 3))
+        return cls.from_triples(arr[:, 0].astype(np.int64), arr[:, 1].astype(np.int64), arr[:, 2],
+                                sources, receivers)
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.row_labels), len(self.col_labels)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.values)
+
+    def total(self) -> float:
+        return float(self.values.sum())
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.zeros(self.shape, dtype=np.float64)
+        dense[self.rows, self.cols] = self.values
+        return dense
+
+    def aggregate(self, domain_map: dict) -> "TrafficMatrix":
+        """
+        Aggregate endpoints into domains (AS or ctrl domain)
+        :param domain_map: {node_id: domain label}, see load_domain_map(); unknown nodes are dropped
+        """
+        if self.downsampled:
+            raise ValueError("Cannot aggregate a downsampled matrix, its labels are blocks of endpoints; "
+                             "aggregate() before downsample()")
+
+        def _map(labels):
+            mapped = np.array([domain_map.get(int(v), None) for v in labels], dtype=object)
+            known = np.array([v is not None for v in mapped], dtype=bool)
+            domains = np.array(sorted(set(mapped[known])))
+            index = np.full(len(labels), -1, dtype=np.int64)
+            if len(domains):
+                index[known] = np.searchsorted(domains, mapped[known].astype(domains.dtype))
+            return domains, index
+
+        row_domains, row_index = _map(self.row_labels)
+        col_domains, col_index = _map(self.col_labels)
+        rows, cols = row_index[self.rows], col_index[self.cols]
+        keep = (rows >= 0) & (cols >= 0)
+        return TrafficMatrix(rows[keep], cols[keep], self.values[keep], row_domains, col_domains)
+
+    def downsample(self, max_size: int) -> "TrafficMatrix":
+        """
+        Block-downsample the matrix so that each side has at most max_size entries, values of a block are summed.
+        Block labels are "first~last" of the merged original labels.
+        """
+        n_rows, n_cols = self.shape
+        row_block = -(-n_rows // max_size) if n_rows > max_size else 1
+        col_block = -(-n_cols // max_size) if n_cols > max_size else 1
+        if row_block == 1 and col_block == 1:
+            return self
+
+        def _block_labels(labels, block):
+            if block == 1:
+                return labels
+            starts = labels[::block]
+            ends = labels[np.minimum(np.arange(block - 1, len(labels) + block - 1, block), len(labels) - 1)]
+            return np.array(["{}~{}".format(s, e) for s, e in zip(starts, ends)])
+
+        tm = TrafficMatrix(self.rows // row_block, self.cols // col_block, self.values,
+                           _block_labels(self.row_labels, row_block), _block_labels(self.col_labels, col_block))
+        tm.downsampled = True
+        return tm
+
+
+def load_domain_map(layout_file: str, by: str = "as") -> dict:
+    """
+    Get the domain of every node from layout file (NodeID, x, y, as_id, ctrl_id), or (NodeID, x, y, ctrl_id)
+    without the AS column like load_axis_to_dict()
+    :param by: "as" -> AS id; "ctrl" -> "AS<as_id>-C<ctrl_id>", ctrl ids are only unique inside an AS,
+               "C<ctrl_id>" in a file without the AS column
+    :return: {node_id: domain}
+    """
+    if by not in ("as", "ctrl"):
+        raise ValueError("Unknown domain type: {}, expected 'as' or 'ctrl'".format(by))
+    arr = np.loadtxt(layout_file, delimiter=",", ndmin=2).astype(np.int64)
+    if arr.shape[1] < 5:
+        # node, x, y, ctrl: no AS column
+        if by == "as":
+            raise ValueError("{} has no AS column, use by='ctrl' or the 5 column layout".format(layout_file))
+        return {n: "C{}".format(c) for n, c in zip(arr[:, 0].tolist(), arr[:, -1].tolist())}
+    if by == "as":
+        return dict(zip(arr[:, 0].tolist(), arr[:, 3].tolist()))
+    return {n: "AS{}-C{}".format(a, c)
+            for n, a, c in zip(arr[:, 0].tolist(), arr[:, 3].tolist(), arr[:, -1].tolist())}
+
+
+def load_endpoints(node_type_file: str) -> tuple:
+    """
+    Get (sources, receivers) from node_type file
+    """
+    with open(node_type_file, 'r') as f:
+        lines = f.readlines()
+    if len(lines) != 4:
+        raise ValueError("wrong format in node_type.txt file!")
+
+    def _parse(line):
+        items = line.split(":")[1].strip("[ ]\n")
+        return np.array([int(v) for v in items.split(", ")] if items else [], dtype=np.int64)
+
+    return _parse(lines[1]), _parse(lines[0])
+
+
+def make_heatmap(tm: TrafficMatrix, title: str = "Traffic Matrix", max_size: int = 200,
+                 unit: float = 1, unit_print: str = "") -> HeatMap:
+    """
+    Render the traffic matrix with HeatMap, rows are sources (y axis) and columns are receivers (x axis)
+    :param max_size: matrix larger than max_size on any side is block-downsampled before serialization
+    :param unit: values are divided by unit
+    :param unit_print: unit text shown in subtitle
+    """
+    tm = tm.downsample(max_size)
+    values = np.round(tm.values / unit, 2)
+    data = np.column_stack((tm.cols, tm.rows, values)).tolist()
+    max_val = float(values.max()) if len(values) else 1
+    c = (
+        HeatMap(opts.InitOpts(width="1200px", height="900px", page_title=title, js_host="./js/"))
+        .add_xaxis([str(v) for v in tm.col_labels])
+        .add_yaxis("demand", [str(v) for v in tm.row_labels], data,
+                   label_opts=opts.LabelOpts(is_show=False))
+        .set_global_opts(
+            title_opts=opts.TitleOpts(title=title, subtitle="Unit: " + unit_print if unit_print else None),
+            xaxis_opts=opts.AxisOpts(name="receiver", type_="category"),
+            yaxis_opts=opts.AxisOpts(name="source", type_="category"),
+            visualmap_opts=opts.VisualMapOpts(min_=0, max_=max_val, orient="horizontal",
+                                              pos_left="center", pos_bottom="0"),
+            tooltip_opts=opts.TooltipOpts(formatter="{c}"),
+            datazoom_opts=[opts.DataZoomOpts(type_="inside", range_start=0, range_end=100, xaxis_index=0),
+                           opts.DataZoomOpts(type_="inside", range_start=0, range_end=100, yaxis_index=0,
+                                             orient="vertical")],
+        )
+    )
+    return c
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    data_source_dir = "data_source/"
+    demand_file = data_source_dir + "demand.txt"
+    if os.path.exists(demand_file):
+        srcs, rcvs = load_endpoints(data_source_dir + "node_type.txt")
+        matrix = TrafficMatrix.from_demand_file(demand_file, sources=srcs, receivers=rcvs)
+    else:
+        matrix = TrafficMatrix.from_flow_file(data_source_dir + "flow_data.txt")
+    make_heatmap(matrix, title="Traffic Matrix", unit=10 ** 6, unit_print="1M").render("traffic_matrix.html")
+    as_matrix = matrix.aggregate(load_domain_map(data_source_dir + "layout.txt", by="as"))
+    make_heatmap(as_matrix, title="AS Traffic Matrix", unit=10 ** 6, unit_print="1M").render("traffic_matrix_as.html")
+    print("done!")
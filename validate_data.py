@@ -0,0 +1,270 @@
+#! /usr/bin/python3
+# -*- encoding:utf-8 -*-
+"""
+Cross-file consistency check of the input files of simulation_flow_graph.py:
+    community_small.txt  flow_data.txt  flow_data_new.txt  layout.txt  node_type.txt
+
+Every file is read once into arrays (pandas C parser), every check is a set operation on sorted numpy
+arrays, so all problems are reported in one pass. The node ids and edge keys of the topology are
+sorted once and shared by all checks. 1M topology edges (benchmarks/synth_topo.py) take 1 to 1.5 s on
+one core, about 70% of it parsing the text files. A problem is an "error" if run() would fail on it
+and a "warning" if the data is silently ignored or drawn wrong. run() calls validate() first, see
+simulation_flow_graph.check_inputs().
+
+    problems = validate("data_source/", ctrl_per_as=3)
+    print(report(problems))
+
+    $ python validate_data.py data_source/ --ctrl 3
+"""
+import argparse
+import os
+import re
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from graph_core import undirected_key
+
+ERROR = "error"
+WARNING = "warning"
+MAX_EXAMPLES = 5
+TYPE_NAMES = ("receiver", "source", "switch", "bgn")
+FILES = {
+    "topo": "community_small.txt",
+    "flow": "flow_data.txt",
+    "flow_new": "flow_data_new.txt",
+    "layout": "layout.txt",
+    "node_type": "node_type.txt",
+}
+
+Problem = namedtuple("Problem", ["level", "file", "check", "count", "examples"])
+
+
+def _problem(level: str, file: str, check: str, items) -> list:
+    """
+    :return: [Problem] if items is not empty, else []
+    """
+    items = np.asarray(items)
+    if len(items) == 0:
+        return []
+    return [Problem(level, os.path.basename(file), check, len(items), items[:MAX_EXAMPLES].tolist())]
+
+
+def read_table(file: str, sep: str, columns: int, skiprows: int = 0) -> np.ndarray:
+    """
+    :return: float64 array of the first `columns` columns, nan where a row is shorter
+    """
+    if not os.path.exists(file) or os.path.getsize(file) == 0:
+        return np.zeros((0, columns))
+    arr = pd.read_csv(file, sep=sep, header=None, skiprows=skiprows, dtype=np.float64, engine="c").to_numpy()
+    if arr.shape[1] < columns:
+        arr = np.hstack((arr, np.full((len(arr), columns - arr.shape[1]), np.nan)))
+    return arr[:, :columns]
+
+
+def read_node_types(file: str) -> dict:
+    """
+    :return: {type name: int64 array of node ids}, see simulation_flow_graph.load_type_data()
+    """
+    types = {}
+    with open(file) as f:
+        for line in f:
+            if ":" not in line:
+                continue
+            name, ids = line.split(":", 1)
+            types[name.strip()] = np.array(re.findall(r"-?\d+", ids), dtype=np.int64)
+    return types
+
+
+def _unique(values: np.ndarray) -> np.ndarray:
+    # sort based, much faster than the hash table of np.unique for large int64 arrays
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+
+
+def _missing(values: np.ndarray, present: np.ndarray, present_sorted: bool = False) -> np.ndarray:
+    """
+    :param present_sorted: present is sorted already (duplicates allowed), saves a sort
+    :return: sorted unique values which are not in present
+    """
+    values = _unique(values)
+    if not present_sorted:
+        present = _unique(present)
+    if len(present) == 0:
+        return values
+    pos = np.clip(np.searchsorted(present, values), 0, len(present) - 1)
+    return values[present[pos] != values]
+
+
+def _duplicates(values: np.ndarray, is_sorted: bool = False) -> np.ndarray:
+    if not is_sorted:
+        values = np.sort(values)
+    return _unique(values[1:][values[1:] == values[:-1]])
+
+
+def _links(keys: np.ndarray) -> np.ndarray:
+    return np.column_stack((keys >> 32, keys & 0xFFFFFFFF))
+
+
+def topology_index(topo: np.ndarray) -> tuple:
+    """
+    Sorted arrays shared by all checks, so that the 1M edges of a topology are sorted only once
+    :param topo: [src dst src_as dst_as (delay capacity)] rows
+    :return: (sorted unique node ids, sorted undirected keys of the edges, duplicates kept)
+    """
+    src, dst = topo[:, 0].astype(np.int64), topo[:, 1].astype(np.int64)
+    return _unique(np.concatenate((src, dst))), np.sort(undirected_key(src, dst))
+
+
+def check_topology(topo: np.ndarray, header: tuple, file: str, index: tuple = None) -> list:
+    """
+    :param topo: [src dst src_as dst_as (delay capacity)] rows
+    :param header: (nodes, edges) of the first line
+    :param index: topology_index(topo), computed if None
+    """
+    problems = []
+    src, dst = topo[:, 0].astype(np.int64), topo[:, 1].astype(np.int64)
+    nodes, sorted_keys = index if index is not None else topology_index(topo)
+    if header is not None and tuple(header) != (len(nodes), len(topo)):
+        problems.append(Problem(WARNING, os.path.basename(file), "header (nodes, edges) differs from the content",
+                                1, [list(header), [len(nodes), len(topo)]]))
+    loops = src == dst
+    problems += _problem(WARNING, file, "self loop", src[loops])
+    sorted_keys = sorted_keys[(sorted_keys >> 32) != (sorted_keys & 0xFFFFFFFF)]
+    problems += _problem(WARNING, file, "duplicate edge (either direction)",
+                         _links(_duplicates(sorted_keys, is_sorted=True)))
+    # the AS of a node must be the same on all of its edges
+    ids = np.concatenate((src, dst))
+    as_id = np.concatenate((topo[:, 2], topo[:, 3])).astype(np.int64)
+    pairs = _unique((ids << 32) | (as_id & 0xFFFFFFFF))
+    problems += _problem(WARNING, file, "node with several AS ids", _duplicates(pairs >> 32, is_sorted=True))
+    if topo.shape[1] >= 6 and not np.isnan(topo[:, 5]).all():
+        bad = ~(topo[:, 5] > 0) & ~loops
+        problems += _problem(WARNING, file, "edge without a positive capacity",
+                             _links(undirected_key(src[bad], dst[bad])))
+    return problems
+
+
+def check_flows(flow: np.ndarray, nodes: np.ndarray, topo_keys: np.ndarray, file: str) -> list:
+    """
+    :param nodes: sorted unique topology node ids
+    :param topo_keys: sorted undirected keys of the topology edges, see topology_index()
+    """
+    src, dst = flow[:, 0].astype(np.int64), flow[:, 1].astype(np.int64)
+    problems = _problem(WARNING, file, "flow endpoint not in the topology",
+                        _missing(np.concatenate((src, dst)), nodes))
+    problems += _problem(WARNING, file, "flow on a link not in the topology (ignored)",
+                         _links(_missing(undirected_key(src, dst), topo_keys, present_sorted=True)))
+    negative = (flow[:, 2:5] < 0).any(axis=1)
+    problems += _problem(WARNING, file, "negative load", _links(undirected_key(src[negative], dst[negative])))
+    problems += _problem(WARNING, file, "row with missing values", np.flatnonzero(np.isnan(flow).any(axis=1)) + 1)
+    return problems
+
+
+def check_layout(layout: np.ndarray, nodes: np.ndarray, require_layout: bool, file: str) -> list:
+    """
+    :param layout: [node x y as ctrl] rows, as is nan for 4 column files
+    :param require_layout: missing coordinates are errors (layout="file")
+    """
+    ids = np.sort(layout[:, 0].astype(np.int64))
+    problems = _problem(ERROR if require_layout else WARNING, file, "topology node without coordinates",
+                        _missing(nodes, ids, present_sorted=True))
+    problems += _problem(WARNING, file, "node not in the topology", _missing(ids, nodes, present_sorted=True))
+    problems += _problem(WARNING, file, "duplicate node", _duplicates(ids, is_sorted=True))
+    problems += _problem(WARNING, file, "row with missing values",
+                         np.flatnonzero(np.isnan(layout[:, [0, 1, 2, 4]]).any(axis=1)) + 1)
+    return problems
+
+
+def check_node_types(types: dict, nodes: np.ndarray, file: str) -> list:
+    problems = []
+    for name in TYPE_NAMES:
+        if name not in types:
+            problems.append(Problem(ERROR, os.path.basename(file), "missing line", 1, [name]))
+    ids = np.concatenate([types[name] for name in TYPE_NAMES if name in types] + [np.zeros(0, dtype=np.int64)])
+    problems += _problem(WARNING, file, "node not in the topology", _missing(ids, nodes))
+    problems += _problem(WARNING, file, "node with several types", _duplicates(ids))
+    return problems
+
+
+def check_controllers(layout: np.ndarray, switches: np.ndarray, ctrl_per_as: int, file: str) -> list:
+    """
+    Every AS has ctrl_per_as control domains among its switches, like topoGen check_layout_valid()
+    :return: problems, examples are [as, number of domains]
+    """
+    rows = layout[np.isin(layout[:, 0].astype(np.int64), switches)]
+    if len(rows) == 0 or np.isnan(rows[:, 3]).all():
+        return []
+    pairs = _unique((rows[:, 3].astype(np.int64) << 32) | rows[:, 4].astype(np.int64))
+    as_ids, counts = np.unique(pairs >> 32, return_counts=True)
+    bad = counts != ctrl_per_as
+    return _problem(WARNING, file, "AS whose switches are not in {} control domains".format(ctrl_per_as),
+                    np.column_stack((as_ids[bad], counts[bad])))
+
+
+def validate(data_dir: str = "data_source/", ctrl_per_as: int = None, require_layout: bool = False,
+             files: dict = None) -> list:
+    """
+    :param data_dir: directory of the input files, see FILES
+    :param ctrl_per_as: expected number of control domains per AS, not checked if None
+    :param require_layout: missing coordinates are errors, set it for run(layout="file")
+    :param files: {key of FILES: path} overriding single files
+    :return: list of Problem, empty if the files are consistent
+    """
+    paths = {key: os.path.join(data_dir, name) for key, name in FILES.items()}
+    paths.update(files or {})
+    problems = []
+    for key in ("topo", "layout", "node_type"):
+        if not os.path.exists(paths[key]):
+            problems.append(Problem(ERROR, os.path.basename(paths[key]), "file not found", 1, [paths[key]]))
+    if problems:
+        return problems
+
+    with open(paths["topo"]) as f:
+        header = tuple(int(v) for v in re.findall(r"\d+", f.readline())[:2]) or None
+        first = f.readline().strip()
+    # a single tab is parsed a third faster than the generic whitespace separator
+    try:
+        topo = read_table(paths["topo"], "\t" if re.fullmatch(r"[^\s]+(\t[^\s]+)*", first) else r"\s+", 6,
+                          skiprows=1)
+    except ValueError:
+        # other whitespace further down the file
+        topo = read_table(paths["topo"], r"\s+", 6, skiprows=1)
+    nodes, topo_keys = topology_index(topo)
+    problems += check_topology(topo, header, paths["topo"], (nodes, topo_keys))
+    for key in ("flow", "flow_new"):
+        problems += check_flows(read_table(paths[key], " ", 5), nodes, topo_keys, paths[key])
+    layout = read_table(paths["layout"], ",", 5)
+    if len(layout) and np.isnan(layout[:, 4]).all():
+        # node, x, y, ctrl: no AS column
+        layout = np.column_stack((layout[:, :3], np.full(len(layout), np.nan), layout[:, 3]))
+    problems += check_layout(layout, nodes, require_layout, paths["layout"])
+    types = read_node_types(paths["node_type"])
+    problems += check_node_types(types, nodes, paths["node_type"])
+    if ctrl_per_as is not None and "switch" in types:
+        problems += check_controllers(layout, types["switch"], ctrl_per_as, paths["layout"])
+    return problems
+
+
+def describe(problem: Problem) -> str:
+    return "{}: {} ({}), e.g. {}".format(problem.file, problem.check, problem.count, problem.examples)
+
+
+def report(problems: list) -> str:
+    if not problems:
+        return "No problems found"
+    return "\n".join("[{}] {}".format(problem.level.upper(), describe(problem)) for problem in problems)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="consistency check of the input files")
+    parser.add_argument("data_dir", nargs="?", default="data_source/")
+    parser.add_argument("--ctrl", type=int, help="expected number of control domains per AS")
+    parser.add_argument("--require-layout", action="store_true", help="missing coordinates are errors")
+    args = parser.parse_args()
+
+    result = validate(args.data_dir, args.ctrl, args.require_layout)
+    print(report(result))
+    sys.exit(1 if any(p.level == ERROR for p in result) else 0)